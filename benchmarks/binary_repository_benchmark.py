@@ -0,0 +1,93 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of loading and evaluating a repository dominated by segment user ID lists,
+from a JSON file and from a memory-mapped binary file.
+
+Usage::
+
+  python benchmarks/binary_repository_benchmark.py [segments] [ids per segment]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from threading import Event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.file_synchronizer import FileSynchronizer  # noqa: E402
+from featureprobe.internal import binary_repository  # noqa: E402
+from featureprobe.memory_data_repository import MemoryDataRepository  # noqa: E402
+
+
+def _payload(segment_count, id_count):
+    segments, toggles = {}, {}
+    for s in range(segment_count):
+        key = 'segment_%d' % s
+        segments[key] = {'key': key, 'uniqueId': key, 'version': 1, 'rules': [{'conditions': [{
+            'type': 'string', 'subject': 'userId', 'predicate': 'is one of',
+            'objects': ['user_%d_%d' % (s, i) for i in range(id_count)]}]}]}
+        toggles['toggle_%d' % s] = {
+            'key': 'toggle_%d' % s, 'enabled': True, 'version': 1, 'variations': [False, True],
+            'disabledServe': {'select': 0}, 'defaultServe': {'select': 0},
+            'rules': [{'serve': {'select': 1}, 'conditions': [{
+                'type': 'segment', 'subject': 'user', 'predicate': 'is in', 'objects': [key]}]}]}
+    return {'toggles': toggles, 'segments': segments}
+
+
+def _load(path):
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    FileSynchronizer(data_repo, path, Event()).sync()
+    return data_repo
+
+
+def bench(segment_count, id_count):
+    directory = tempfile.mkdtemp()
+    json_path = os.path.join(directory, 'repo.json')
+    binary_path = os.path.join(directory, 'repo.fpr')
+    with open(json_path, 'w') as f:
+        json.dump(_payload(segment_count, id_count), f)
+    binary_repository.convert(json_path, binary_path)
+    user = fp.User(stable_rollout_key='user').with_attr('userId', 'user_0_%d' % (id_count // 2))
+
+    for name, path in (('json', json_path), ('binary', binary_path)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        data_repo = _load(path)
+        toggle = data_repo.get_toggle('toggle_0')
+        loaded = time.perf_counter() - started
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        snapshot = data_repo.snapshot
+        assert toggle.eval(user, snapshot.toggles, snapshot.segments, None, 20).value is True
+        number = 10000
+        evaluate = min(timeit.repeat(
+            lambda: toggle.eval(user, snapshot.toggles, snapshot.segments, None, 20),
+            number=number, repeat=3)) / number
+        print('%-8s %10.1f MB file %10.1f ms load %10.1f MB held %8.2f us/eval' % (
+            name, os.path.getsize(path) / 2 ** 20, loaded * 1000, retained / 2 ** 20, evaluate * 1e6))
+        del data_repo, toggle, snapshot
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+          int(sys.argv[2]) if len(sys.argv) > 2 else 50000)
@@ -0,0 +1,67 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro benchmarks of condition matching.
+
+Usage::
+
+  python benchmarks/condition_benchmark.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import featureprobe as fp  # noqa: E402
+
+_NUMBER = 20000
+
+
+def _per_call_ns(condition, user):
+    seconds = min(timeit.repeat(lambda: condition.match_objects(user, {}),
+                                number=_NUMBER, repeat=3))
+    return seconds / _NUMBER * 1e9
+
+
+def bench_membership():
+    print('%-16s %10s %14s %14s' % ('predicate', 'objects', 'hit (ns)', 'miss (ns)'))
+    for predicate in (fp.StringPredicate.IS_ONE_OF, fp.StringPredicate.IS_NOT_ANY_OF):
+        for size in (10, 1000, 50000, 200000):
+            objects = ['user-%d' % i for i in range(size)]
+            condition = fp.Condition('userId', fp.ConditionType.STRING, predicate, objects).compile()
+            hit = _per_call_ns(condition, fp.User({'userId': objects[-1]}, 'key'))
+            miss = _per_call_ns(condition, fp.User({'userId': 'nobody'}, 'key'))
+            print('%-16s %10d %14.0f %14.0f' % (predicate, size, hit, miss))
+
+
+def bench_patterns():
+    print('%-20s %10s %14s %14s' % ('predicate', 'objects', 'hit (ns)', 'miss (ns)'))
+    target = 'someone.with.a.long.name@mail.example.com'
+    for predicate, hit_pattern in ((fp.StringPredicate.ENDS_WITH, '@mail.example.com'),
+                                   (fp.StringPredicate.STARTS_WITH, 'someone.'),
+                                   (fp.StringPredicate.CONTAINS, 'long.name')):
+        for size in (10, 100, 800, 5000):
+            objects = ['@domain-%d.example.org' % i for i in range(size - 1)] + [hit_pattern]
+            condition = fp.Condition('email', fp.ConditionType.STRING, predicate, objects).compile()
+            hit = _per_call_ns(condition, fp.User({'email': target}, 'key'))
+            miss = _per_call_ns(condition, fp.User({'email': 'x' + target[::-1]}, 'key'))
+            print('%-20s %10d %14.0f %14.0f' % (predicate, size, hit, miss))
+
+
+if __name__ == '__main__':
+    bench_membership()
+    print()
+    bench_patterns()
@@ -0,0 +1,198 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks of toggle evaluation.
+
+Usage::
+
+  python benchmarks/evaluation_benchmark.py
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import featureprobe as fp  # noqa: E402
+import featureprobe.event_processor  # noqa: E402
+
+_NUMBER = 20
+
+
+def _per_call_ns(func):
+    seconds = min(timeit.repeat(func, number=_NUMBER, repeat=3))
+    return seconds / _NUMBER * 1e9
+
+
+def _rollout_toggle():
+    return fp.Toggle.from_json({
+        'key': 'rollout_toggle',
+        'enabled': True,
+        'version': 1,
+        'disabledServe': {'select': 0},
+        'defaultServe': {'split': {
+            'distribution': [[[0, 2000], [5000, 6000]], [[2000, 5000]], [[6000, 10000]]],
+            'salt': 'rollout_salt',
+        }},
+        'rules': [],
+        'variations': ['a', 'b', 'c'],
+    }).compile()
+
+
+def bench_rollout():
+    toggle = _rollout_toggle()
+    users = [fp.User(stable_rollout_key='user-%d' % i) for i in range(1000)]
+
+    def evaluate():
+        for user in users:
+            toggle.eval(user, {}, {}, None, 20)
+
+    print('%-24s %14s' % ('rollout', 'eval (ns)'))
+    print('%-24s %14.0f' % ('without bucket cache', _per_call_ns(evaluate) / len(users)))
+    fp.Split.configure_bucket_cache(len(users))
+    evaluate()  # warm up
+    print('%-24s %14.0f' % ('with bucket cache', _per_call_ns(evaluate) / len(users)))
+    print(fp.Split.bucket_cache_info())
+    fp.Split.configure_bucket_cache(0)
+
+
+class _NullEventProcessor(fp.event_processor.EventProcessor):
+    @classmethod
+    def from_context(cls, context):
+        return cls()
+
+    def push(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def _segmented_repository(toggle_count):
+    segment = {
+        'uniqueId': 'project$beta_users',
+        'version': 1,
+        'rules': [{'conditions': [{
+            'type': 'string', 'subject': 'userId', 'predicate': 'is one of',
+            'objects': ['user-%d' % i for i in range(0, 1000, 2)],
+        }]}],
+    }
+    toggles = {}
+    for i in range(toggle_count):
+        key = 'toggle_%d' % i
+        toggles[key] = {
+            'key': key,
+            'enabled': True,
+            'version': 1,
+            'disabledServe': {'select': 0},
+            'defaultServe': {'select': 0},
+            'rules': [{
+                'serve': {'select': 1},
+                'conditions': [
+                    {'type': 'segment', 'subject': 'user', 'predicate': 'is in',
+                     'objects': ['project$beta_users']},
+                    {'type': 'string', 'subject': 'city', 'predicate': 'is one of',
+                     'objects': ['city-%d' % i]},
+                ],
+            }],
+            'variations': [False, True],
+        }
+    return fp.Repository.from_json({'toggles': toggles, 'segments': {'project$beta_users': segment}})
+
+
+def _client(**config):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        f.write('{}')
+    client = fp.Client('server-sdk-key', fp.Config(sync_mode='file', location=f.name, start_wait=0, **config))
+    os.remove(f.name)
+    client._event_processor.shutdown()
+    client._event_processor = _NullEventProcessor()
+    return client
+
+
+def bench_all_values():
+    from featureprobe.memory_data_repository import MemoryDataRepository
+
+    client = _client()
+    for toggle_count in (10, 40, 80):
+        data_repo = MemoryDataRepository(None, False, 0)  # noqa
+        data_repo.refresh(_segmented_repository(toggle_count))
+        client._data_repo = data_repo
+        keys = list(data_repo.get_all_toggle())
+        user = fp.User({'userId': 'user-2', 'city': 'city-3'}, 'user-2')
+
+        def one_by_one():
+            for key in keys:
+                client.value(key, user, False)
+
+        print('%-24s %8d toggles %10.1f us' % ('value() per toggle', toggle_count, _per_call_ns(one_by_one) / 1000))
+        print('%-24s %8d toggles %10.1f us' % ('all_values()', toggle_count,
+                                             _per_call_ns(lambda: client.all_values(user, keys)) / 1000))
+    client.close()
+
+
+def bench_evaluation_cache():
+    from featureprobe.memory_data_repository import MemoryDataRepository
+
+    repo = _segmented_repository(40)
+    keys = list(repo.toggles)
+    users = [fp.User({'userId': 'user-%d' % (i % 10), 'city': 'city-3'}, 'user-%d' % i) for i in range(100)]
+    for name, client in (('without result cache', _client()),
+                         ('with result cache', _client(evaluation_cache_size=10000))):
+        client._data_repo = MemoryDataRepository(None, False, 0)  # noqa
+        client._data_repo.refresh(repo)
+
+        def evaluate():
+            for user in users:
+                for key in keys:
+                    client.value(key, user, False)
+
+        print('%-24s %14.0f ns' % (name, _per_call_ns(evaluate) / len(users) / len(keys)))
+        if client.evaluation_cache_info() is not None:
+            print(client.evaluation_cache_info())
+        client.close()
+
+
+def bench_constant_folding():
+    from featureprobe.memory_data_repository import MemoryDataRepository
+
+    client = _client()
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(fp.Repository({
+        'folded': fp.Toggle.from_json({'key': 'folded', 'enabled': True, 'defaultServe': {'select': 1},
+                                       'variations': [False, True]}),
+        'disabled': fp.Toggle.from_json({'key': 'disabled', 'enabled': False, 'disabledServe': {'select': 0},
+                                         'variations': [False, True]}),
+        'rollout': _rollout_toggle(),
+    }, {}))
+    client._data_repo = data_repo
+    user = fp.User({'city': 'city-3'}, 'user-2')
+    for key in ('folded', 'disabled', 'rollout'):
+        print('%-24s %14.0f ns' % ('value() of ' + key, _per_call_ns(lambda: client.value(key, user, False))))
+    client.close()
+
+
+if __name__ == '__main__':
+    bench_rollout()
+    print()
+    bench_all_values()
+    print()
+    bench_evaluation_cache()
+    print()
+    bench_constant_folding()
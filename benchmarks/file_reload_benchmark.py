@@ -0,0 +1,71 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the file synchronizer reload mode: cost of checking an unchanged file, and the
+delay until a file renamed over the watched one is served.
+
+Usage::
+
+  python benchmarks/file_reload_benchmark.py [reload interval seconds]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+
+_NUMBER = 1000
+
+
+def _write(path, payload):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(payload, f)
+    os.replace(path + '.tmp', path)
+
+
+def bench(reload_interval):
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json')) as f:
+        payload = json.load(f)
+    path = os.path.join(tempfile.mkdtemp(), 'repo.json')
+    _write(path, payload)
+    client = fp.Client('server-sdk-key', fp.Config(sync_mode='file', location=path, start_wait=1,
+                                                   file_reload_interval=reload_interval))
+    try:
+        check = min(timeit.repeat(client._synchronizer.sync, number=_NUMBER, repeat=3)) / _NUMBER
+        print('%-24s %10.2f us' % ('unchanged file check', check * 1e6))
+        delays = []
+        for version in range(2, 12):
+            payload['toggles']['bool_toggle']['version'] = version
+            started = time.perf_counter()
+            _write(path, payload)
+            while client._data_repo.get_toggle('bool_toggle').version != version:
+                time.sleep(0.0005)
+            delays.append(time.perf_counter() - started)
+        print('%-24s %10.2f ms (interval %.0f ms)' % (
+            'median pickup delay', sorted(delays)[len(delays) // 2] * 1000, reload_interval * 1000))
+    finally:
+        client.close()
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == '__main__':
+    bench(float(sys.argv[1]) if len(sys.argv) > 1 else 1)
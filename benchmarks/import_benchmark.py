@@ -0,0 +1,65 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of ``import featureprobe`` in a fresh interpreter, measured with ``-X importtime``.
+
+Fails if the import takes longer than the budget, or loads a dependency that should only be
+imported once the synchronizer or event processor needing it is constructed.
+
+Usage::
+
+  python benchmarks/import_benchmark.py [budget ms] [runs]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED = ('apscheduler', 'requests', 'socketio', 'tzlocal', 'urllib3', 'websocket')
+
+_LINE = re.compile(r'import time:\s*\d+ \|\s*(\d+) \| (\s*)(\S+)')
+
+
+def import_time():
+    """Cumulative microseconds of ``import featureprobe`` and the top level packages it loaded."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import featureprobe'],
+                             cwd=_ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    total, packages = 0, set()
+    for line in process.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        cumulative_us, indent, module = match.groups()
+        if not indent and module == 'featureprobe':
+            total = int(cumulative_us)
+        packages.add(module.split('.')[0])
+    return total, packages
+
+
+def main(budget_ms, runs):
+    results = [import_time() for _ in range(runs)]
+    best = min(total for total, _ in results) / 1000
+    loaded = sorted(set(DEFERRED) & results[0][1])
+    print('%-24s %10.2f ms (budget %.0f ms, best of %d)' % ('import featureprobe', best, budget_ms, runs))
+    if loaded:
+        print('imported eagerly: %s' % ', '.join(loaded))
+    return 0 if best <= budget_ms and not loaded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 150,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 5))
@@ -0,0 +1,75 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of JSON backends decoding a multi-megabyte repository and encoding event batches.
+
+Usage::
+
+  python benchmarks/json_benchmark.py [megabytes]
+"""
+
+import copy
+import json
+import os
+import sys
+import timeit
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.default_event_processor import EventRepository  # noqa: E402
+from featureprobe.internal import fast_json  # noqa: E402
+
+
+def _repository_payload(megabytes):
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json')) as f:
+        sample = json.load(f)
+    templates = list(sample['toggles'].values())
+    toggles = {}
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        toggle = copy.deepcopy(templates[len(toggles) % len(templates)])
+        toggle['key'] = 'toggle_%d' % len(toggles)
+        toggles[toggle['key']] = toggle
+        size += len(json.dumps(toggle))
+    return json.dumps({'toggles': toggles, 'segments': sample['segments']}).encode('utf-8')
+
+
+def _events(users, toggles):
+    repo = EventRepository()
+    for u in range(users):
+        user = fp.User().stable_rollout('user-%d' % u)
+        for t in range(toggles):
+            repo.add(fp.AccessEvent(1700000000000 + u, user, key='toggle_%d' % t, value=t % 3 == 0,
+                                    version=3, variation_index=t % 2, track_access_events=True))
+    return [repo.to_dict()]
+
+
+def _per_call_ms(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1000
+
+
+if __name__ == '__main__':
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 6
+    payload = _repository_payload(megabytes)
+    events = _events(1000, 20)
+    print('repository %.1f MB, event batch of %d events' % (len(payload) / 1024 / 1024, len(events[0]['events'])))
+    for backend in fast_json.BACKENDS:
+        fast_json.backend = backend
+        decode = _per_call_ms(lambda: fast_json.loads(payload))
+        build = _per_call_ms(lambda: fp.Repository.from_json(fast_json.loads(payload)))
+        encode = _per_call_ms(lambda: fast_json.dumps(events))
+        print('%-10s decode %8.1f ms   decode + from_json %8.1f ms   encode events %8.1f ms' % (
+            backend.name, decode, build, encode))
@@ -0,0 +1,82 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the memory held by toggles, evaluation results and events.
+
+Usage::
+
+  python benchmarks/memory_benchmark.py [toggles] [events]
+"""
+
+import copy
+import json
+import os
+import sys
+import tracemalloc
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.detail import Detail  # noqa: E402
+from featureprobe.evaluation_result import EvaluationResult  # noqa: E402
+from featureprobe.event import AccessEvent, CustomEvent, DebugEvent  # noqa: E402
+
+
+def _payload(toggle_count):
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json')) as f:
+        sample = json.load(f)
+    templates = list(sample['toggles'].values())
+    toggles = {}
+    for i in range(toggle_count):
+        toggle = copy.deepcopy(templates[i % len(templates)])
+        toggle['key'] = 'toggle_%d' % i
+        toggles[toggle['key']] = toggle
+    return {'toggles': toggles, 'segments': sample['segments']}
+
+
+def _allocated(build, count):
+    """Bytes still allocated per item after ``build`` made ``count`` of them."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()  # noqa: F841
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return growth / count
+
+
+def bench_repository(toggle_count):
+    payload = _payload(toggle_count)
+    per_toggle = _allocated(lambda: fp.Repository.from_json(payload).compile(), toggle_count)
+    print('%-24s %8d toggles %10.0f bytes/toggle' % ('compiled repository', toggle_count, per_toggle))
+
+
+def bench_events(event_count):
+    user = fp.User(stable_rollout_key='user').with_attr('city', '1')
+    builders = {
+        'evaluation result': lambda i: EvaluationResult(True, 0, 1, i, 'rule 0'),
+        'detail': lambda i: Detail(True, 0, i, 'rule 0'),
+        'access event': lambda i: AccessEvent(i, user, 'toggle', True, 1, 1, True),
+        'debug event': lambda i: DebugEvent(i, user, 'toggle', True, 1, 1, 0, 'rule 0'),
+        'custom event': lambda i: CustomEvent(i, user, 'event', 1.0),
+    }
+    for name, build in builders.items():
+        per_item = _allocated(lambda: [build(i) for i in range(event_count)], event_count)
+        print('%-24s %8d items   %10.0f bytes/item' % (name, event_count, per_item))
+
+
+if __name__ == '__main__':
+    bench_repository(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
+    bench_events(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
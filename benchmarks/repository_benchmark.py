@@ -0,0 +1,136 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmarks of repository refresh.
+
+Usage::
+
+  python benchmarks/repository_benchmark.py
+"""
+
+import copy
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.internal import fast_json  # noqa: E402
+from featureprobe.memory_data_repository import MemoryDataRepository  # noqa: E402
+
+_NUMBER = 10
+
+
+def _per_call_ms(func):
+    return min(timeit.repeat(func, number=_NUMBER, repeat=3)) / _NUMBER * 1000
+
+
+def _payload(toggle_count):
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json')) as f:
+        sample = json.load(f)
+    templates = list(sample['toggles'].values())
+    toggles = {}
+    for i in range(toggle_count):
+        toggle = copy.deepcopy(templates[i % len(templates)])
+        toggle['key'] = 'toggle_%d' % i
+        toggles[toggle['key']] = toggle
+    return {'toggles': toggles, 'segments': sample['segments']}
+
+
+def bench_refresh():
+    for toggle_count in (300, 3000):
+        payload = _payload(toggle_count)
+        data_repo = MemoryDataRepository(None, False, 0)  # noqa
+
+        def full():
+            data_repo.refresh(fp.Repository.from_json(payload))
+
+        previous = fp.Repository.from_json(payload)
+        data_repo.refresh(previous)
+
+        def incremental():
+            data_repo.refresh(fp.Repository.from_json(payload, previous))
+
+        print('%-24s %8d toggles %10.2f ms' % ('full refresh', toggle_count, _per_call_ms(full)))
+        print('%-24s %8d toggles %10.2f ms' % ('unchanged refresh', toggle_count, _per_call_ms(incremental)))
+
+
+def bench_lazy(toggle_count=5000, used=100):
+    payload = _payload(toggle_count)
+    keys = ['toggle_%d' % i for i in range(0, toggle_count, toggle_count // used)]
+    for lazy in (False, True):
+        def start():
+            data_repo = MemoryDataRepository(None, False, 0)  # noqa
+            data_repo.refresh(fp.Repository.from_json(payload, lazy=lazy))
+            for key in keys:
+                data_repo.get_toggle(key)
+            return data_repo
+
+        tracemalloc.start()
+        data_repo = start()  # noqa
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del data_repo
+        print('%-24s %8d toggles %10.2f ms %10.1f KiB retained, %d used' % (
+            'lazy refresh' if lazy else 'eager refresh', toggle_count, _per_call_ms(start), retained / 1024, used))
+
+
+def bench_stream(toggle_count=10000, chunk_size=64 * 1024):
+    data = json.dumps(_payload(toggle_count)).encode('utf-8')
+
+    def chunks():
+        return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+    for name, parse in (('from_json', lambda: fp.Repository.from_json(fast_json.loads(b''.join(chunks())))),
+                        ('from_json_stream', lambda: fp.Repository.from_json_stream(chunks()))):
+        tracemalloc.start()
+        repo = parse()  # noqa
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del repo
+        print('%-24s %6.1f MB %10.2f ms %10.1f MiB peak %10.1f MiB retained' % (
+            name, len(data) / 1024 / 1024, _per_call_ms(parse), peak / 1024 / 1024, retained / 1024 / 1024))
+
+
+def bench_delta(toggle_count=3000):
+    payload = _payload(toggle_count)
+    data = json.dumps(payload).encode('utf-8')
+    previous = fp.Repository.from_json(payload)
+    changed = dict(payload['toggles']['toggle_0'], version=2)
+    delta = json.dumps({'baseVersion': 1, 'version': 2, 'toggles': {'toggle_0': changed}}).encode('utf-8')
+    payload['toggles']['toggle_0'] = changed
+    updated = json.dumps(payload).encode('utf-8')
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+
+    def full():
+        data_repo.refresh(previous)
+        data_repo.refresh(fp.Repository.from_json(fast_json.loads(updated), previous))
+
+    def incremental():
+        data_repo.refresh(previous)
+        data_repo.refresh(previous.with_delta(fast_json.loads(delta)))
+
+    for name, size, refresh in (('full sync', len(data), full), ('delta update', len(delta), incremental)):
+        print('%-24s %8d toggles %10.2f ms %10.1f KiB' % (name, toggle_count, _per_call_ms(refresh), size / 1024))
+
+
+if __name__ == '__main__':
+    bench_refresh()
+    bench_lazy()
+    bench_stream()
+    bench_delta()
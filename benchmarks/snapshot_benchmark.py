@@ -0,0 +1,128 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Stress benchmark of concurrent evaluations while the repository is refreshed.
+
+Readers evaluate toggles whose prerequisites only hold within a single refresh, a writer keeps
+publishing new snapshots. Reads must never see two refreshes at once, nor wait for a refresh.
+
+Usage::
+
+  python benchmarks/snapshot_benchmark.py [readers] [seconds]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import featureprobe as fp  # noqa: E402
+import featureprobe.event_processor  # noqa: E402
+from featureprobe.memory_data_repository import MemoryDataRepository  # noqa: E402
+
+_TOGGLES = 500
+
+
+def _generation(value):
+    toggles = {}
+    for i in range(_TOGGLES):
+        key = 'toggle_%d' % i
+        toggles[key] = fp.Toggle.from_json({
+            'key': key, 'enabled': True, 'version': value, 'defaultServe': {'select': value},
+            'rules': [{'serve': {'select': value}, 'conditions': []}], 'variations': [0, 1],
+            'prerequisites': [{'key': 'toggle_0', 'value': value}] if i else []})
+    return fp.Repository(toggles, {})
+
+
+def _client(data_repo):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        f.write('{}')
+    client = fp.Client('server-sdk-key', fp.Config(sync_mode='file', location=f.name, start_wait=0))
+    os.remove(f.name)
+    client._event_processor.shutdown()
+    client._event_processor = _NullEventProcessor()
+    client._data_repo = data_repo
+    return client
+
+
+class _NullEventProcessor(fp.event_processor.EventProcessor):
+    @classmethod
+    def from_context(cls, context):
+        return cls()
+
+    def push(self, event):
+        pass
+
+    def flush(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def _stress(readers, seconds, refreshing):
+    generations = [_generation(0), _generation(1)]
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(generations[0])
+    client = _client(data_repo)
+    done = threading.Event()
+    stats = []
+    refreshes = [0]
+
+    def read():
+        user = fp.User(stable_rollout_key='user')
+        reads = inconsistent = 0
+        worst = 0.0
+        while not done.is_set():
+            key = 'toggle_%d' % (reads % _TOGGLES)
+            start = time.perf_counter()
+            detail = client.value_detail(key, user, None)
+            worst = max(worst, time.perf_counter() - start)
+            inconsistent += detail.reason != 'Rule 0 hit'
+            reads += 1
+        stats.append((reads, inconsistent, worst))
+
+    def refresh():
+        while not done.is_set():
+            refreshes[0] += 1
+            data_repo.refresh(generations[refreshes[0] % 2])
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    if refreshing:
+        threads.append(threading.Thread(target=refresh))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    done.set()
+    for thread in threads:
+        thread.join()
+    version = data_repo.snapshot.version
+    client.close()
+
+    reads = sum(s[0] for s in stats)
+    print('%-18s %10.0f reads/s %8d inconsistent %10.2f ms worst read %8d refreshes (snapshot %d)' % (
+        'with refresh' if refreshing else 'without refresh', reads / seconds, sum(s[1] for s in stats),
+        max(s[2] for s in stats) * 1000, refreshes[0], version))
+
+
+if __name__ == '__main__':
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('%d reader threads, GIL %s' % (readers, 'enabled' if gil else 'disabled'))
+    _stress(readers, seconds, False)
+    _stress(readers, seconds, True)
@@ -0,0 +1,93 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of a burst of concurrent repository sync requests, coalesced or each run on its own.
+
+Usage::
+
+  python benchmarks/sync_benchmark.py [requests] [toggles]
+"""
+
+import copy
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.context import Context  # noqa: E402
+from featureprobe.memory_data_repository import MemoryDataRepository  # noqa: E402
+from featureprobe.polling_synchronizer import PollingSynchronizer  # noqa: E402
+
+
+def _body(toggle_count):
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json')) as f:
+        sample = json.load(f)
+    templates = list(sample['toggles'].values())
+    toggles = {}
+    for i in range(toggle_count):
+        toggle = copy.deepcopy(templates[i % len(templates)])
+        toggle['key'] = 'toggle_%d' % i
+        toggles[toggle['key']] = toggle
+    return json.dumps({'toggles': toggles, 'segments': sample['segments']}).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa
+        self.server.requests += 1
+        # every response differs, as during a burst of toggle edits
+        body = self.server.body.replace(b'"version": 1', b'"version": %d' % self.server.requests)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(request_count, toggle_count):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.body = _body(toggle_count)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:%d/api/server-sdk/toggles' % server.server_port
+    try:
+        for name in ('coalesced', 'one by one'):
+            server.requests = 0
+            synchronizer = PollingSynchronizer.from_context(
+                Context('server-sdk-key', fp.Config(synchronizer_url=url)),
+                MemoryDataRepository(None, False, 0), threading.Event())  # noqa
+            sync = synchronizer.sync if name == 'coalesced' else synchronizer._locked_sync
+            threads = [threading.Thread(target=sync) for _ in range(request_count)]
+            started, cpu = time.perf_counter(), time.process_time()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print('%-12s %4d requests %4d downloads %10.1f ms %10.1f ms cpu' % (
+                name, request_count, server.requests, (time.perf_counter() - started) * 1000,
+                (time.process_time() - cpu) * 1000))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+          int(sys.argv[2]) if len(sys.argv) > 2 else 3000)
@@ -0,0 +1,65 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of bytes on the wire for event upload and repository sync.
+
+Usage::
+
+  python benchmarks/transfer_benchmark.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import featureprobe as fp  # noqa: E402
+from featureprobe.default_event_processor import EventRepository  # noqa: E402
+from featureprobe.internal import compression  # noqa: E402
+
+
+def _events_body(users, toggles):
+    repo = EventRepository()
+    for u in range(users):
+        user = fp.User().stable_rollout('user-%d' % u)
+        for t in range(toggles):
+            repo.add(fp.AccessEvent(1700000000000 + u, user, key='toggle_%d' % t, value=t % 3 == 0,
+                                    version=3, variation_index=t % 2, track_access_events=t % 4 == 0))
+    return json.dumps([repo.to_dict()]).encode('utf-8')
+
+
+def _repository_body():
+    with open(os.path.join(_ROOT, 'tests', 'resources', 'datasource', 'repo.json'), 'rb') as f:
+        return f.read()
+
+
+def _report(name, body):
+    encodings = [None, compression.GZIP]
+    if compression.zstandard is not None:
+        encodings.append(compression.ZSTD)
+    for encoding in encodings:
+        number = 20
+        seconds = timeit.timeit(lambda: compression.encode(body, encoding, 0), number=number) / number
+        data, _ = compression.encode(body, encoding, 0)
+        print('%-28s %-8s %10d bytes %8.1f%% %10.2f ms' % (
+            name, encoding or 'identity', len(data), len(data) * 100 / len(body), seconds * 1000))
+
+
+if __name__ == '__main__':
+    _report('events 100 users x 20', _events_body(100, 20))
+    _report('events 1000 users x 40', _events_body(1000, 40))
+    _report('repository', _repository_body())
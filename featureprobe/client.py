@@ -16,15 +16,22 @@ from typing import Optional
 import logging
 import time
 from threading import Event
-from typing import Any
+from typing import Any, Dict, Iterable, Tuple, TYPE_CHECKING
 
 from featureprobe.config import Config
 from featureprobe.context import Context
 from featureprobe.detail import Detail
+from featureprobe.evaluation_cache import CacheInfo, EvaluationCache
+from featureprobe.evaluation_memo import EvaluationMemo
 from featureprobe.event import AccessEvent, CustomEvent, DebugEvent
 from featureprobe.internal.empty_str import empty_str
+from featureprobe.repository_snapshot import RepositorySnapshot
 from featureprobe.user import User
 
+if TYPE_CHECKING:
+    from featureprobe.evaluation_result import EvaluationResult
+    from featureprobe.model.toggle import Toggle
+
 
 class Client:
     """A client for the FeatureProbe API. Client instances are thread-safe.
@@ -47,6 +54,8 @@ class Client:
         self._event_processor = config.event_processor_creator(context)
         self._data_repo = config.data_repository_creator(context)
         self._config = config
+        self._evaluation_cache = EvaluationCache(config.evaluation_cache_size) \
+            if config.evaluation_cache_size > 0 else None
 
         synchronize_process_ready = Event()
         self._synchronizer = config.synchronizer_creator(
@@ -101,46 +110,118 @@ class Client:
         :param default: The default value to be returned.
         :returns: Dependents on the toggle's type.
         """
-        toggle = self._data_repo.get_toggle(toggle_key)
-        segments = self._data_repo.get_all_segment()
-        toggles = self._data_repo.get_all_toggle()
+        snapshot = self._data_repo.snapshot
+        toggle = snapshot.toggles.get(toggle_key)
         if not toggle:
             return default
 
-        eval_result = toggle.eval(
+        eval_result = self._eval(
+            toggle,
             user,
-            toggles,
-            segments,
-            default,
-            self._config.max_prerequisites_deep)
-        self._track_event(user, toggle, eval_result)
+            snapshot.toggles,
+            snapshot.segments,
+            default)
+        self._track_event(user, toggle, eval_result, snapshot)
         return eval_result.value
 
-    def _track_event(self, user, toggle, eval_result):
+    def all_values(self, user: User, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Gets the evaluated values of multiple toggles in one pass.
+
+        :param user: :obj:`~featureprobe.User` to be evaluated.
+        :param keys: (optional) The keys of toggles to be evaluated, all toggles if omitted.
+        :returns: Values keyed by toggle key, toggles not exist are left out.
+        """
+        return {key: eval_result.value
+                for key, (_, eval_result) in self._eval_all(user, keys).items()}
+
+    def all_details(self, user: User, keys: Optional[Iterable[str]] = None) -> Dict[str, Detail]:
+        """Gets the detailed evaluated results of multiple toggles in one pass.
+
+        :param user: :obj:`~featureprobe.User` to be evaluated.
+        :param keys: (optional) The keys of toggles to be evaluated, all toggles if omitted.
+        :returns: :obj:`~featureprobe.Detail` keyed by toggle key, toggles not exist are left out.
+        """
+        return {key: Detail(value=eval_result.value,
+                            reason=eval_result.reason,
+                            rule_index=eval_result.rule_index,
+                            version=eval_result.version)
+                for key, (_, eval_result) in self._eval_all(user, keys).items()}
+
+    def _eval_all(self, user: User, keys: Optional[Iterable[str]]) \
+            -> Dict[str, Tuple["Toggle", "EvaluationResult"]]:
+        snapshot = self._data_repo.snapshot
+        toggles = snapshot.toggles
+        segments = snapshot.segments
+        # segment membership and prerequisites are shared by all toggles in this pass
+        memo = EvaluationMemo()
+        evaluated = {}
+        for key in (toggles if keys is None else keys):
+            toggle = toggles.get(key)
+            if toggle is None:
+                continue
+            evaluated[key] = toggle, self._eval(
+                toggle,
+                user,
+                toggles,
+                segments,
+                None,
+                memo)
+        self._track_events(user, evaluated.values(), snapshot)
+        return evaluated
+
+    def _eval(self, toggle: "Toggle", user: User, toggles, segments, default,
+              memo: Optional[EvaluationMemo] = None) -> "EvaluationResult":
+        if toggle.user_independent:
+            # folded when the repository was compiled, nothing left to memoize or cache
+            return toggle.eval(user, toggles, segments, default,
+                               self._config.max_prerequisites_deep)
+        if memo is None:
+            memo = EvaluationMemo()
+        if self._evaluation_cache is None:
+            return toggle.eval(user, toggles, segments, default,
+                               self._config.max_prerequisites_deep, memo)
+        return self._evaluation_cache.eval(toggle, user, toggles, segments, default,
+                                           self._config.max_prerequisites_deep, memo)
+
+    def evaluation_cache_info(self) -> Optional[CacheInfo]:
+        """Gets hits, misses, maxsize and currsize of the evaluation result cache.
+
+        :returns: ``None`` if the cache is disabled, see :attr:`Config.evaluation_cache_size`.
+        """
+        return self._evaluation_cache.info() if self._evaluation_cache is not None else None
+
+    def _track_event(self, user, toggle, eval_result, snapshot):
+        self._track_events(user, [(toggle, eval_result)], snapshot)
+
+    def _track_events(self, user: User,
+                      evaluated: Iterable[Tuple["Toggle", "EvaluationResult"]],
+                      snapshot: RepositorySnapshot):
         current_time_millis = int(time.time() * 1000)
-        access_event = AccessEvent(
-            timestamp=current_time_millis,
-            user=user,
-            key=toggle.key,
-            value=eval_result.value,
-            version=eval_result.version,
-            variation_index=eval_result.variation_index,
-            track_access_events=toggle.track_access_events)
-        self._event_processor.push(access_event)
-        if self._should_debug_event(current_time_millis):
-            debug_event = DebugEvent(
+        should_debug = self._should_debug_event(current_time_millis, snapshot)
+        events = []
+        for toggle, eval_result in evaluated:
+            events.append(AccessEvent(
                 timestamp=current_time_millis,
                 user=user,
                 key=toggle.key,
                 value=eval_result.value,
                 version=eval_result.version,
                 variation_index=eval_result.variation_index,
-                rule_index=eval_result.rule_index,
-                reason=eval_result.reason)
-            self._event_processor.push(debug_event)
+                track_access_events=toggle.track_access_events))
+            if should_debug:
+                events.append(DebugEvent(
+                    timestamp=current_time_millis,
+                    user=user,
+                    key=toggle.key,
+                    value=eval_result.value,
+                    version=eval_result.version,
+                    variation_index=eval_result.variation_index,
+                    rule_index=eval_result.rule_index,
+                    reason=eval_result.reason))
+        self._event_processor.push_all(events)
 
-    def _should_debug_event(self, current_time_millis):
-        debug_until_time = self._data_repo.get_debug_until_time()
+    def _should_debug_event(self, current_time_millis, snapshot):
+        debug_until_time = snapshot.debug_until_time
         return debug_until_time is not None and debug_until_time > current_time_millis
         
     def value_detail(self, toggle_key: str, user: User, default) -> Detail:
@@ -158,24 +239,23 @@ class Client:
                 value=default,
                 reason='FeatureProbe repository uninitialized')
 
-        toggle = self._data_repo.get_toggle(toggle_key)
-        segments = self._data_repo.get_all_segment()
-        toggles = self._data_repo.get_all_toggle()
+        snapshot = self._data_repo.snapshot
+        toggle = snapshot.toggles.get(toggle_key)
 
         if toggle is None:
             return Detail(value=default, reason='Toggle not exist')
 
-        eval_result = toggle.eval(
+        eval_result = self._eval(
+            toggle,
             user,
-            toggles,
-            segments,
-            default,
-            self._config.max_prerequisites_deep)
+            snapshot.toggles,
+            snapshot.segments,
+            default)
         detail = Detail(value=eval_result.value,
                         reason=eval_result.reason,
                         rule_index=eval_result.rule_index,
                         version=eval_result.version)
-        self._track_event(user, toggle, eval_result)
+        self._track_event(user, toggle, eval_result, snapshot)
 
         return detail
 
@@ -14,15 +14,25 @@
 
 from datetime import timedelta
 from enum import Enum
+from importlib import import_module
 from typing import Union
 
-from featureprobe.default_event_processor import DefaultEventProcessor
-from featureprobe.file_synchronizer import FileSynchronizer
 from featureprobe.http_config import HttpConfig
 from featureprobe.internal.defaultable import defaultable
 from featureprobe.memory_data_repository import MemoryDataRepository
-from featureprobe.polling_synchronizer import PollingSynchronizer
-from featureprobe.streaming_synchronizer import StreamingSynchronizer
+
+
+def _deferred_creator(module: str, name: str):
+    """``from_context`` of ``module.name``, imported when first called.
+
+    Keeps ``requests``, ``apscheduler``, ``tzlocal`` and ``socketio`` out of ``import featureprobe``
+    until a synchronizer or event processor needing them is constructed.
+    """
+
+    def from_context(*args, **kwargs):
+        return getattr(import_module(module), name).from_context(*args, **kwargs)
+
+    return from_context
 
 
 class SyncMode(str, Enum):
@@ -37,9 +47,9 @@ class SyncMode(str, Enum):
         obj.synchronizer_creator = synchronizer_creator
         return obj
 
-    POLLING = 'polling', PollingSynchronizer.from_context
-    STREAMING = 'streaming', StreamingSynchronizer.from_context
-    FILE = 'file', FileSynchronizer.from_context
+    POLLING = 'polling', _deferred_creator('featureprobe.polling_synchronizer', 'PollingSynchronizer')
+    STREAMING = 'streaming', _deferred_creator('featureprobe.streaming_synchronizer', 'StreamingSynchronizer')
+    FILE = 'file', _deferred_creator('featureprobe.file_synchronizer', 'FileSynchronizer')
 
 
 @defaultable
@@ -54,12 +64,19 @@ class Config:
                  http_config: HttpConfig = HttpConfig(),
                  refresh_interval: Union[timedelta, float] = timedelta(seconds=2),
                  start_wait: float = 5,
-                 max_prerequisites_deep: int = 20
+                 max_prerequisites_deep: int = 20,
+                 evaluation_cache_size: int = 0,
+                 lazy_repository: bool = False,
+                 stream_repository: bool = False,
+                 snapshot_path: str = None,
+                 file_reload_interval: Union[timedelta, float, None] = None,
+                 realtime_debounce: Union[timedelta, float] = timedelta(milliseconds=100)
                  ):
         self._location = location
         self._synchronizer_creator = SyncMode(sync_mode).synchronizer_creator
         self._data_repository_creator = MemoryDataRepository.from_context
-        self._event_processor_creator = DefaultEventProcessor.from_context
+        self._event_processor_creator = _deferred_creator(
+            'featureprobe.default_event_processor', 'DefaultEventProcessor')
         self._remote_uri = remote_uri
         self._synchronizer_url = synchronizer_url
         self._event_url = event_url
@@ -70,6 +87,16 @@ class Config:
             if isinstance(refresh_interval, timedelta) \
             else timedelta(seconds=refresh_interval)
         self._max_prerequisites_deep = max_prerequisites_deep
+        self._evaluation_cache_size = evaluation_cache_size
+        self._lazy_repository = lazy_repository
+        self._stream_repository = stream_repository
+        self._snapshot_path = snapshot_path
+        self._file_reload_interval = file_reload_interval \
+            if file_reload_interval is None or isinstance(file_reload_interval, timedelta) \
+            else timedelta(seconds=file_reload_interval)
+        self._realtime_debounce = realtime_debounce \
+            if isinstance(realtime_debounce, timedelta) \
+            else timedelta(seconds=realtime_debounce)
 
     @property
     def location(self):
@@ -118,3 +145,27 @@ class Config:
     @property
     def max_prerequisites_deep(self):
         return self._max_prerequisites_deep
+
+    @property
+    def evaluation_cache_size(self):
+        return self._evaluation_cache_size
+
+    @property
+    def lazy_repository(self):
+        return self._lazy_repository
+
+    @property
+    def stream_repository(self):
+        return self._stream_repository
+
+    @property
+    def snapshot_path(self):
+        return self._snapshot_path
+
+    @property
+    def file_reload_interval(self):
+        return self._file_reload_interval
+
+    @property
+    def realtime_debounce(self):
+        return self._realtime_debounce
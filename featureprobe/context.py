@@ -36,6 +36,11 @@ class Context:
         self._refresh_interval = config.refresh_interval
         self._location = config.location
         self._http_config = config.http_config
+        self._lazy_repository = config.lazy_repository
+        self._stream_repository = config.stream_repository
+        self._snapshot_path = config.snapshot_path
+        self._file_reload_interval = config.file_reload_interval
+        self._realtime_debounce = config.realtime_debounce
         self._headers = {
             'Authorization': sdk_key,
             'user-agent': 'Python/' + str(__version__),
@@ -69,6 +74,26 @@ class Context:
     def http_config(self):
         return self._http_config
 
+    @property
+    def lazy_repository(self):
+        return self._lazy_repository
+
+    @property
+    def stream_repository(self):
+        return self._stream_repository
+
+    @property
+    def snapshot_path(self):
+        return self._snapshot_path
+
+    @property
+    def file_reload_interval(self):
+        return self._file_reload_interval
+
+    @property
+    def realtime_debounce(self):
+        return self._realtime_debounce
+
     @property
     def headers(self):
         return self._headers
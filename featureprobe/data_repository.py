@@ -15,6 +15,8 @@
 from abc import ABCMeta, abstractmethod
 from typing import Dict, TYPE_CHECKING
 
+from featureprobe.repository_snapshot import RepositorySnapshot
+
 if TYPE_CHECKING:
     from featureprobe.context import Context
     from featureprobe.model.repository import Repository
@@ -32,6 +34,19 @@ class DataRepository(metaclass=ABCMeta):
     def refresh(self, repo: "Repository"):
         pass
 
+    @property
+    def snapshot(self) -> RepositorySnapshot:
+        """Toggles and segments of one refresh, read together by an evaluation.
+
+        Repositories should override this to return the snapshot they published, the default
+        implementation wraps the current toggles and segments, without copying them, with version ``0``.
+        """
+        return RepositorySnapshot(0,
+                                  self.get_all_toggle(),
+                                  self.get_all_segment(),
+                                  self.get_debug_until_time(),
+                                  copy=False)
+
     @abstractmethod
     def get_toggle(self, key: str) -> "Toggle":
         pass
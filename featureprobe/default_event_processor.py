@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import contextlib
-import json
 import logging
 import queue
 import threading
@@ -21,7 +20,7 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
 from queue import Queue
-from typing import List, Optional
+from typing import List, Optional, Union
 
 import tzlocal
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -31,6 +30,7 @@ from featureprobe.access_recorder import AccessSummaryRecorder
 from featureprobe.context import Context
 from featureprobe.event import CustomEvent, DebugEvent, Event, AccessEvent
 from featureprobe.event_processor import EventProcessor
+from featureprobe.internal import compression, fast_json
 
 
 class EventAction:
@@ -38,8 +38,9 @@ class EventAction:
         EVENT = 1
         FLUSH = 2
         SHUTDOWN = 3
+        EVENTS = 4
 
-    def __init__(self, _type: Type, event: Optional[Event]):
+    def __init__(self, _type: Type, event: Optional[Union[Event, List[Event]]]):
         self.type = _type
         self.event = event
 
@@ -108,6 +109,10 @@ class DefaultEventProcessor(EventProcessor):
         self._timeout = (
             context.http_config.conn_timeout,
             context.http_config.read_timeout)
+        self._compression = context.http_config.compression
+        self._compression_threshold = context.http_config.compression_threshold
+        self._transfer_stats = compression.TransferStats(0, 0, 0)
+        self._transfer_lock = threading.Lock()
 
         self._event_repository = EventRepository()
         self._handler_thread = threading.Thread(
@@ -138,6 +143,16 @@ class DefaultEventProcessor(EventProcessor):
             DefaultEventProcessor._logger.warning(
                 DefaultEventProcessor._LOG_BUSY_EVENT)
 
+    def push_all(self, events: List[Event]):
+        if self._closed or not events:
+            return
+        try:
+            self._events.put_nowait(EventAction(
+                EventAction.Type.EVENTS, events))
+        except queue.Full:
+            DefaultEventProcessor._logger.warning(
+                DefaultEventProcessor._LOG_BUSY_EVENT)
+
     def flush(self, block=False, timeout=None):
         if self._closed:
             return
@@ -164,6 +179,9 @@ class DefaultEventProcessor(EventProcessor):
                 for action in actions:
                     if action.type == EventAction.Type.EVENT:
                         self._process_event(action.event, event_repo)
+                    elif action.type == EventAction.Type.EVENTS:
+                        for event in action.event:
+                            self._process_event(event, event_repo)
                     elif action.type == EventAction.Type.FLUSH:
                         self._process_flush(event_repo)
                     elif action.type == EventAction.Type.SHUTDOWN:
@@ -185,12 +203,27 @@ class DefaultEventProcessor(EventProcessor):
     def _process_event(self, event: Event, event_repo: EventRepository):
         event_repo.add(event)
 
+    @property
+    def transfer_stats(self) -> compression.TransferStats:
+        """Event upload requests and their bytes, as sent and before compression."""
+        return self._transfer_stats
+
     def _send_events(self, repositories: List[EventRepository]):
         repositories = [repo.to_dict() for repo in repositories]
+        body = fast_json.dumps(repositories)
+        data, encoding = compression.encode(body, self._compression, self._compression_threshold)
+        headers = {'Content-Type': 'application/json'}
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
         resp = self._session.post(
             self._api_url,
-            json=repositories,
+            data=data,
+            headers=headers,
             timeout=self._timeout)
+        with self._transfer_lock:
+            requests, wire_bytes, body_bytes = self._transfer_stats
+            self._transfer_stats = compression.TransferStats(
+                requests + 1, wire_bytes + len(data), body_bytes + len(body))
         # sourcery skip: replace-interpolation-with-fstring
         self._logger.debug(
             'Http request %s, response %s' %
@@ -16,6 +16,8 @@ from typing import Optional
 
 
 class Detail:
+    __slots__ = ('value', 'rule_index', 'version', 'reason')
+
     def __init__(self, value=None,
                  rule_index: Optional[int] = None,
                  version: Optional[int] = None,
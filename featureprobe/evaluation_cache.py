@@ -0,0 +1,193 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from featureprobe.model.predicate import ConditionType
+
+if TYPE_CHECKING:
+    from featureprobe.evaluation_memo import EvaluationMemo
+    from featureprobe.evaluation_result import EvaluationResult
+    from featureprobe.model.segment import Segment
+    from featureprobe.model.serve import Serve
+    from featureprobe.model.toggle import Toggle
+    from featureprobe.user import User
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class _Dependencies:
+    """What the evaluation of a toggle reads, through its segments and prerequisites."""
+
+    __slots__ = ('attributes', 'uses_key', 'fingerprint')
+
+    def __init__(self, attributes: Tuple[str, ...], uses_key: bool, fingerprint: tuple):
+        self.attributes = attributes
+        self.uses_key = uses_key
+        # the toggle, its prerequisites and segments themselves, compared by identity
+        self.fingerprint = fingerprint
+
+    def unchanged(self, fingerprint: tuple) -> bool:
+        return len(fingerprint) == len(self.fingerprint) and \
+            all(a is b for a, b in zip(fingerprint, self.fingerprint))
+
+
+def _collect_dependencies(toggle: "Toggle",
+                          toggles: Dict[str, "Toggle"],
+                          segments: Dict[str, "Segment"]) -> Optional[_Dependencies]:
+    """Collects dependencies of a toggle, ``None`` if its result depends on the clock."""
+    attributes = set()
+    depends_on = []
+    uses_key = False
+
+    def serve_reads(serve: Optional["Serve"]) -> bool:
+        split = serve.split if serve is not None and serve.select is None else None
+        if split is None:
+            return False
+        if split.bucket_by:
+            attributes.add(split.bucket_by)
+            return False
+        return True
+
+    visited = {('toggle', toggle.key)}
+    pending_toggles = [toggle]
+    pending_segments = []
+    while pending_toggles or pending_segments:
+        if pending_segments:
+            uid = pending_segments.pop()
+            segment = segments.get(uid)
+            depends_on.append(segment)
+            conditions = [c for rule in (segment.rules if segment is not None else [])
+                          for c in rule.conditions]
+        else:
+            current = pending_toggles.pop()
+            depends_on.append(current)
+            conditions = [c for rule in current.rules or [] for c in rule.conditions]
+            serves = [current.disabled_serve, current.default_serve] + \
+                [rule.serve for rule in current.rules or []]
+            for serve in serves:
+                uses_key = serve_reads(serve) or uses_key
+            for prerequisite in current.prerequisites or []:
+                if ('toggle', prerequisite.key) not in visited:
+                    visited.add(('toggle', prerequisite.key))
+                    prerequisite_toggle = toggles.get(prerequisite.key)
+                    if prerequisite_toggle is None:
+                        depends_on.append(None)
+                    else:
+                        pending_toggles.append(prerequisite_toggle)
+
+        for condition in conditions:
+            if condition.type == ConditionType.DATETIME:
+                return None
+            if condition.type == ConditionType.SEGMENT:
+                for uid in condition.objects or []:
+                    if ('segment', uid) not in visited:
+                        visited.add(('segment', uid))
+                        pending_segments.append(uid)
+            else:
+                attributes.add(condition.subject)
+
+    return _Dependencies(tuple(sorted(attributes, key=str)), uses_key, tuple(depends_on))
+
+
+class EvaluationCache:
+    """A bounded LRU cache of evaluation results, shared by users with the same relevant attributes.
+
+    An entry is keyed by the toggle key, the values of user attributes the toggle reads (through its
+    segments and prerequisites too) and the default value. The user key joins the cache key when the
+    toggle rolls out by it, or when an attribute is missing, since the reason then names the user.
+    Entries are invalidated when the toggle, or anything it depends on, is replaced by a refresh.
+    Objects are compared by identity rather than version, since versions may be missing.
+    Toggles with datetime conditions depend on the clock and are never cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._dependencies = {}  # type: Dict[str, Optional[_Dependencies]]
+        self._dependencies_of = None
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependencies = {}
+            self._dependencies_of = None
+
+    def eval(self,
+             toggle: "Toggle",
+             user: "User",
+             toggles: Dict[str, "Toggle"],
+             segments: Dict[str, "Segment"],
+             default_value: object,
+             deep: int,
+             memo: Optional["EvaluationMemo"] = None) -> "EvaluationResult":
+        dependencies = self._dependencies_for(toggle, toggles, segments)
+        key = self._key(toggle, user, default_value, dependencies)
+        if key is None:
+            return toggle.eval(user, toggles, segments, default_value, deep, memo)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if dependencies.unchanged(entry[0]):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self._misses += 1
+
+        result = toggle.eval(user, toggles, segments, default_value, deep, memo)
+        with self._lock:
+            self._entries[key] = (dependencies.fingerprint, result)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def _dependencies_for(self, toggle: "Toggle",
+                          toggles: Dict[str, "Toggle"],
+                          segments: Dict[str, "Segment"]) -> Optional[_Dependencies]:
+        with self._lock:
+            if self._dependencies_of is not toggles:
+                # a refreshed repository, dependencies may have changed
+                self._dependencies = {}
+                self._dependencies_of = toggles
+            dependencies_map = self._dependencies
+        if toggle.key not in dependencies_map:
+            dependencies_map[toggle.key] = _collect_dependencies(toggle, toggles, segments)
+        return dependencies_map[toggle.key]
+
+    @staticmethod
+    def _key(toggle: "Toggle", user: "User", default_value: object,
+             dependencies: Optional[_Dependencies]) -> Optional[tuple]:
+        if dependencies is None:
+            return None
+        attrs = user.attrs
+        values = tuple(attrs.get(attr) for attr in dependencies.attributes)
+        rollout_key = user.key \
+            if dependencies.uses_key or any(attr not in attrs for attr in dependencies.attributes) \
+            else None
+        key = (toggle.key, values, rollout_key, type(default_value), default_value)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
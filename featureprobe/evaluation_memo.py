@@ -0,0 +1,34 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from typing import Dict, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from featureprobe.evaluation_result import EvaluationResult
+    from featureprobe.model.toggle import Toggle
+
+
+class EvaluationMemo:
+    """Results shared by the evaluations of a single user within one pass."""
+
+    def __init__(self):
+        # clock of datetime conditions without a user attribute, read once per pass
+        self.now = time.time()
+        # segment uid -> whether the user is in the segment
+        self.segments = {}  # type: Dict[str, bool]
+        # prerequisite toggle key -> (result, prerequisite depth it needed)
+        self.prerequisites = {}  # type: Dict[str, Tuple["EvaluationResult", int]]
+        # toggles with circular prerequisites being evaluated
+        self.evaluating = set()  # type: Set["Toggle"]
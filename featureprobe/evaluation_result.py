@@ -16,6 +16,8 @@ from typing import Optional
 
 
 class EvaluationResult:
+    __slots__ = ('value', 'rule_index', 'variation_index', 'version', 'reason')
+
     def __init__(self,
                  value,
                  rule_index: Optional[int],
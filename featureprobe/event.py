@@ -19,6 +19,8 @@ if TYPE_CHECKING:
 
 
 class Event:
+    __slots__ = ('_created_time', '_user', '_kind')
+
     def __init__(self, kind: str, created_time: int, user: "User"):
         self._created_time = created_time
         self._user = user
@@ -44,6 +46,8 @@ class Event:
         return self._kind
 
 class ToggleEvent(Event):
+    __slots__ = ('_key', '_value', '_version', '_variation_index')
+
     def __init__(
              self,
              kind: str,
@@ -96,6 +100,8 @@ class ToggleEvent(Event):
 
 
 class AccessEvent(ToggleEvent):
+    __slots__ = ('_track_access_events',)
+
     def __init__(
             self,
             timestamp: int,
@@ -114,6 +120,8 @@ class AccessEvent(ToggleEvent):
 
 
 class DebugEvent(ToggleEvent):
+    __slots__ = ('_rule_index', '_reason', '_user_detail')
+
     def __init__(
             self,
             timestamp: int,
@@ -151,6 +159,8 @@ class DebugEvent(ToggleEvent):
         return self._user_detail
     
 class CustomEvent(Event):
+    __slots__ = ('_name', '_value')
+
     def __init__(
             self,
             timestamp: int,
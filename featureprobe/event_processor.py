@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from featureprobe.context import Context
@@ -31,6 +31,10 @@ class EventProcessor(ABC):
     def push(self, event: "Event"):
         pass
 
+    def push_all(self, events: List["Event"]):
+        for event in events:
+            self.push(event)
+
     @abstractmethod
     def flush(self):
         pass
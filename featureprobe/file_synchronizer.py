@@ -12,11 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
+import mmap
+import os
+import threading
 from threading import Event
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
+from featureprobe.internal import binary_repository, fast_json
+from featureprobe.internal.file_watcher import FileWatcher
 from featureprobe.model.repository import Repository
 from featureprobe.synchronizer import Synchronizer
 
@@ -24,17 +28,41 @@ if TYPE_CHECKING:
     from featureprobe.context import Context
     from featureprobe.data_repository import DataRepository
 
+# signature of a missing file, reported once until the file shows up again
+_MISSING = ()
+
 
 class FileSynchronizer(Synchronizer):
     _logger = logging.getLogger('FeatureProbe-Synchronizer')
+    _STREAM_CHUNK_SIZE = 64 * 1024
 
     def __init__(self,
                  data_repository: "DataRepository",
                  location: str,
-                 ready: "Event"):
+                 ready: "Event",
+                 lazy: bool = False,
+                 stream: bool = False,
+                 reload_interval: Optional[float] = None):
+        """
+        :param reload_interval: (optional) Seconds between checks of the file for changes, the file is
+            only read once if omitted. Changes are noticed right away where inotify is available.
+            A binary repository file is mapped as it is, so it may only be replaced by renaming a
+            complete file over it. A mapped file rewritten in place is not loaded again.
+        """
         self._data_repository = data_repository
         self._location = location
         self._ready = ready
+        self._lazy = lazy
+        self._stream = stream
+        self._reload_interval = reload_interval
+        self._repository = None
+        # device, inode, size, mtime and ctime of the file last read, a rename over it changes the inode
+        self._signature = None
+        # device and inode of the binary file mapped
+        self._mapped = None
+        self._lock = threading.RLock()
+        self._closed = Event()
+        self._watcher = None
 
     @classmethod
     def from_context(
@@ -42,25 +70,78 @@ class FileSynchronizer(Synchronizer):
             context: "Context",
             data_repo: "DataRepository",
             ready: "Event") -> "Synchronizer":
-        return cls(data_repo, context.location, ready)
+        reload_interval = context.file_reload_interval
+        return cls(data_repo, context.location, ready, context.lazy_repository, context.stream_repository,
+                   reload_interval.total_seconds() if reload_interval is not None else None)
 
     def start(self):
         self.sync()
+        if self._reload_interval is not None:
+            self._watcher = threading.Thread(target=self._watch, name='FeatureProbe-FileWatcher', daemon=True)
+            self._watcher.start()
 
     def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
         try:
-            with open(self._location, 'r', encoding='utf-8') as f:
-                repo = Repository.from_json(json.load(f))
+            with open(self._location, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                signature = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+                if signature == self._signature:
+                    # sourcery skip: replace-interpolation-with-fstring
+                    self._logger.debug('repository file unchanged: %s' % self._location)
+                    return
+                # a file failing to parse is not read again until it changes
+                self._signature = signature
+                if signature[:2] == self._mapped:
+                    # sourcery skip: replace-interpolation-with-fstring
+                    self._logger.error(
+                        'Binary repository file %s changed in place while mapped and is not loaded again, '
+                        'replace it by renaming a complete file over it instead' % self._location)
+                    return
+                binary = binary_repository.is_binary(f.read(len(binary_repository.MAGIC)))
+                f.seek(0)
+                if binary:
+                    # the mapping outlives the file, it is released with the last toggle reading it
+                    repo = Repository.from_binary(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                                                  self._repository)
+                elif self._stream:
+                    chunks = iter(lambda: f.read(self._STREAM_CHUNK_SIZE), b'')
+                    repo = Repository.from_json_stream(chunks, self._repository, self._lazy)
+                else:
+                    repo = Repository.from_json(fast_json.loads(f.read()), self._repository, self._lazy)
                 self._data_repository.refresh(repo)
+                self._repository = repo
+                self._mapped = signature[:2] if binary else None
             self._ready.set()
         except FileNotFoundError:
-            # sourcery skip: replace-interpolation-with-fstring
-            self._logger.error(
-                'repository file resource not found in path: %s' %
-                self._location)
+            if self._signature != _MISSING:
+                # sourcery skip: replace-interpolation-with-fstring
+                self._logger.error(
+                    'repository file resource not found in path: %s' %
+                    self._location)
+            self._signature = _MISSING
+
+    def _watch(self):
+        watcher = FileWatcher(self._location)
+        try:
+            while not self._closed.is_set():
+                watcher.wait(self._reload_interval, self._closed)
+                if self._closed.is_set():
+                    break
+                try:
+                    self.sync()
+                except Exception as e:  # noqa
+                    # sourcery skip: replace-interpolation-with-fstring
+                    self._logger.error('Failed to reload repository file %s' % self._location, exc_info=e)
+        finally:
+            watcher.close()
 
     def initialized(self):
         return self._ready.is_set()
 
     def close(self):
+        self._closed.set()
         self._ready.clear()
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 class HitResult:
+    __slots__ = ('_hit', '_index', '_reason')
+
     def __init__(self, hit: bool, index: int = None, reason: str = None):
         self._hit = hit
         self._index = index
@@ -13,10 +13,9 @@
 # limitations under the License.
 
 from datetime import timedelta
-from typing import Union
-
-from requests.adapters import HTTPAdapter
+from typing import Optional, Union
 
+from featureprobe.internal import compression as _compression
 from featureprobe.internal.defaultable import defaultable
 
 
@@ -26,15 +25,34 @@ class HttpConfig:
                  pool_connections: int = 5,
                  pool_maxsize: int = 10,
                  conn_timeout: Union[timedelta, float] = timedelta(seconds=3),
-                 read_timeout: Union[timedelta, float] = timedelta(seconds=3)):
+                 read_timeout: Union[timedelta, float] = timedelta(seconds=3),
+                 compression: Optional[str] = None,
+                 compression_threshold: int = 1024):
+        """
+        :param compression: (optional) Content encoding of event upload bodies, ``'gzip'`` or ``'zstd'``
+            (requires ``zstandard``, falls back to ``'gzip'``). Bodies are sent as is if omitted.
+        :param compression_threshold: Bodies smaller than this many bytes are sent as is.
+        """
         self.conn_timeout = conn_timeout.total_seconds() \
             if isinstance(conn_timeout, timedelta) \
             else conn_timeout
         self.read_timeout = read_timeout.total_seconds() \
             if isinstance(read_timeout, timedelta) \
             else read_timeout
-        self.adapter = HTTPAdapter(
-            pool_maxsize=pool_maxsize,
-            pool_connections=pool_connections,
-            max_retries=0,
-        )
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._adapter = None
+        self.compression = _compression.resolve(compression)
+        self.compression_threshold = compression_threshold
+
+    @property
+    def adapter(self):
+        """Connection pool shared by the sessions of this config, ``requests`` is imported on first use."""
+        if self._adapter is None:
+            from requests.adapters import HTTPAdapter
+            self._adapter = HTTPAdapter(
+                pool_maxsize=self.pool_maxsize,
+                pool_connections=self.pool_connections,
+                max_retries=0,
+            )
+        return self._adapter
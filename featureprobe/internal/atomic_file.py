@@ -0,0 +1,62 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+
+
+class AtomicFile:
+    """Writes a file that readers only ever see complete.
+
+    Bytes go to a temporary file next to ``path``, which replaces ``path`` on :meth:`commit`.
+    Leaving the ``with`` block without committing removes the temporary file.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        directory, name = os.path.split(os.path.abspath(path))
+        fd, self._temp_path = tempfile.mkstemp(prefix='.%s.' % name, suffix='.tmp', dir=directory)
+        self._file = os.fdopen(fd, 'wb')
+        self._pending = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.discard()
+
+    def write(self, data: bytes):
+        self._file.write(data)
+
+    def commit(self):
+        if not self._pending:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._temp_path, self._path)
+            self._pending = False
+        finally:
+            self.discard()
+
+    def discard(self):
+        if not self._pending:
+            return
+        self._pending = False
+        self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,213 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact binary repository files, read through ``mmap`` without loading them as a whole.
+
+Layout, integers little-endian::
+
+  header      magic ``FPRB``, u32 format version, u64 offset and u64 length of the directory
+  id lists    u32 count, u32 offsets of count + 1 ends, UTF-8 strings sorted and distinct
+  records     one compact JSON object per toggle and segment
+  directory   JSON: debugUntilTime, version, and per key the version, prerequisites and record of toggles
+              and segments
+
+The objects of ``is one of`` and ``is not any of`` string conditions, which dominate large
+repositories as segment user ID lists, are written as id lists. Records refer to them by offset,
+they are searched in the mapped buffer and never decoded as a whole. Other parts of a record are
+decoded when its toggle or segment is first built.
+
+Files are mapped as they are, so processes reading the same file share one copy of it in the page
+cache. A file may only be replaced by renaming a complete file over it: mappings keep reading the
+inode they mapped, while a mapped file truncated or rewritten in place faults the processes reading
+it (``SIGBUS``). Rewriting a file in place, e.g. with ``cp``, is not supported.
+
+Convert a JSON repository with::
+
+  >>> from featureprobe.internal.binary_repository import convert
+  >>> convert('repo.json', 'repo.fpr')
+"""
+
+import mmap
+import struct
+from collections.abc import Set
+from typing import Dict, Iterator, Tuple, Union
+
+from featureprobe.internal import fast_json
+
+MAGIC = b'FPRB'
+FORMAT_VERSION = 1
+# lists with fewer objects stay inline in their record
+MIN_ID_LIST = 8
+
+_HEADER = struct.Struct('<4sIQQ')
+_U32 = struct.Struct('<I')
+_RANGE = struct.Struct('<II')
+_ID_PREDICATES = frozenset(['is one of', 'is not any of'])
+# condition objects moved to an id list
+_ID_LIST = '$ids'
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class SortedStrings(Set):
+    """A set of strings packed sorted in a buffer, binary searched without decoding it."""
+
+    __slots__ = ('_buffer', '_count', '_ends', '_blob')
+
+    def __init__(self, buffer: Buffer, offset: int):
+        self._buffer = buffer
+        self._count, = _U32.unpack_from(buffer, offset)
+        self._ends = offset + _U32.size
+        self._blob = self._ends + _U32.size * (self._count + 1)
+
+    def _encoded(self, index: int) -> bytes:
+        start, end = _RANGE.unpack_from(self._buffer, self._ends + _U32.size * index)
+        return self._buffer[self._blob + start:self._blob + end]
+
+    def __contains__(self, value) -> bool:
+        if not isinstance(value, str):
+            return False
+        try:
+            target = value.encode('utf-8')
+        except UnicodeEncodeError:
+            return False
+        # UTF-8 bytes sort in the same order as the code points they encode
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            item = self._encoded(middle)
+            if item < target:
+                low = middle + 1
+            elif item > target:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._encoded(index).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self):
+        return 'SortedStrings(%d)' % self._count
+
+
+class Record(dict):
+    """Directory entry of a toggle or segment, its full JSON object is decoded by :func:`decoded`."""
+
+    __slots__ = ('buffer', 'offset', 'length')
+
+
+def is_binary(prefix: bytes) -> bool:
+    return prefix[:len(MAGIC)] == MAGIC
+
+
+def decoded(json: dict) -> dict:
+    """The JSON object of a toggle or segment, decoded from its record if it is one."""
+    if not isinstance(json, Record):
+        return json
+    buffer = json.buffer
+    decoded_json = fast_json.loads(bytes(buffer[json.offset:json.offset + json.length]))
+    for condition in _conditions(decoded_json):
+        objects = condition.get('objects')
+        if isinstance(objects, dict) and _ID_LIST in objects:
+            condition['objects'] = SortedStrings(buffer, objects[_ID_LIST])
+    return decoded_json
+
+
+def read(buffer: Buffer) -> Tuple[Dict[str, Record], Dict[str, Record], int, int]:
+    """Reads toggles and segments records, the debug until time and the version of a binary repository."""
+    magic, version, offset, length = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError('not a binary repository')
+    if version != FORMAT_VERSION:
+        raise ValueError('unsupported binary repository format version %d' % version)
+    directory = fast_json.loads(bytes(buffer[offset:offset + length]))
+    toggles = {}
+    for key, (toggle_version, enabled, prerequisites, record_offset, record_length) \
+            in directory['toggles'].items():
+        record = toggles[key] = Record(key=key, version=toggle_version, enabled=enabled,
+                                       prerequisites=[{'key': k} for k in prerequisites])
+        record.buffer, record.offset, record.length = buffer, record_offset, record_length
+    segments = {}
+    for key, (segment_version, record_offset, record_length) in directory['segments'].items():
+        record = segments[key] = Record(key=key, version=segment_version)
+        record.buffer, record.offset, record.length = buffer, record_offset, record_length
+    return toggles, segments, directory.get('debugUntilTime'), directory.get('version')
+
+
+def encode(json: dict, min_id_list: int = MIN_ID_LIST) -> bytes:
+    """Encodes a JSON repository payload into the binary format."""
+    sections = []
+    position = _HEADER.size
+
+    def append(data: bytes) -> Tuple[int, int]:
+        nonlocal position
+        offset = position
+        sections.append(data)
+        position += len(data)
+        return offset, len(data)
+
+    def record(entry: dict) -> Tuple[int, int]:
+        entry = fast_json.loads(fast_json.dumps(entry))
+        for condition in _conditions(entry):
+            objects = condition.get('objects')
+            if (condition.get('type') == 'string' and condition.get('predicate') in _ID_PREDICATES
+                    and isinstance(objects, list) and len(objects) >= min_id_list
+                    and all(isinstance(o, str) for o in objects)):
+                try:
+                    condition['objects'] = {_ID_LIST: append(_id_list(objects))[0]}
+                except UnicodeEncodeError:
+                    pass
+        return append(fast_json.dumps(entry))
+
+    toggles = {}
+    for key, toggle in (json.get('toggles') or {}).items():
+        prerequisites = [p.get('key') for p in toggle.get('prerequisites') or []]
+        toggles[key] = [toggle.get('version'), toggle.get('enabled'), prerequisites, *record(toggle)]
+    segments = {}
+    for key, segment in (json.get('segments') or {}).items():
+        segments[key] = [segment.get('version'), *record(segment)]
+    directory_offset, directory_length = append(fast_json.dumps({
+        'debugUntilTime': json.get('debugUntilTime'), 'version': json.get('version'),
+        'toggles': toggles, 'segments': segments}))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, directory_offset, directory_length)
+    return b''.join([header] + sections)
+
+
+def _id_list(objects) -> bytes:
+    encoded = sorted({o.encode('utf-8') for o in objects})
+    ends, end = [0], 0
+    for item in encoded:
+        end += len(item)
+        ends.append(end)
+    return struct.pack('<%dI' % (len(ends) + 1), len(encoded), *ends) + b''.join(encoded)
+
+
+def _conditions(json: dict) -> Iterator[dict]:
+    for rule in json.get('rules') or []:
+        yield from rule.get('conditions') or []
+
+
+def convert(json_path: str, binary_path: str, min_id_list: int = MIN_ID_LIST):
+    """Converts a JSON repository file into a binary one."""
+    from featureprobe.internal.atomic_file import AtomicFile  # tempfile is not needed by import featureprobe
+    with open(json_path, 'rb') as f:
+        data = encode(fast_json.loads(f.read()), min_id_list)
+    with AtomicFile(binary_path) as f:
+        f.write(data)
+        f.commit()
@@ -0,0 +1,62 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import logging
+from collections import namedtuple
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+
+_GZIP_LEVEL = 6
+_logger = logging.getLogger('FeatureProbe-Http')
+
+TransferStats = namedtuple('TransferStats', ['requests', 'wire_bytes', 'body_bytes'])
+TransferStats.__doc__ = 'Bytes sent or received over HTTP, as transferred and before encoding or after decoding.'
+
+
+def accept_encoding() -> str:
+    """Content encodings responses can be decoded from."""
+    from urllib3.util.request import ACCEPT_ENCODING
+    return ACCEPT_ENCODING
+
+
+def resolve(encoding: Optional[str]) -> Optional[str]:
+    """Validates a configured body encoding, zstd falls back to gzip if ``zstandard`` is not installed."""
+    if encoding is None or encoding == GZIP:
+        return encoding
+    if encoding == ZSTD:
+        if zstandard is not None:
+            return ZSTD
+        _logger.warning('zstandard is not installed, falling back to gzip')
+        return GZIP
+    raise ValueError('unsupported compression: %s' % encoding)
+
+
+def encode(body: bytes, encoding: Optional[str], threshold: int) -> Tuple[bytes, Optional[str]]:
+    """Compresses a request body of at least ``threshold`` bytes.
+
+    :returns: The body to send and its ``Content-Encoding``, ``None`` if sent as is.
+    """
+    if encoding is None or len(body) < threshold:
+        return body, None
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor().compress(body), ZSTD
+    return gzip.compress(body, compresslevel=_GZIP_LEVEL), GZIP
@@ -0,0 +1,82 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""JSON decoding and encoding through the fastest installed backend.
+
+orjson, msgspec and ujson are used in that order if installed, the standard library otherwise.
+Input a backend rejects but the standard library accepts, such as integers beyond 64 bits,
+``NaN`` literals or non-string keys, falls back to the standard library.
+"""
+
+import json
+from collections import namedtuple
+from typing import Any, Callable, List, Union
+
+Backend = namedtuple('Backend', ['name', 'loads', 'dumps', 'errors'])
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode('utf-8')
+
+
+STDLIB = Backend('json', json.loads, _stdlib_dumps, ())
+
+
+def _orjson():
+    import orjson
+    return Backend('orjson', orjson.loads, orjson.dumps, (ValueError, TypeError))
+
+
+def _msgspec():
+    import msgspec.json
+    return Backend('msgspec', msgspec.json.decode, msgspec.json.encode,
+                   (msgspec.MsgspecError, ValueError, TypeError))
+
+
+def _ujson():
+    import ujson
+
+    def dumps(obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode('utf-8')
+
+    return Backend('ujson', ujson.loads, dumps, (ValueError, TypeError, OverflowError))
+
+
+def _available(loaders: List[Callable[[], Backend]]) -> List[Backend]:
+    backends = []
+    for loader in loaders:
+        try:
+            backends.append(loader())
+        except ImportError:
+            pass
+    return backends + [STDLIB]
+
+
+BACKENDS = _available([_orjson, _msgspec, _ujson])
+backend = BACKENDS[0]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    try:
+        return backend.loads(data)
+    except backend.errors:
+        return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encodes ``obj`` to UTF-8 JSON."""
+    try:
+        return backend.dumps(obj)
+    except backend.errors:
+        return _stdlib_dumps(obj)
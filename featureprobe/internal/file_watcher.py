@@ -0,0 +1,95 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import threading
+from typing import Optional
+
+_logger = logging.getLogger('FeatureProbe-Synchronizer')
+
+# inotify(7) events of the directory entries a file may be written or renamed over through
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+def _inotify(directory: str) -> Optional[int]:
+    """An inotify descriptor watching ``directory``, ``None`` where inotify is not available."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, 'inotify_add_watch')
+        return fd
+    except (AttributeError, OSError) as e:
+        # sourcery skip: replace-interpolation-with-fstring
+        _logger.debug('inotify is not available for %s, falling back to polling' % directory, exc_info=e)
+        return None
+
+
+class FileWatcher:
+    """Waits for a file to possibly change.
+
+    On Linux, waits end as soon as an entry of the file's directory is written, created or renamed.
+    Elsewhere, and in case anything was missed, waits end after their timeout. Either way the caller
+    compares the file with what it last read.
+    """
+
+    def __init__(self, path: str):
+        self._fd = _inotify(os.path.dirname(os.path.abspath(path)))
+
+    @property
+    def inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait(self, timeout: float, stopped: threading.Event):
+        """Returns once the file may have changed, after ``timeout`` seconds, or when ``stopped`` is set.
+
+        With inotify, ``stopped`` is only noticed at the next change or timeout.
+        """
+        if self._fd is None:
+            stopped.wait(timeout)
+            return
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if readable:
+            self._drain()
+
+    def _drain(self):
+        # only whether something happened matters, not which events
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
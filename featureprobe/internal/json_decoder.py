@@ -12,16 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+from featureprobe.internal import fast_json
 
 
 def json_decoder(func):
-    def wrapper(cls, json_):
+    def wrapper(cls, json_, *args, **kwargs):
         if json_ is None:
             return None
         if isinstance(json_, dict):
-            return func(cls, json_)
+            return func(cls, json_, *args, **kwargs)
 
-        return func(cls, json.loads(json_))
+        return func(cls, fast_json.loads(json_), *args, **kwargs)
 
     return wrapper
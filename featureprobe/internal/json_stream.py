@@ -0,0 +1,117 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+_WHITESPACE = ' \t\n\r'
+_SECTIONS = ('toggles', 'segments')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Decodes JSON values one at a time from chunks of UTF-8 bytes, keeping only unparsed text."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _more(self) -> bool:
+        # at least doubles what is left to parse, so a value spanning many chunks is parsed a few times only
+        pending = self._buffer[self._pos:]
+        wanted = max(len(pending), 1)
+        parts = [pending]
+        read = 0
+        while read < wanted and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._text.decode(b'', final=True)
+            else:
+                text = self._text.decode(chunk)
+            parts.append(text)
+            read += len(text)
+        self._buffer = ''.join(parts)
+        self._pos = 0
+        return read > 0
+
+    def peek(self) -> str:
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._more():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError('Expecting %r' % char, self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+                # a number ending with the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._more()
+
+    def members(self) -> Iterator[str]:
+        """Iterates keys of an object, the caller reads each value before the next key."""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError('Expecting property name', self._buffer, self._pos)
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect('}')
+            return
+
+
+def iter_repository(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """Parses a repository payload incrementally.
+
+    Yields ``(section, key, value)`` for every toggle and segment, where section is ``'toggles'`` or
+    ``'segments'``, and ``(name, None, value)`` for any other top level member. Only one entry is
+    decoded at a time, the payload is never held in memory as a whole.
+    """
+    reader = _Reader(chunks)
+    for name in reader.members():
+        if name in _SECTIONS and reader.peek() == '{':
+            for key in reader.members():
+                yield name, key, reader.value()
+        else:
+            yield name, None, reader.value()
+    if reader.peek():
+        raise json.JSONDecodeError('Extra data', reader._buffer, reader._pos)  # noqa
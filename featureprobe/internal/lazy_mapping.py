@@ -0,0 +1,108 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Mapping, Optional
+
+# marks values whose build failed
+_FAILED = object()
+
+
+class LazyMapping(Mapping):
+    """A read-only mapping of raw JSON objects, each built into its value on first access.
+
+    A value is built once even if several threads read it at the same time, reads of values
+    already built take no lock. A raw object that fails to build is reported once, then reads as
+    missing through ``get`` and ``[]``.
+    """
+
+    _logger = logging.getLogger('FeatureProbe-Evaluator')
+
+    def __init__(self,
+                 raw: Dict[str, dict],
+                 build: Callable[[str, dict], Any],
+                 built: Optional[Dict[str, Any]] = None,
+                 failed: Iterable[str] = ()):
+        self._raw = raw
+        self._build = build
+        self._built = dict(built or {})
+        self._built.update(dict.fromkeys(failed, _FAILED))
+        self._lock = threading.Lock()
+
+    @property
+    def raw(self) -> Dict[str, dict]:
+        return self._raw
+
+    @property
+    def build(self) -> Callable[[str, dict], Any]:
+        return self._build
+
+    def built(self) -> Dict[str, Any]:
+        """Values built so far, keyed like the mapping."""
+        with self._lock:
+            return {key: value for key, value in self._built.items() if value is not _FAILED}
+
+    def forget(self, keys: Iterable[str]):
+        """Drops values built so far, to build them again on next access.
+
+        Only for a mapping not read by anyone yet, such as one being refreshed into.
+        """
+        with self._lock:
+            for key in keys:
+                self._built.pop(key, None)
+
+    def failed(self) -> FrozenSet[str]:
+        """Keys of the raw objects which failed to build so far."""
+        with self._lock:
+            return frozenset(key for key, value in self._built.items() if value is _FAILED)
+
+    def get(self, key: str, default=None):
+        value = self._built.get(key)
+        if value is None:
+            raw = self._raw.get(key)
+            if raw is None:
+                return default
+            with self._lock:
+                value = self._built.get(key)
+                if value is None:
+                    value = self._built[key] = self._build_or_fail(key, raw)
+        return default if value is _FAILED else value
+
+    def _build_or_fail(self, key: str, raw: dict):
+        try:
+            return self._build(key, raw)
+        except Exception as e:  # noqa
+            # sourcery skip: replace-interpolation-with-fstring
+            self._logger.error('Failed to build \'%s\', it is treated as missing' % key, exc_info=e)
+            return _FAILED
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def copy(self) -> "LazyMapping":
+        # immutable, values built through a copy are shared with this mapping
+        return self
@@ -0,0 +1,107 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterable, List
+
+
+class AffixMatcher:
+    """Tests whether a string starts (or ends) with any of the patterns.
+
+    Patterns are bucketed by length, so a test costs one hash lookup per
+    distinct pattern length no longer than the target, regardless of how many patterns there are.
+    """
+
+    __slots__ = ('_patterns', '_lengths', '_suffix')
+
+    def __init__(self, patterns: Iterable[str], suffix: bool = False):
+        self._patterns = frozenset(patterns)
+        self._lengths = sorted({len(p) for p in self._patterns})
+        self._suffix = suffix
+
+    def match(self, target: str) -> bool:
+        patterns = self._patterns
+        size = len(target)
+        for length in self._lengths:
+            if length > size:
+                return False
+            if (target[size - length:] if self._suffix else target[:length]) in patterns:
+                return True
+        return False
+
+
+class SubstringMatcher:
+    """Tests whether a string contains any of the patterns.
+
+    Few patterns are scanned one by one, larger pattern sets are compiled into an
+    Aho-Corasick automaton, so a test costs about the length of the target string.
+    """
+
+    __slots__ = ('_patterns', '_goto', '_fail', '_output')
+
+    AUTOMATON_THRESHOLD = 32
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = tuple(dict.fromkeys(patterns))
+        if len(patterns) < self.AUTOMATON_THRESHOLD:
+            self._patterns = patterns
+            self._goto = None
+        else:
+            self._patterns = None
+            self._build(patterns)
+
+    def _build(self, patterns: Iterable[str]):
+        goto = [{}]  # type: List[dict]
+        output = [False]
+        for pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append(False)
+                state = nxt
+            output[state] = True
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:  # breadth first, queue grows while iterating
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(ch, 0) if state else 0
+                output[nxt] = output[nxt] or output[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def match(self, target: str) -> bool:
+        if self._goto is None:
+            return any(p in target for p in self._patterns)
+
+        goto, fail, output = self._goto, self._fail, self._output
+        if output[0]:
+            return True
+        state = 0
+        for ch in target:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                return True
+        return False
@@ -0,0 +1,106 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import namedtuple
+from typing import Callable
+
+CallStats = namedtuple('CallStats', ['requested', 'executed', 'coalesced'])
+CallStats.__doc__ = 'Calls requested, runs of the function, and requests served by a run made for another.'
+
+
+class SingleFlight:
+    """Runs a function at most once at a time, requests made meanwhile share one queued run.
+
+    A call returns once a run started after it was made has completed, so its caller sees the
+    effects of that run without every caller running the function.
+    """
+
+    def __init__(self, func: Callable[[], None]):
+        self._func = func
+        self._condition = threading.Condition()
+        self._running = False
+        self._queued = False
+        self._started = 0
+        self._completed = 0
+        self._requested = 0
+        self._executed = 0
+        self._timer = None
+        self._closed = False
+
+    def __call__(self):
+        with self._condition:
+            self._requested += 1
+            target = self._started + 1
+            if self._running:
+                self._queued = True
+                while self._completed < target:
+                    self._condition.wait()
+                return
+            self._running = True
+        self._run()
+
+    def _run(self):
+        error = None
+        while True:
+            with self._condition:
+                self._started += 1
+                self._executed += 1
+                self._queued = False
+            try:
+                self._func()
+            except Exception as e:  # noqa
+                # raised once the requests queued meanwhile are served
+                error = e
+            with self._condition:
+                self._completed = self._started
+                self._condition.notify_all()
+                if not self._queued:
+                    self._running = False
+                    break
+        if error is not None:
+            raise error
+
+    def request(self, delay: float):
+        """Runs the function ``delay`` seconds from now, without waiting for it.
+
+        Requests made before then are served by that same run.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._requested += 1
+                return
+            self._timer = threading.Timer(delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._condition:
+            self._timer = None
+        self()
+
+    @property
+    def stats(self) -> CallStats:
+        with self._condition:
+            return CallStats(self._requested, self._executed, self._requested - self._executed)
+
+    def close(self):
+        """Cancels the pending delayed run, later requests are ignored."""
+        with self._condition:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
@@ -12,12 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+def _attributes(obj):
+    """Instance attributes, whether kept in ``__dict__`` or in ``__slots__``."""
+    attrs = dict(getattr(obj, '__dict__', {}))
+    for klass in type(obj).__mro__:
+        for name in getattr(klass, '__slots__', ()):
+            if hasattr(obj, name):
+                attrs.setdefault(name, getattr(obj, name))
+    return attrs.items()
+
+
 def stringifiable(cls):
     """Experimental, unusable yet"""
 
     def __str__(self):
         attrs = sorted(filter(lambda attr: not callable(attr[1]),
-                              self.__dict__.items()))
+                              _attributes(self)))
 
         return '%s(%s)' % (
             cls.__name__,
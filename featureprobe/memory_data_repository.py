@@ -12,11 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import threading
 import time
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Mapping, Optional, TYPE_CHECKING
 
 from featureprobe.data_repository import DataRepository
-from featureprobe.model.repository import Repository
+from featureprobe.model.repository import Repository, RepositoryChanges
+from featureprobe.repository_snapshot import EMPTY_SNAPSHOT, RepositorySnapshot
 
 if TYPE_CHECKING:
     from featureprobe.context import Context
@@ -25,43 +28,78 @@ if TYPE_CHECKING:
 
 
 class MemoryDataRepository(DataRepository):
+    """Keeps the latest :obj:`RepositorySnapshot` in memory.
+
+    Refreshes are serialized, reads are lock free: a snapshot is published by replacing one
+    reference once it is fully built, and is never modified afterwards.
+    """
+
+    _logger = logging.getLogger('FeatureProbe-Synchronizer')
+
     def __init__(self,
                  data: Repository,
                  initialized: bool,
                  updated_timestamp: int):
-        self._data = data
+        self._snapshot = RepositorySnapshot.of(data.compile(), 1) if data is not None else EMPTY_SNAPSHOT
         self._initialized = initialized
         self._updated_timestamp = updated_timestamp
+        self._refresh_lock = threading.Lock()
 
     @classmethod
     def from_context(cls, context: "Context") -> DataRepository:
         return cls(data=None, initialized=False, updated_timestamp=0)  # noqa
 
-    def refresh(self, repo: Repository):
+    def refresh(self, repo: Repository) -> Optional[RepositoryChanges]:
+        """Publishes a new snapshot, toggles and segments kept from the current one are not recompiled.
+
+        :returns: What changed since the current snapshot, ``None`` if ``repo`` was not applied.
+        """
         if repo is not None \
                 and repo.toggles is not None \
                 and repo.segments is not None:
-            self._data = Repository(repo.toggles.copy(), repo.segments.copy(), repo.debug_until_time)
-            self._initialized = True
-            self._updated_timestamp = int(time.time() * 1000)
+            with self._refresh_lock:
+                previous = self._snapshot if self._initialized else None
+                data = Repository(
+                    repo.toggles.copy(),
+                    repo.segments.copy(),
+                    repo.debug_until_time)
+                changes = data.changes_since(previous)
+                if changes or previous is None or previous.debug_until_time != data.debug_until_time:
+                    # toggles and segments were copied into data, which is not shared
+                    self._snapshot = RepositorySnapshot.of(data.compile(changes), self._snapshot.version + 1,
+                                                           copy=False)
+                self._initialized = True
+                self._updated_timestamp = int(time.time() * 1000)
+            if changes:
+                # sourcery skip: replace-interpolation-with-fstring
+                self._logger.debug(
+                    'Repository refreshed, toggles added: %s, updated: %s, removed: %s, '
+                    'segments added: %s, updated: %s, removed: %s' % changes)
+            return changes
+        return None
+
+    @property
+    def snapshot(self) -> RepositorySnapshot:
+        return self._snapshot
 
     def get_toggle(self, key: str) -> Optional["Toggle"]:
-        return self._data.toggles.get(key) if self._initialized else None
+        return self._snapshot.toggles.get(key)
 
-    def get_all_toggle(self) -> Dict[str, "Toggle"]:
-        return self._data.toggles if self._initialized else {}
+    def get_all_toggle(self) -> Mapping[str, "Toggle"]:
+        return self._snapshot.toggles
 
     def get_segment(self, key: str) -> Optional["Segment"]:
-        return self._data.segments.get(key) if self._initialized else None
+        return self._snapshot.segments.get(key)
 
-    def get_debug_until_time(self) -> Optional["int"]: 
-        return self._data.debug_until_time if self._initialized else None
+    def get_debug_until_time(self) -> Optional["int"]:
+        return self._snapshot.debug_until_time
 
-    def get_all_segment(self) -> Dict[str, "Toggle"]:
-        return self._data.segments if self._initialized else {}
+    def get_all_segment(self) -> Mapping[str, "Segment"]:
+        return self._snapshot.segments
 
     def initialized(self) -> bool:
         return self._initialized
 
     def close(self):
-        self._data = None
+        with self._refresh_lock:
+            self._snapshot = RepositorySnapshot(self._snapshot.version + 1)
@@ -13,9 +13,8 @@
 # limitations under the License.
 
 import logging
-import re
 import time
-from typing import List, Dict, Union, Optional, TYPE_CHECKING
+from typing import Callable, List, Dict, Union, Optional, TYPE_CHECKING
 
 from featureprobe.internal.empty_str import empty_str
 from featureprobe.internal.json_decoder import json_decoder
@@ -24,12 +23,15 @@ from featureprobe.internal.stringifiable import stringifiable
 from featureprobe.model.predicate import ConditionType, Predicate
 
 if TYPE_CHECKING:
+    from featureprobe.evaluation_memo import EvaluationMemo
     from featureprobe.model.segment import Segment
     from featureprobe.user import User
 
 
 @stringifiable
 class Condition:
+    __slots__ = ('_subject', '_type', '_predicate', '_objects', '_match')
+
     _logger = logging.getLogger('FeatureProbe-Evaluator')
 
     def __init__(self,
@@ -52,6 +54,7 @@ class Condition:
         else:
             self._predicate = None
         self._objects = objects or []
+        self._match = None
 
     @classmethod
     @json_decoder
@@ -62,97 +65,116 @@ class Condition:
         objects = json.get('objects')
         return cls(subject, type_, predicate, objects)
 
-    def match_objects(self, user: "User",
-                      segments: Optional[Dict[str, "Segment"]]) -> bool:
-        if self._type is None or self._predicate is None:
-            return False
-
-        matcher_proc = {
-            ConditionType.STRING: self._match_string_condition,
-            ConditionType.SEGMENT: self._match_segment_condition,
-            ConditionType.DATETIME: self._match_datetime_condition,
-            ConditionType.NUMBER: self._match_number_condition,
-            ConditionType.SEMVER: self._match_semver_condition,
-        }
-
-        match = matcher_proc.get(self._type, Condition._match_dummy_condition)
-        return match(user=user, segments=segments)
-
-    def _match_string_condition(self, user: "User", **_) -> bool:
-        subject_val = user[self._subject]
-        if empty_str(subject_val):
-            return False
-        try:
-            return self._predicate.matcher(subject_val, self._objects)
-        except re.error as e:
-            self._logger.error('Invalid regular expression', exc_info=e)
-            return False
+    def compile(self) -> "Condition":
+        """Binds condition type and predicate into a matcher ahead of evaluation.
 
-    def _match_segment_condition(
-            self, user: "User", segments: Dict[str, "Segment"], **_) -> bool:
-        return self._predicate.matcher(user, segments or {}, self._objects)
+        Objects are parsed into typed operands here, so invalid objects are reported once per compile.
+        """
+        self._match = self._build_matcher()
+        return self
 
-    def _match_datetime_condition(self, user: "User", **_):
-        cv = user[self._subject] or time.time()
-        try:
-            cv = int(cv)
-        except ValueError:
+    def match_objects(self, user: "User",
+                      segments: Optional[Dict[str, "Segment"]],
+                      memo: Optional["EvaluationMemo"] = None) -> bool:
+        if self._match is None:
+            self.compile()
+        return self._match(user, segments, memo)
+
+    def _build_matcher(self) -> Callable[
+            ["User", Optional[Dict[str, "Segment"]], Optional["EvaluationMemo"]], bool]:
+        if self._type is None or self._predicate is None:
+            return Condition._match_dummy_condition
+
+        matcher_builder = {
+            ConditionType.STRING: self._string_matcher,
+            ConditionType.SEGMENT: self._segment_matcher,
+            ConditionType.DATETIME: self._datetime_matcher,
+            ConditionType.NUMBER: self._number_matcher,
+            ConditionType.SEMVER: self._semver_matcher,
+        }.get(self._type)
+        if matcher_builder is None:
+            return Condition._match_dummy_condition
+
+        operands, invalid = self._predicate.parse(self._objects or [])
+        if invalid is not None:
             # sourcery skip: replace-interpolation-with-fstring
             self._logger.error(
-                'User attribute type mismatch. attribute value: \'%s\', target type int' %
-                cv)
-            return False
+                'Met an object that cannot be parsed as %s in Condition.objects: \'%s\'' %
+                (self._type, invalid))
+        if operands is None:
+            return Condition._match_dummy_condition
+        return matcher_builder(
+            self._subject, self._predicate.matcher, operands, self._logger)
 
-        try:
-            return self._predicate.matcher(cv, self._objects)
-        except ValueError as e:
-            self._logger.error(
-                'Met a string that cannot be parsed to int in Condition.objects',
-                exc_info=e)
-            return False
-
-    def _match_number_condition(self, user: "User", **_):
-        cv = user[self._subject]
-        if not cv:
-            return False
-        try:
-            cv = float(cv)
-        except ValueError:
-            # sourcery skip: replace-interpolation-with-fstring
-            self._logger.error(
-                'User attribute type mismatch. attribute value: \'%s\', target type float' %
-                cv)
-            return False
+    @staticmethod
+    def _string_matcher(subject, predicate, operands, logger):
+        def match(user: "User", *_) -> bool:
+            subject_val = user.attrs.get(subject)
+            if empty_str(subject_val):
+                return False
+            return predicate(subject_val, operands)
 
-        try:
-            return self._predicate.matcher(cv, self._objects)
-        except ValueError as e:
-            self._logger.error(
-                'Met a string that cannot be parsed to float in Condition.objects',
-                exc_info=e)
-            return False
+        return match
 
-    def _match_semver_condition(self, user: "User", **_):
-        cv = user[self._subject]
-        try:
-            cv = SemVer(cv)
-        except ValueError as e:
-            # sourcery skip: replace-interpolation-with-fstring
-            self._logger.error(
-                'Invalid user attribute. attribute value: \'%s\', target type semver' %
-                cv, exc_info=e)
-            return False
+    @staticmethod
+    def _segment_matcher(subject, predicate, operands, logger):
+        def match(user: "User", segments: Dict[str, "Segment"], memo: "EvaluationMemo") -> bool:
+            return predicate(user, segments or {}, operands, memo)
 
-        try:
-            return self._predicate.matcher(cv, self._objects)
-        except ValueError as e:
-            self._logger.error(
-                'Met a string that cannot be parsed to semver in Condition.objects',
-                exc_info=e)
-            return False
+        return match
+
+    @staticmethod
+    def _datetime_matcher(subject, predicate, operands, logger):
+        def match(user: "User", _, memo: Optional["EvaluationMemo"]) -> bool:
+            cv = user.attrs.get(subject) or (memo.now if memo is not None else time.time())
+            try:
+                cv = int(cv)
+            except ValueError:
+                # sourcery skip: replace-interpolation-with-fstring
+                logger.error(
+                    'User attribute type mismatch. attribute value: \'%s\', target type int' %
+                    cv)
+                return False
+            return predicate(cv, operands)
+
+        return match
+
+    @staticmethod
+    def _number_matcher(subject, predicate, operands, logger):
+        def match(user: "User", *_) -> bool:
+            cv = user.attrs.get(subject)
+            if not cv:
+                return False
+            try:
+                cv = float(cv)
+            except ValueError:
+                # sourcery skip: replace-interpolation-with-fstring
+                logger.error(
+                    'User attribute type mismatch. attribute value: \'%s\', target type float' %
+                    cv)
+                return False
+            return predicate(cv, operands)
+
+        return match
+
+    @staticmethod
+    def _semver_matcher(subject, predicate, operands, logger):
+        def match(user: "User", *_) -> bool:
+            cv = user.attrs.get(subject)
+            try:
+                cv = SemVer(cv)
+            except ValueError as e:
+                # sourcery skip: replace-interpolation-with-fstring
+                logger.error(
+                    'Invalid user attribute. attribute value: \'%s\', target type semver' %
+                    cv, exc_info=e)
+                return False
+            return predicate(cv, operands)
+
+        return match
 
     @staticmethod
-    def _match_dummy_condition(**_):
+    def _match_dummy_condition(*_):
         return False
 
     @property
@@ -162,6 +184,7 @@ class Condition:
     @type.setter
     def type(self, value: Union[ConditionType, str]):
         self._type = ConditionType(value)
+        self._match = None
 
     @property
     def subject(self) -> str:
@@ -170,6 +193,7 @@ class Condition:
     @subject.setter
     def subject(self, value: str):
         self._subject = value
+        self._match = None
 
     @property
     def predicate(self) -> Predicate:
@@ -181,6 +205,7 @@ class Condition:
             self._predicate = value
         elif isinstance(value, str) and self._type is not None:
             self._predicate = self._type.predicates(value)
+        self._match = None
 
     @property
     def objects(self) -> List[str]:
@@ -189,3 +214,4 @@ class Condition:
     @objects.setter
     def objects(self, value: List[str]):
         self._objects = value
+        self._match = None
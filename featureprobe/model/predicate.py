@@ -13,13 +13,87 @@
 # limitations under the License.
 
 import re
+from collections.abc import Set
 from enum import Enum
+from typing import AbstractSet, Callable, List, Optional, Tuple
 
+from featureprobe.internal.patterns import AffixMatcher, SubstringMatcher
 from featureprobe.internal.semver import SemVer
 
 
+def _raw(objects: List[str]) -> Tuple[tuple, Optional[str]]:
+    return tuple(objects), None
+
+
+def _hashed(objects: List[str]) -> Tuple[AbstractSet[str], Optional[str]]:
+    # sets such as the id lists of binary repositories are searched as they are
+    if isinstance(objects, Set):
+        return objects, None
+    try:
+        return frozenset(objects), None
+    except TypeError:
+        # unhashable objects, such as nested lists, can never equal a target and are left out
+        hashable, invalid = [], None
+        for o in objects:
+            try:
+                hash(o)
+                hashable.append(o)
+            except TypeError:
+                if invalid is None:
+                    invalid = o
+        return frozenset(hashable), invalid
+
+
+def _parse_any(parse: Callable):
+    """Parses objects for predicates matching any of them.
+
+    Parsing stops at the first invalid object, objects before it still take part in matching.
+    """
+
+    def parser(objects: List[str]) -> Tuple[tuple, Optional[str]]:
+        operands = []
+        for o in objects:
+            try:
+                operands.append(parse(o))
+            except (ValueError, TypeError, re.error):
+                return tuple(operands), o
+        return tuple(operands), None
+
+    return parser
+
+
+def _parse_all(parse: Callable):
+    """Parses objects for predicates matching all of them.
+
+    A single invalid object makes the predicate never match, operands are ``None`` in that case.
+    """
+    parse_any = _parse_any(parse)
+
+    def parser(objects: List[str]) -> Tuple[Optional[tuple], Optional[str]]:
+        operands, invalid = parse_any(objects)
+        return (None, invalid) if invalid is not None else (operands, None)
+
+    return parser
+
+
+def _string(o) -> str:
+    if not isinstance(o, str):
+        raise TypeError('expected a string, got %s' % type(o).__name__)
+    return o
+
+
+def _indexed(parser: Callable, index: Callable):
+    """Builds an index (e.g. a multi-pattern matcher) over operands produced by ``parser``."""
+
+    def indexed_parser(objects: List[str]) -> Tuple[object, Optional[str]]:
+        operands, invalid = parser(objects)
+        return (index(operands) if operands is not None else None), invalid
+
+    return indexed_parser
+
+
 class Predicate(str, Enum):
-    def __new__(cls, value, matcher=None):
+    def __new__(cls, value, matcher=None, parser=None):
         if isinstance(value, cls):
             return value
         if matcher is None:
@@ -28,98 +102,113 @@ class Predicate(str, Enum):
         obj = str.__new__(cls, value)
         obj._value_ = value
         obj.matcher = matcher
+        obj.parser = parser or _raw
         return obj
 
     def __str__(self):
         return self.value
 
+    def parse(self, objects: List[str]) -> Tuple[Optional[tuple], Optional[str]]:
+        """Parses condition objects into the operands accepted by :attr:`matcher`.
+
+        :returns: Parsed operands, or ``None`` if the predicate can never match,
+                  along with the first invalid object if there is one.
+        """
+        return self.parser(objects)
+
 
 class StringPredicate(Predicate):
     IS_ONE_OF = 'is one of', lambda target, objects: \
-        target in objects
+        target in objects, _hashed
 
     ENDS_WITH = 'ends with', lambda target, objects: \
-        any(target.endswith(o) for o in objects)
+        objects.match(target), \
+        _indexed(_parse_any(_string), lambda o: AffixMatcher(o, suffix=True))
 
     STARTS_WITH = 'starts with', lambda target, objects: \
-        any(target.startswith(o) for o in objects)
+        objects.match(target), \
+        _indexed(_parse_any(_string), AffixMatcher)
 
     CONTAINS = 'contains', lambda target, objects: \
-        any(o in target for o in objects)
+        objects.match(target), \
+        _indexed(_parse_any(_string), SubstringMatcher)
 
     MATCHES_REGEX = 'matches regex', lambda target, objects: \
-        any(re.search(pattern=o, string=target) for o in objects)
+        any(o.search(target) for o in objects), _parse_any(re.compile)
 
     IS_NOT_ANY_OF = 'is not any of', lambda target, objects: \
-        target not in objects
+        target not in objects, _hashed
 
     DOES_NOT_END_WITH = 'does not end with', lambda target, objects: \
-        all(not target.endswith(o) for o in objects)
+        not objects.match(target), \
+        _indexed(_parse_all(_string), lambda o: AffixMatcher(o, suffix=True))
 
     DOES_NOT_START_WITH = 'does not start with', lambda target, objects: \
-        all(not target.startswith(o) for o in objects)
+        not objects.match(target), \
+        _indexed(_parse_all(_string), AffixMatcher)
 
     DOES_NOT_CONTAIN = 'does not contain', lambda target, objects: \
-        all(o not in target for o in objects)
+        not objects.match(target), \
+        _indexed(_parse_all(_string), SubstringMatcher)
 
     DOES_NOT_MATCH_REGEX = 'does not match regex', lambda target, objects: \
-        all(not re.search(pattern=o, string=target) for o in objects)
+        all(not o.search(target) for o in objects), _parse_all(re.compile)
 
 
 class SegmentPredicate(Predicate):
-    IS_IN = 'is in', lambda user, segments, objects: \
-        any(segments.get(s).contains(user, segments) for s in objects)
+    IS_IN = 'is in', lambda user, segments, objects, memo=None: \
+        any(segments.get(s).contains(user, segments, memo) for s in objects)
 
-    IS_NOT_IN = 'is not in', lambda user, segments, objects: \
-        all(not segments.get(s).contains(user, segments) for s in objects)
+    IS_NOT_IN = 'is not in', lambda user, segments, objects, memo=None: \
+        all(not segments.get(s).contains(user, segments, memo) for s in objects)
 
 
 class DatetimePredicate(Predicate):
     AFTER = 'after', lambda target, objects: \
-        any(target >= int(o) for o in objects)
+        any(target >= o for o in objects), _parse_any(int)
 
     BEFORE = 'before', lambda target, objects: \
-        any(target < int(o) for o in objects)
+        any(target < o for o in objects), _parse_any(int)
 
 
 class NumberPredicate(Predicate):
     EQUAL = '=', lambda custom_value, objects: \
-        any(custom_value == float(o) for o in objects)
+        any(custom_value == o for o in objects), _parse_any(float)
 
     NOT_EQUAL = '!=', lambda custom_value, objects: \
-        all(custom_value != float(o) for o in objects)
+        all(custom_value != o for o in objects), _parse_all(float)
 
     GREATER_THAN = '>', lambda custom_value, objects: \
-        any(custom_value > float(o) for o in objects)
+        any(custom_value > o for o in objects), _parse_any(float)
 
     GREATER_OR_EQUAL = '>=', lambda custom_value, objects: \
-        any(custom_value >= float(o) for o in objects)
+        any(custom_value >= o for o in objects), _parse_any(float)
 
     LESS_THAN = '<', lambda custom_value, objects: \
-        any(custom_value < float(o) for o in objects)
+        any(custom_value < o for o in objects), _parse_any(float)
 
     LESS_OR_EQUAL = '<=', lambda custom_value, objects: \
-        any(custom_value <= float(o) for o in objects)
+        any(custom_value <= o for o in objects), _parse_any(float)
 
 
 class SemverPredicate(Predicate):
     EQUAL = '=', lambda custom_value, objects: \
-        any(custom_value == SemVer(o) for o in objects)
+        any(custom_value == o for o in objects), _parse_any(SemVer)
 
     NOT_EQUAL = '!=', lambda custom_value, objects: \
-        all(custom_value != SemVer(o) for o in objects)
+        all(custom_value != o for o in objects), _parse_all(SemVer)
 
     GREATER_THAN = '>', lambda custom_value, objects: \
-        any(custom_value > SemVer(o) for o in objects)
+        any(custom_value > o for o in objects), _parse_any(SemVer)
 
     GREATER_OR_EQUAL = '>=', lambda custom_value, objects: \
-        any(custom_value >= SemVer(o) for o in objects)
+        any(custom_value >= o for o in objects), _parse_any(SemVer)
 
     LESS_THAN = '<', lambda custom_value, objects: \
-        any(custom_value < SemVer(o) for o in objects)
+        any(custom_value < o for o in objects), _parse_any(SemVer)
 
     LESS_OR_EQUAL = '<=', lambda custom_value, objects: \
-        any(custom_value <= SemVer(o) for o in objects)
+        any(custom_value <= o for o in objects), _parse_any(SemVer)
 
 
 class ConditionType(str, Enum):
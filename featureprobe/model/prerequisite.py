@@ -11,10 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
 from featureprobe.internal.json_decoder import json_decoder
 
 
 class Prerequisite:
+    __slots__ = ('_key', '_value')
+
     def __init__(self, key: str, value):
         self._key = key
         self._value = value
@@ -38,3 +43,38 @@ class Prerequisite:
 class PrerequisiteError(RuntimeError):
     def __init__(self, message):
         super().__init__(message)
+
+
+def find_prerequisite_cycles(graph: Dict[str, List[str]]) \
+        -> Tuple[Set[str], List[Tuple[str, str]]]:
+    """Finds toggles whose evaluation would reach a cycle of prerequisites.
+
+    :param graph: Keys of the prerequisites each toggle evaluates, none for disabled toggles
+                  since they never evaluate their prerequisites and so break cycles.
+    :returns: Keys of toggles on or depending on a prerequisite cycle,
+              and ``(toggle key, prerequisite key)`` pairs referring to toggles not exist.
+    """
+    missing = []
+    requires = {}
+    required_by = {key: [] for key in graph}
+    for key, prerequisite_keys in graph.items():
+        keys = set()
+        for prerequisite_key in prerequisite_keys:
+            if prerequisite_key in graph:
+                keys.add(prerequisite_key)
+            else:
+                missing.append((key, prerequisite_key))
+        requires[key] = len(keys)
+        for k in keys:
+            required_by[k].append(key)
+
+    # toggles whose prerequisites are all resolved are peeled off, those left are on or behind a cycle
+    ready = deque(key for key, count in requires.items() if count == 0)
+    while ready:
+        for dependent in required_by[ready.popleft()]:
+            requires[dependent] -= 1
+            if requires[dependent] == 0:
+                ready.append(dependent)
+
+    cyclic = {key for key, count in requires.items() if count > 0}
+    return cyclic, missing
@@ -12,36 +12,299 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict
+import copy
+import logging
+from collections import namedtuple
+from typing import Dict, Iterable, List, Mapping, Optional, TYPE_CHECKING, Union
 
+from featureprobe.internal import binary_repository
 from featureprobe.internal.json_decoder import json_decoder
+from featureprobe.internal.json_stream import iter_repository
+from featureprobe.internal.lazy_mapping import LazyMapping
+from featureprobe.model.prerequisite import find_prerequisite_cycles
 from featureprobe.model.segment import Segment
 from featureprobe.model.toggle import Toggle
 
+if TYPE_CHECKING:
+    from featureprobe.repository_snapshot import RepositorySnapshot
+
+
+class RepositoryChanges(namedtuple('RepositoryChanges', [
+        'added_toggles', 'updated_toggles', 'removed_toggles',
+        'added_segments', 'updated_segments', 'removed_segments'])):
+    """Keys of the toggles and segments changed by a repository refresh."""
+    __slots__ = ()
+
+    def __bool__(self):
+        return any(self)
+
+
+def _entries(mapping: Mapping) -> Mapping:
+    # lazy values are built from their raw objects, which identify them without building them
+    return mapping.raw if isinstance(mapping, LazyMapping) else mapping
+
+
+def _diff(previous: Mapping, current: Mapping):
+    previous, current = _entries(previous), _entries(current)
+    added, updated = [], []
+    for key, value in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.append(key)
+        elif old is not value:
+            updated.append(key)
+    return tuple(added), tuple(updated), tuple(key for key in previous if key not in current)
+
+
+def _reuse(previous: dict, key: str, json: dict):
+    # objects are kept only when the payload carries a version equal to theirs
+    old = previous.get(key)
+    version = json.get('version')
+    if old is not None and version is not None and old.version == version:
+        return old
+    return None
+
+
+def _reuse_lazy(previous: Mapping, json: Dict[str, dict], build) -> LazyMapping:
+    # raw objects with an unchanged version are kept along with the values built from them,
+    # or the failure to build them
+    if not isinstance(previous, LazyMapping):
+        return LazyMapping(json, build)
+    previous_raw = previous.raw
+    previous_built = previous.built()
+    previous_failed = previous.failed()
+    raw, built, failed = {}, {}, []
+    for key, value in json.items():
+        old = previous_raw.get(key)
+        version = value.get('version') if value is not None else None
+        if old is not None and version is not None and old.get('version') == version:
+            raw[key] = old
+            if key in previous_built:
+                built[key] = previous_built[key]
+            elif key in previous_failed:
+                failed.append(key)
+        else:
+            raw[key] = value
+    return LazyMapping(raw, build, built, failed)
+
+
+def _patched(previous: Mapping, changed: Dict[str, Optional[dict]], from_json, build) -> Mapping:
+    # entries not changed keep their identity, so refreshing with the result only compiles the changes
+    if isinstance(previous, LazyMapping):
+        raw = dict(previous.raw)
+        for key, json in changed.items():
+            if json is None:
+                raw.pop(key, None)
+            else:
+                raw[key] = json
+        return _reuse_lazy(previous, raw, build)
+    entries = dict(previous)
+    for key, json in changed.items():
+        if json is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = _reuse(previous, key, json) or from_json(json)
+    return entries
+
+
+def _prerequisite_graph(toggles: Mapping) -> Dict[str, List[str]]:
+    if isinstance(toggles, LazyMapping):
+        return {key: [p.get('key') for p in raw.get('prerequisites') or []] if raw.get('enabled') else []
+                for key, raw in toggles.raw.items()}
+    return {key: [p.key for p in toggle.prerequisites or []] if toggle.enabled else []
+            for key, toggle in toggles.items()}
+
+
+def _build_segment(key: str, json: dict) -> "Segment":
+    return Segment.from_json(binary_repository.decoded(json)).compile()
+
+
+class _ToggleBuilder:
+    """Builds lazy toggles, flagged with the prerequisite cycles found when their repository compiled."""
+
+    __slots__ = ('cycles',)
+
+    def __init__(self):
+        self.cycles = frozenset()
+
+    def __call__(self, key: str, json: dict) -> "Toggle":
+        toggle = Toggle.from_json(binary_repository.decoded(json)).compile(fold=True)
+        toggle.prerequisite_cycle = key in self.cycles
+        return toggle
+
 
 class Repository:
+    _logger = logging.getLogger('FeatureProbe-Evaluator')
+
     def __init__(self,
                  toggles: Dict[str, "Toggle"] = None,
                  segments: Dict[str, "Segment"] = None,
-                 debug_until_time: int = None):
+                 debug_until_time: int = None,
+                 server_version: int = None):
         self._toggles = toggles or {}
         self._segments = segments or {}
         self._debug_until_time = debug_until_time
+        self._server_version = server_version
 
     @classmethod
     @json_decoder
-    def from_json(cls, json: dict) -> "Repository":
+    def from_json(cls, json: dict, previous: Optional["Repository"] = None,
+                  lazy: bool = False) -> "Repository":
+        """Builds a repository from its JSON payload.
+
+        :param previous: (optional) Toggles and segments of this repository whose version did not
+            change are reused as they are instead of being rebuilt.
+        :param lazy: Keep toggles and segments as raw objects, each is built and compiled on first access.
+        """
         toggles = json.get('toggles', {})
         segments = json.get('segments', {})
         debug_until_time = json.get('debugUntilTime', None)
+        server_version = json.get('version', None)
+        previous_toggles = previous.toggles if previous is not None else {}
+        previous_segments = previous.segments if previous is not None else {}
+        if lazy:
+            return cls(
+                toggles=_reuse_lazy(previous_toggles, toggles, _ToggleBuilder()),
+                segments=_reuse_lazy(previous_segments, segments, _build_segment),
+                debug_until_time=debug_until_time,
+                server_version=server_version
+            )
         return cls(
-            toggles={k: Toggle.from_json(v) for k, v in toggles.items()},
-            segments={k: Segment.from_json(v) for k, v in segments.items()},
-            debug_until_time=debug_until_time
+            toggles={k: _reuse(previous_toggles, k, v) or Toggle.from_json(v)
+                     for k, v in toggles.items()},
+            segments={k: _reuse(previous_segments, k, v) or Segment.from_json(v)
+                      for k, v in segments.items()},
+            debug_until_time=debug_until_time,
+            server_version=server_version
         )
 
+    @classmethod
+    def from_json_stream(cls, chunks: Iterable[bytes], previous: Optional["Repository"] = None,
+                         lazy: bool = False) -> "Repository":
+        """Builds a repository while its JSON payload is parsed, one toggle or segment at a time.
+
+        Unless ``lazy``, the JSON object of an entry is dropped as soon as it is built, neither the
+        payload nor its decoded objects are held in memory as a whole.
+
+        :param chunks: The payload as UTF-8 encoded chunks.
+        """
+        previous_toggles = previous.toggles if previous is not None else {}
+        previous_segments = previous.segments if previous is not None else {}
+        toggles, segments, debug_until_time, server_version = {}, {}, None, None
+        for name, key, value in iter_repository(chunks):
+            if name == 'toggles' and key is not None:
+                toggles[key] = value if lazy else _reuse(previous_toggles, key, value) or Toggle.from_json(value)
+            elif name == 'segments' and key is not None:
+                segments[key] = value if lazy else _reuse(previous_segments, key, value) or Segment.from_json(value)
+            elif name == 'debugUntilTime':
+                debug_until_time = value
+            elif name == 'version':
+                server_version = value
+        if lazy:
+            toggles = _reuse_lazy(previous_toggles, toggles, _ToggleBuilder())
+            segments = _reuse_lazy(previous_segments, segments, _build_segment)
+        return cls(toggles=toggles, segments=segments, debug_until_time=debug_until_time,
+                   server_version=server_version)
+
+    @classmethod
+    def from_binary(cls, buffer: binary_repository.Buffer,
+                    previous: Optional["Repository"] = None) -> "Repository":
+        """Builds a lazy repository from a binary repository, usually a memory-mapped file.
+
+        Toggles and segments are decoded from the buffer on first access, the objects of large
+        ``is one of`` conditions are searched in the buffer as they are. See
+        :mod:`featureprobe.internal.binary_repository`.
+        """
+        toggles, segments, debug_until_time, server_version = binary_repository.read(buffer)
+        previous_toggles = previous.toggles if previous is not None else {}
+        previous_segments = previous.segments if previous is not None else {}
+        return cls(toggles=_reuse_lazy(previous_toggles, toggles, _ToggleBuilder()),
+                   segments=_reuse_lazy(previous_segments, segments, _build_segment),
+                   debug_until_time=debug_until_time,
+                   server_version=server_version)
+
+    @json_decoder
+    def with_delta(self, delta: dict) -> "Repository":
+        """Builds the repository resulting from a delta update, this repository is left as is.
+
+        A delta carries the changed toggles and segments by key, ``null`` for removed ones, and
+        optionally ``debugUntilTime`` and the ``version`` it brings the repository to. Toggles and
+        segments it does not carry are kept as they are, lazy ones included.
+        """
+        return Repository(
+            toggles=_patched(self._toggles, delta.get('toggles') or {}, Toggle.from_json, _ToggleBuilder()),
+            segments=_patched(self._segments, delta.get('segments') or {}, Segment.from_json, _build_segment),
+            debug_until_time=delta.get('debugUntilTime', self._debug_until_time),
+            server_version=delta.get('version', self._server_version))
+
+    def changes_since(self,
+                      previous: Optional[Union["Repository", "RepositorySnapshot"]]) -> RepositoryChanges:
+        """Compares toggles and segments with those of a previous repository or snapshot by identity."""
+        if previous is None:
+            return RepositoryChanges(tuple(self._toggles), (), (), tuple(self._segments), (), ())
+        return RepositoryChanges(*_diff(previous.toggles, self._toggles),
+                                 *_diff(previous.segments, self._segments))
+
+    def compile(self, changes: Optional[RepositoryChanges] = None) -> "Repository":
+        """Compiles every toggle and segment into its evaluation plan.
+
+        Missing and circular prerequisites are reported here, toggles affected by a cycle
+        are flagged so their evaluation fails fast instead of recursing until overflow.
+        Toggles serving the same variation to every user are folded, a compiled repository is
+        published as it is and never modified.
+
+        :param changes: (optional) Only the added and updated toggles and segments are compiled,
+            the others are already compiled.
+        """
+        if changes is None:
+            toggles, segments = self._toggles, self._segments
+        else:
+            toggles = changes.added_toggles + changes.updated_toggles
+            segments = changes.added_segments + changes.updated_segments
+        if not isinstance(self._toggles, LazyMapping):
+            for key in toggles:
+                self._compile_entry('toggle', key, self._toggles[key], fold=True)
+        if not isinstance(self._segments, LazyMapping):
+            for key in segments:
+                self._compile_entry('segment', key, self._segments[key])
+
+        cyclic, missing = find_prerequisite_cycles(_prerequisite_graph(self._toggles))
+        for key, prerequisite_key in missing:
+            # sourcery skip: replace-interpolation-with-fstring
+            self._logger.warning(
+                'Toggle \'%s\' requires prerequisite \'%s\' which does not exist' %
+                (key, prerequisite_key))
+        if cyclic:
+            # sourcery skip: replace-interpolation-with-fstring
+            self._logger.warning(
+                'Toggles on or depending on circular prerequisites: %s' %
+                ', '.join(sorted(cyclic)))
+        # toggles reused from a published repository are never flagged in place, those whose flag
+        # changes are built again instead
+        if isinstance(self._toggles, LazyMapping):
+            # toggles built from now on are flagged by the builder
+            self._toggles.build.cycles = frozenset(cyclic)
+            self._toggles.forget([key for key, toggle in self._toggles.built().items()
+                                  if toggle.prerequisite_cycle != (key in cyclic)])
+        else:
+            for key, toggle in list(self._toggles.items()):
+                if toggle.prerequisite_cycle != (key in cyclic):
+                    toggle = copy.copy(toggle)
+                    toggle.prerequisite_cycle = key in cyclic
+                    self._toggles[key] = toggle
+        return self
+
+    def _compile_entry(self, kind: str, key: str, entry, **options):
+        # a malformed entry must not keep the others from refreshing, it is left uncompiled and only
+        # fails where it is evaluated
+        try:
+            entry.compile(**options)
+        except Exception as e:  # noqa
+            # sourcery skip: replace-interpolation-with-fstring
+            self._logger.error('Failed to compile %s \'%s\'' % (kind, key), exc_info=e)
+
     @property
-    def toggles(self) -> Dict[str, "Toggle"]:
+    def toggles(self) -> Mapping[str, "Toggle"]:
         return self._toggles
 
     @toggles.setter
@@ -49,7 +312,7 @@ class Repository:
         self._toggles = value or {}
 
     @property
-    def segments(self) -> Dict[str, "Segment"]:
+    def segments(self) -> Mapping[str, "Segment"]:
         return self._segments
 
     @segments.setter
@@ -59,3 +322,8 @@ class Repository:
     @property
     def debug_until_time(self) -> int:
         return self._debug_until_time
+
+    @property
+    def server_version(self) -> Optional[int]:
+        """Version of the repository on the server, ``None`` if its payload did not tell."""
+        return self._server_version
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Dict, TYPE_CHECKING
+from typing import FrozenSet, List, Dict, Optional, TYPE_CHECKING
 
 from featureprobe.hit_result import HitResult
 from featureprobe.internal.json_decoder import json_decoder
@@ -20,16 +20,21 @@ from featureprobe.model.condition import Condition, ConditionType
 from featureprobe.model.serve import Serve
 
 if TYPE_CHECKING:
+    from featureprobe.evaluation_memo import EvaluationMemo
     from featureprobe.model.segment import Segment
     from featureprobe.user import User
 
 
 class Rule:
+    __slots__ = ('_serve', '_conditions', '_plan', '_attributes')
+
     def __init__(self,
                  serve: "Serve" = None,
                  conditions: List["Condition"] = None):
         self._serve = serve
         self._conditions = conditions or []
+        self._plan = None
+        self._attributes = frozenset()
 
     @classmethod
     @json_decoder
@@ -54,21 +59,48 @@ class Rule:
     @conditions.setter
     def conditions(self, value: List["Condition"]):
         self._conditions = value or []
+        self._plan = None
+
+    @property
+    def attributes(self) -> FrozenSet[str]:
+        """User attributes read directly by the conditions of this rule."""
+        if self._plan is None:
+            self.compile()
+        return self._attributes
+
+    def compile(self) -> "Rule":
+        """Compiles conditions into a plan of ``(condition, required attribute)`` steps.
+
+        Segment and datetime conditions do not require the user to own the subject attribute.
+        """
+        self._plan = tuple(
+            (condition.compile(),
+             None if condition.type in (ConditionType.SEGMENT, ConditionType.DATETIME)
+             else condition.subject)
+            for condition in self._conditions)
+        self._attributes = frozenset(
+            condition.subject for condition in self._conditions
+            if condition.type != ConditionType.SEGMENT)
+        if self._serve is not None:
+            self._serve.compile()
+        return self
 
     def hit(self,
             user: "User",
             segments: Dict[str,
                            "Segment"],
-            toggle_key: str) -> HitResult:
-        for condition in self._conditions:
-            if condition.type not in (
-                    ConditionType.SEGMENT,
-                    ConditionType.DATETIME) and not user.has_attr(
-                    condition.subject):
+            toggle_key: str,
+            memo: Optional["EvaluationMemo"] = None) -> HitResult:
+        plan = self._plan
+        if plan is None:
+            plan = self.compile()._plan
+        attrs = user.attrs
+        for condition, required in plan:
+            if required is not None and required not in attrs:
                 return HitResult(
                     hit=False, reason="Warning: User with key '%s' does not have attribute name '%s'" %
-                    (user.key, condition.subject))
-            if not condition.match_objects(user, segments):
+                    (user.key, required))
+            if not condition.match_objects(user, segments, memo):
                 return HitResult(hit=False)
 
         return self._serve.eval_index(user, toggle_key)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, TYPE_CHECKING, Dict
+from typing import FrozenSet, List, Optional, TYPE_CHECKING, Dict
 
 from featureprobe.hit_result import HitResult
 from featureprobe.internal.json_decoder import json_decoder
@@ -20,12 +20,17 @@ from featureprobe.model.condition import Condition
 from featureprobe.model.predicate import ConditionType
 
 if TYPE_CHECKING:
+    from featureprobe.evaluation_memo import EvaluationMemo
     from featureprobe.user import User
 
 
 class SegmentRule:
+    __slots__ = ('_conditions', '_plan', '_attributes')
+
     def __init__(self, conditions: List["Condition"] = None):
         self._conditions = conditions or []
+        self._plan = None
+        self._attributes = frozenset()
 
     @classmethod
     @json_decoder
@@ -41,24 +46,49 @@ class SegmentRule:
     @conditions.setter
     def conditions(self, value: List["Condition"]):
         self._conditions = value or []
+        self._plan = None
+
+    @property
+    def attributes(self) -> FrozenSet[str]:
+        """User attributes read directly by the conditions of this rule."""
+        if self._plan is None:
+            self.compile()
+        return self._attributes
+
+    def compile(self) -> "SegmentRule":
+        """Compiles conditions into a plan of ``(condition, required attribute)`` steps."""
+        self._plan = tuple(
+            (condition.compile(),
+             None if condition.type == ConditionType.SEGMENT else condition.subject)
+            for condition in self._conditions)
+        self._attributes = frozenset(
+            condition.subject for condition in self._conditions
+            if condition.type != ConditionType.SEGMENT)
+        return self
 
     def hit(self,
             user: "User",
-            segments: Dict[str, "Segment"]
+            segments: Dict[str, "Segment"],
+            memo: Optional["EvaluationMemo"] = None
             ) -> HitResult:
-        for condition in self._conditions:
-            if condition.type != ConditionType.SEGMENT and not user.has_attr(
-                    condition.subject):
+        plan = self._plan
+        if plan is None:
+            plan = self.compile()._plan
+        attrs = user.attrs
+        for condition, required in plan:
+            if required is not None and required not in attrs:
                 return HitResult(
                     hit=False, reason="Warning: User with key '%s' does not have attribute name '%s'" %
-                    (user.key, condition.subject))
-            if not condition.match_objects(user, segments):
+                    (user.key, required))
+            if not condition.match_objects(user, segments, memo):
                 return HitResult(hit=False)
 
         return HitResult(True)
 
 
 class Segment:
+    __slots__ = ('_uid', '_version', '_rules')
+
     def __init__(self,
                  uid: str,
                  version: int,
@@ -99,9 +129,24 @@ class Segment:
     def rules(self, value: List["SegmentRule"]):
         self._rules = value or []
 
-    def contains(self, user: "User", segments: Dict[str, "Segment"]):
+    def compile(self) -> "Segment":
+        for rule in self._rules:
+            rule.compile()
+        return self
+
+    def contains(self, user: "User", segments: Dict[str, "Segment"],
+                 memo: Optional["EvaluationMemo"] = None):
+        if memo is not None:
+            contained = memo.segments.get(self._uid)
+            if contained is None:
+                contained = memo.segments[self._uid] = self._contains(user, segments, memo)
+            return contained
+        return self._contains(user, segments, memo)
+
+    def _contains(self, user: "User", segments: Dict[str, "Segment"],
+                  memo: Optional["EvaluationMemo"]) -> bool:
         for rule in self._rules:
-            hit_result = rule.hit(user, segments)
+            hit_result = rule.hit(user, segments, memo)
             if hit_result.hit:
                 return True
 
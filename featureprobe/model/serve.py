@@ -23,6 +23,8 @@ if TYPE_CHECKING:
 
 
 class Serve:
+    __slots__ = ('_select', '_split')
+
     def __init__(self,
                  select: int,
                  split: "Split"):
@@ -52,6 +54,11 @@ class Serve:
     def split(self, value: "Split"):
         self._split = value
 
+    def compile(self) -> "Serve":
+        if self._split is not None:
+            self._split.compile()
+        return self
+
     def eval_index(self, user: "User", toggle_key: str) -> "HitResult":
         if self._select is not None:
             return HitResult(hit=True, index=self._select)
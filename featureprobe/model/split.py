@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import math
+from array import array
+from functools import lru_cache
 from hashlib import sha1
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Tuple, TYPE_CHECKING
+from weakref import WeakValueDictionary
 
 from featureprobe.hit_result import HitResult
 from featureprobe.internal.json_decoder import json_decoder
@@ -23,7 +28,14 @@ if TYPE_CHECKING:
 
 
 class Split:
+    __slots__ = ('_distribution', '_bucket_by', '_salt', '_groups')
+
+    _logger = logging.getLogger('FeatureProbe-Evaluator')
     _BUCKET_SIZE = 10000
+    # identical distributions (e.g. 50/50) share one bucket table
+    _groups_tables = WeakValueDictionary()
+    # optional process-wide LRU cache of buckets, see configure_bucket_cache
+    _bucket_cache = None
 
     def __init__(self,
                  distribution: List[List[List[int]]],
@@ -32,6 +44,22 @@ class Split:
         self._distribution = distribution or []
         self._bucket_by = bucket_by
         self._salt = salt
+        self._groups = None
+
+    @classmethod
+    def configure_bucket_cache(cls, maxsize: int):
+        """Caches the buckets of up to ``maxsize`` recent (hash key, salt) pairs.
+
+        This is a process-wide setting rather than a client option: the cache is shared by every
+        split of every client in the process, and lives until it is reconfigured. ``0`` disables it.
+        """
+        cls._bucket_cache = lru_cache(maxsize)(cls._bucket) if maxsize > 0 else None
+
+    @classmethod
+    def bucket_cache_info(cls):
+        """Gets hits, misses, maxsize and currsize of the bucket cache, ``None`` if disabled."""
+        cache = cls._bucket_cache
+        return cache.cache_info() if cache is not None else None
 
     @classmethod
     @json_decoder
@@ -48,6 +76,7 @@ class Split:
     @distribution.setter
     def distribution(self, value: List[List[List[int]]]):
         self._distribution = value or []
+        self._groups = None
 
     @property
     def bucket_by(self) -> str:
@@ -65,6 +94,59 @@ class Split:
     def salt(self, value: str):
         self._salt = value
 
+    def compile(self) -> "Split":
+        """Precomputes the variation index of every bucket.
+
+        Buckets not covered by the distribution map to -1, and buckets covered more than
+        once map to the first variation covering them. Both cases are reported here.
+        """
+        invalid = []
+        key = tuple(tuple(self._bounds(rng, invalid) for rng in groups)
+                    for groups in self._distribution)
+        groups = Split._groups_tables.get(key)
+        if groups is None:
+            groups, gaps, overlaps = self._build_groups(key)
+            if invalid:
+                # sourcery skip: replace-interpolation-with-fstring
+                self._logger.warning(
+                    'Split distribution %s has invalid ranges %s, their buckets are unassigned' %
+                    (self._distribution, ', '.join(map(repr, invalid))))
+            if gaps or overlaps:
+                # sourcery skip: replace-interpolation-with-fstring
+                self._logger.warning(
+                    'Split distribution %s leaves %d bucket(s) unassigned and assigns %d bucket(s) '
+                    'more than once' % (self._distribution, gaps, overlaps))
+            Split._groups_tables[key] = groups
+        self._groups = groups
+        return self
+
+    @classmethod
+    def _bounds(cls, rng: list, invalid: list) -> Tuple[int, int]:
+        """Gets the first and past the last bucket of a range, as matched by ``start <= bucket < end``.
+
+        Bounds may be floats, ranges that are not a pair of numbers cover no bucket.
+        """
+        try:
+            start, end = rng
+            return math.ceil(max(start, 0)), math.ceil(min(end, cls._BUCKET_SIZE))
+        except (TypeError, ValueError, OverflowError):
+            invalid.append(rng)
+            return 0, 0
+
+    @classmethod
+    def _build_groups(cls, distribution: Tuple[Tuple[Tuple[int, int], ...], ...]) \
+            -> Tuple[array, int, int]:
+        groups = array('b' if len(distribution) <= 127 else 'h', [-1]) * cls._BUCKET_SIZE
+        overlaps = 0
+        for index, ranges in enumerate(distribution):
+            for start, end in ranges:
+                for bucket in range(start, end):
+                    if groups[bucket] == -1:
+                        groups[bucket] = index
+                    else:
+                        overlaps += 1
+        return groups, groups.count(-1), overlaps
+
     def find_index(self, user: "User", toggle_key: str) -> "HitResult":
         hash_key = user.key
         if self._bucket_by:
@@ -77,19 +159,20 @@ class Split:
                     (user.key,
                      self._bucket_by))
         group_index = self._get_group(
-            self._hash(
+            (Split._bucket_cache or Split._bucket)(
                 hash_key,
-                self._salt or toggle_key,
-                self._BUCKET_SIZE))
+                self._salt or toggle_key))
         return HitResult(hit=True, index=group_index,
                          reason='selected %d percentage group' % group_index)
 
     def _get_group(self, hash_value: int) -> int:
-        for index, groups in enumerate(self._distribution):
-            for rng in groups:
-                if rng[0] <= hash_value < rng[1]:
-                    return index
-        return -1  # TODO: return None, HitResult.hit = False? inconsistent with Java SDK
+        if self._groups is None:
+            self.compile()
+        return self._groups[hash_value]  # TODO: -1 -> None, HitResult.hit = False? inconsistent with Java SDK
+
+    @staticmethod
+    def _bucket(hash_key: str, hash_salt: str) -> int:
+        return Split._hash(hash_key, hash_salt, Split._BUCKET_SIZE)
 
     @staticmethod
     def _hash(hash_key: str, hash_salt: str, bucket_size: int) -> int:
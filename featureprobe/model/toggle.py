@@ -13,8 +13,9 @@
 # limitations under the License.
 
 from cmath import log
-from typing import List, Optional, Dict, TYPE_CHECKING
+from typing import FrozenSet, List, Optional, Dict, Tuple, TYPE_CHECKING
 
+from featureprobe.evaluation_memo import EvaluationMemo
 from featureprobe.evaluation_result import EvaluationResult
 from featureprobe.internal.json_decoder import json_decoder
 from featureprobe.model.rule import Rule
@@ -30,6 +31,10 @@ if TYPE_CHECKING:
 
 
 class Toggle:
+    __slots__ = ('_key', '_enabled', '_version', '_disabled_serve', '_default_serve', '_rules',
+                 '_variations', '_for_client', '_track_access_events', '_last_modified',
+                 '_prerequisites', '_compiled', '_attributes', '_prerequisite_cycle', '_constant')
+
     def __init__(self,
                  key: str,
                  enabled: bool,
@@ -53,6 +58,10 @@ class Toggle:
         self._track_access_events = track_access_events
         self._last_modified = last_modified
         self._prerequisites = prerequisites
+        self._compiled = False
+        self._attributes = frozenset()
+        self._prerequisite_cycle = False
+        self._constant = None
 
     @classmethod
     @json_decoder
@@ -99,6 +108,8 @@ class Toggle:
     @enabled.setter
     def enabled(self, value: bool):
         self._enabled = value
+        self._compiled = False
+        self._constant = None
 
     @property
     def version(self) -> int:
@@ -107,6 +118,8 @@ class Toggle:
     @version.setter
     def version(self, value: int):
         self._version = value
+        self._compiled = False
+        self._constant = None
 
     @property
     def disabled_serve(self) -> "Serve":
@@ -115,6 +128,8 @@ class Toggle:
     @disabled_serve.setter
     def disabled_serve(self, value: "Serve"):
         self._disabled_serve = value
+        self._compiled = False
+        self._constant = None
 
     @property
     def default_serve(self) -> "Serve":
@@ -123,6 +138,8 @@ class Toggle:
     @default_serve.setter
     def default_serve(self, value: "Serve"):
         self._default_serve = value
+        self._compiled = False
+        self._constant = None
 
     @property
     def rules(self) -> List["Rule"]:
@@ -131,6 +148,8 @@ class Toggle:
     @rules.setter
     def rules(self, value: List["Rule"]):
         self._rules = value or []
+        self._compiled = False
+        self._constant = None
 
     @property
     def variations(self) -> List[str]:
@@ -139,6 +158,8 @@ class Toggle:
     @variations.setter
     def variations(self, value: List[str]):
         self._variations = value or []
+        self._compiled = False
+        self._constant = None
 
     @property
     def for_client(self) -> bool:
@@ -152,16 +173,92 @@ class Toggle:
     def for_client(self, value: bool):
         self._for_client = value
 
+    @property
+    def prerequisites(self) -> List["Prerequisite"]:
+        return self._prerequisites
+
+    @property
+    def prerequisite_cycle(self) -> bool:
+        """Whether this toggle is on, or depends on, a cycle of prerequisites."""
+        return self._prerequisite_cycle
+
+    @prerequisite_cycle.setter
+    def prerequisite_cycle(self, value: bool):
+        self._prerequisite_cycle = value
+
+    @property
+    def attributes(self) -> FrozenSet[str]:
+        """User attributes read directly by the rules of this toggle."""
+        if not self._compiled:
+            self.compile()
+        return self._attributes
+
+    @property
+    def user_independent(self) -> bool:
+        """Whether this toggle serves the same result to every user, folded by :meth:`compile`.
+
+        Only toggles compiled with ``fold`` are ever user independent.
+        """
+        if not self._compiled:
+            self.compile()
+        return self._constant is not None
+
+    def compile(self, fold: bool = False) -> "Toggle":
+        """Compiles every rule and serve of this toggle into its evaluation plan.
+
+        :param fold: (optional) Whether to precompute the result of a toggle serving the same variation
+            to every user. The result is not updated when the rules and serves of the toggle are modified
+            in place, so only toggles never modified afterwards are folded, see :meth:`Repository.compile`.
+        """
+        for serve in (self._disabled_serve, self._default_serve):
+            if serve is not None:
+                serve.compile()
+        attributes = set()
+        for rule in self._rules or []:
+            attributes.update(rule.compile().attributes)
+        self._attributes = frozenset(attributes)
+        self._constant = self._fold() if fold else None
+        self._compiled = True
+        return self
+
+    def _fold(self) -> Optional[Tuple["EvaluationResult", "EvaluationResult"]]:
+        """Precomputes the results of a toggle that serves the same variation to every user,
+        for a default value that is not a float and for one that is."""
+        if not self._enabled:
+            serve = self._disabled_serve
+        elif self._prerequisites:
+            return None
+        elif not self._rules:
+            serve = self._default_serve
+        elif not self._rules[0].conditions:
+            serve = self._rules[0].serve
+        else:
+            return None
+        if serve is None or serve.select is None:
+            return None
+        try:
+            return self._fold_result(None), self._fold_result(0.0)
+        except (IndexError, TypeError):
+            return None
+
+    def _fold_result(self, default_value: object) -> "EvaluationResult":
+        if not self._enabled:
+            return self._create_disabled_result(None, self._key, default_value)
+        if not self._rules:
+            return self._create_default_result(None, self._key, default_value, None)
+        return self._hit_value(self._rules[0].serve.eval_index(None, self._key), default_value, 0)
+
     def eval(self,
              user: "User",
              toggles: Dict[str, "Toggle"],
              segments: Dict[str, "Segment"],
              default_value: object,
-             deep: int) -> "EvaluationResult":
+             deep: int,
+             memo: Optional["EvaluationMemo"] = None) -> "EvaluationResult":
 
         warning = ''
         try:
-            return self.do_eval(user, toggles, segments, default_value, deep)
+            return self.do_eval(user, toggles, segments, default_value, deep, memo)
         except PrerequisiteError as e:
             warning = e
         return self._create_default_result(
@@ -172,47 +269,95 @@ class Toggle:
                 toggles: Dict[str, "Toggle"],
                 segments: Dict[str, "Segment"],
                 default_value: object,
-                deep: int) -> "EvaluationResult":
+                deep: int,
+                memo: Optional["EvaluationMemo"] = None) -> "EvaluationResult":
+        if memo is None and self._prerequisite_cycle:
+            # the memo tracks the toggles being evaluated, so the cycle fails fast
+            memo = EvaluationMemo()
+        return self._do_eval(user, toggles, segments, default_value, deep, memo)[0]
+
+    def _do_eval(self,
+                 user: "User",
+                 toggles: Dict[str, "Toggle"],
+                 segments: Dict[str, "Segment"],
+                 default_value: object,
+                 deep: int,
+                 memo: Optional["EvaluationMemo"]) -> Tuple["EvaluationResult", int]:
+        """Evaluates this toggle, along with the prerequisite depth the evaluation needed."""
+        constant = self._constant
         if not self._enabled:
-            return self._create_disabled_result(user, self._key, default_value)
+            if constant is not None:
+                return constant[isinstance(default_value, float)], 0
+            return self._create_disabled_result(user, self._key, default_value), 0
 
         if deep <= 0:
             raise PrerequisiteError("prerequisite deep overflow")
+        if constant is not None:
+            return constant[isinstance(default_value, float)], 1
         warning = None
 
-        if not self.prerequisite(user, toggles, segments, deep):
+        if self._prerequisite_cycle and memo is not None:
+            # reaching this toggle again through its own prerequisites would recurse until overflow
+            if self in memo.evaluating:
+                raise PrerequisiteError("prerequisite deep overflow")
+            memo.evaluating.add(self)
+            try:
+                passed, needed = self._prerequisite(user, toggles, segments, deep, memo)
+            finally:
+                memo.evaluating.discard(self)
+        else:
+            passed, needed = self._prerequisite(user, toggles, segments, deep, memo)
+        needed += 1
+        if not passed:
             return self._create_default_result(
-                user, self._key, default_value, warning)
+                user, self._key, default_value, warning), needed
 
         for index, rule in enumerate(self._rules or []):
-            hit_result = rule.hit(user, segments, self._key)
+            hit_result = rule.hit(user, segments, self._key, memo)
             if hit_result.hit:
-                return self._hit_value(hit_result, default_value, index)
+                return self._hit_value(hit_result, default_value, index), needed
             warning = hit_result.reason
 
         return self._create_default_result(
-            user, self._key, default_value, warning)
+            user, self._key, default_value, warning), needed
 
     def prerequisite(self,
                      user: "User",
                      toggles: Dict[str, "Toggle"],
                      segments: Dict[str, "Segment"],
-                     max_deep: int) -> bool:
+                     max_deep: int,
+                     memo: Optional["EvaluationMemo"] = None) -> bool:
+        return self._prerequisite(user, toggles, segments, max_deep, memo)[0]
+
+    def _prerequisite(self,
+                      user: "User",
+                      toggles: Dict[str, "Toggle"],
+                      segments: Dict[str, "Segment"],
+                      max_deep: int,
+                      memo: Optional["EvaluationMemo"]) -> Tuple[bool, int]:
+        needed = 0
         if self._prerequisites is None or len(self._prerequisites) == 0:
-            return True
+            return True, needed
         for prerequisite in self._prerequisites:
             toggle = toggles.get(prerequisite.key)
             if toggle is None:
                 raise PrerequisiteError(
                     'prerequisite not exist %s' %
                     prerequisite.key)
-            result = toggle.do_eval(
-                user, toggles, segments, None, max_deep - 1)
+            # a memoized result is only reused if it would not have overflowed at this depth
+            evaluated = memo.prerequisites.get(prerequisite.key) if memo is not None else None
+            if evaluated is None or evaluated[1] > max_deep - 1:
+                evaluated = toggle._do_eval(
+                    user, toggles, segments, None, max_deep - 1, memo)
+                if memo is not None:
+                    memo.prerequisites[prerequisite.key] = evaluated
+            result, depth = evaluated
+            needed = max(needed, depth)
             if result.value is None or str(
                     result.value) != str(
                     prerequisite.value):
-                return False
-        return True
+                return False, needed
+        return True, needed
 
     def _create_disabled_result(
             self,
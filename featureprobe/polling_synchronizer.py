@@ -12,15 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import logging
 import threading
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
 
 import tzlocal
 from apscheduler.schedulers.background import BackgroundScheduler
 from requests import Session
 
 from featureprobe import Repository
+from featureprobe.internal import compression, fast_json
+from featureprobe.internal.atomic_file import AtomicFile
+from featureprobe.internal.single_flight import CallStats, SingleFlight
 from featureprobe.synchronizer import Synchronizer
 
 if TYPE_CHECKING:
@@ -28,9 +33,14 @@ if TYPE_CHECKING:
     from featureprobe.data_repository import DataRepository
 
 
+def _is_version(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 class PollingSynchronizer(Synchronizer):
 
     __logger = logging.getLogger('FeatureProbe-Synchronizer')
+    _STREAM_CHUNK_SIZE = 64 * 1024
 
     def __init__(
             self,
@@ -40,18 +50,35 @@ class PollingSynchronizer(Synchronizer):
         self._refresh_interval = context.refresh_interval
         self._api_url = context.synchronizer_url
         self._data_repo = data_repo
+        self._lazy = context.lazy_repository
+        self._stream = context.stream_repository
+        self._snapshot_path = context.snapshot_path
 
         self._session = Session()
         self._session.keep_alive = False
         self._session.mount('http://', context.http_config.adapter)
         self._session.mount('https://', context.http_config.adapter)
         self._session.headers.update(context.headers)
+        self._session.headers['Accept-Encoding'] = compression.accept_encoding()
         self._timeout = (
             context.http_config.conn_timeout,
             context.http_config.read_timeout)
 
+        self._repository = None
+        # validators of the last applied response, to skip parsing an unchanged repository
+        self._etag = None
+        self._last_modified = None
+        self._digest = None
+        # digest of the persisted snapshot, behind the one applied until a later poll persists it
+        self._snapshot_digest = None
+        self._transfer_stats = compression.TransferStats(0, 0, 0)
         self._scheduler = None
         self._lock = threading.RLock()
+        # syncs and delta updates replace the repository one at a time
+        self._refresh_lock = threading.Lock()
+        # concurrent sync requests share one sync in flight and at most one queued
+        self._sync_flight = SingleFlight(self._locked_sync)
+        self._debounce = context.realtime_debounce.total_seconds()
         self._ready = ready
 
     @classmethod
@@ -66,28 +93,54 @@ class PollingSynchronizer(Synchronizer):
         PollingSynchronizer.__logger.info(
             'Starting FeatureProbe polling repository with interval %d ms'
             % (self._refresh_interval.total_seconds() * 1000))
-        self.sync()
+        with self._refresh_lock:
+            warm = self._warm_start()
+        if not warm:
+            self.sync()
         with self._lock:
+            timezone = tzlocal.get_localzone()
             self._scheduler = BackgroundScheduler(
-                timezone=tzlocal.get_localzone(),
+                timezone=timezone,
                 logger=self.__logger)
             self._scheduler.start()
+            # a persisted repository is revalidated right away, in the background
+            first_run = {'next_run_time': datetime.now(timezone)} if warm else {}
             self._scheduler.add_job(
                 self.sync,
                 trigger="interval",
                 seconds=self._refresh_interval.total_seconds(),
+                **first_run
             )
 
     def sync(self):
+        self._sync_flight()
+
+    def request_sync(self):
+        """Syncs shortly without waiting, requests made before then are served by the same sync."""
+        self._sync_flight.request(self._debounce)
+
+    @property
+    def sync_stats(self) -> CallStats:
+        """Sync requests, the syncs run for them, and the requests coalesced into another's sync."""
+        return self._sync_flight.stats
+
+    def _locked_sync(self):
+        with self._refresh_lock:
+            self._sync()
+
+    def _sync(self):
         try:
-            resp = self._session.get(self._api_url, timeout=self._timeout)
-            resp.raise_for_status()
+            resp = self._session.get(self._api_url, timeout=self._timeout,
+                                     headers=self._conditional_headers(), stream=self._stream)
             self.__logger.debug('Http response: %d' % resp.status_code)
-            body = resp.json()
-            # sourcery skip: replace-interpolation-with-fstring
-            self.__logger.debug('Http response body: %s' % body)
-            repo = Repository.from_json(body)
-            self._data_repo.refresh(repo)
+            if resp.status_code == 304:
+                self._account(resp, 0)
+                self.__logger.debug('Repository not modified')
+            elif self._stream:
+                self._apply_stream(resp)
+            else:
+                resp.raise_for_status()
+                self._apply(resp)
 
             if not self._ready.is_set():
                 self._ready.set()
@@ -96,9 +149,190 @@ class PollingSynchronizer(Synchronizer):
                 'Unexpected error from polling processor',
                 exc_info=e)
 
+    def apply_delta(self, delta: dict):
+        """Applies an update carrying only changed toggles and segments, see :meth:`Repository.with_delta`.
+
+        The delta applies to the repository version named by its ``baseVersion``. Deltas already
+        applied are ignored, any other version gap is caught up with a full sync.
+        """
+        applied = False
+        with self._refresh_lock:
+            try:
+                current = self._repository.server_version if self._repository is not None else None
+                base, version = delta.get('baseVersion'), delta.get('version')
+                if not _is_version(base) or not (version is None or _is_version(version)):
+                    raise ValueError('Delta versions must be integers, got %r and %r' % (base, version))
+                if _is_version(current) and version is not None and version <= current:
+                    # sourcery skip: replace-interpolation-with-fstring
+                    self.__logger.debug(
+                        'Ignoring delta to version %s, repository is at version %s' % (version, current))
+                    return
+                if base != current:
+                    # sourcery skip: replace-interpolation-with-fstring
+                    self.__logger.info(
+                        'Delta from version %s does not apply to version %s, syncing' % (base, current))
+                else:
+                    # the body of the next response differs from the last one, whatever its validators
+                    self._refresh(self._repository.with_delta(delta), None)
+                    applied = True
+            except Exception as e:  # noqa
+                self.__logger.error('Failed to apply delta, syncing', exc_info=e)
+        if not applied:
+            # the deltas of a burst past a gap are caught up by one sync
+            self.request_sync()
+
+    @property
+    def transfer_stats(self) -> compression.TransferStats:
+        """Repository requests and their response bytes, as received and after decoding."""
+        return self._transfer_stats
+
+    def _account(self, resp, body_bytes: int):
+        wire_bytes = resp.raw.tell() if resp.raw is not None else body_bytes
+        with self._lock:
+            requests, total_wire_bytes, total_body_bytes = self._transfer_stats
+            self._transfer_stats = compression.TransferStats(
+                requests + 1, total_wire_bytes + wire_bytes, total_body_bytes + body_bytes)
+        # sourcery skip: replace-interpolation-with-fstring
+        self.__logger.debug('Http response of %d bytes received as %d bytes (%s)' % (
+            body_bytes, wire_bytes, resp.headers.get('Content-Encoding', 'identity')))
+
+    def _conditional_headers(self) -> dict:
+        headers = {}
+        if self._etag is not None:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified is not None:
+            headers['If-Modified-Since'] = self._last_modified
+        return headers
+
+    def _apply(self, resp):
+        self._account(resp, len(resp.content))
+        # servers without validators still send the same bytes for an unchanged repository
+        digest = hashlib.sha256(resp.content).digest()
+        if digest != self._digest:
+            body = fast_json.loads(resp.content)
+            if self.__logger.isEnabledFor(logging.DEBUG):
+                # sourcery skip: replace-interpolation-with-fstring
+                self.__logger.debug('Http response body: %s' % body)
+            self._refresh(Repository.from_json(body, self._repository, self._lazy), digest)
+        else:
+            self.__logger.debug('Repository unchanged')
+        if digest != self._snapshot_digest:
+            snapshot = self._snapshot_file()
+            if snapshot is not None and self._write_snapshot(snapshot, resp.content):
+                self._commit_snapshot(snapshot, digest)
+        self._keep_validators(resp)
+
+    def _apply_stream(self, resp):
+        digest = hashlib.sha256()
+        body_bytes = 0
+        snapshot = None
+
+        def chunks():
+            nonlocal body_bytes, snapshot
+            for chunk in resp.iter_content(self._STREAM_CHUNK_SIZE):
+                digest.update(chunk)
+                body_bytes += len(chunk)
+                if snapshot is not None and not self._write_snapshot(snapshot, chunk):
+                    snapshot = None
+                yield chunk
+
+        try:
+            resp.raise_for_status()
+            # the digest is only known once the body is parsed, so the body is written as it streams
+            # only while the persisted snapshot is behind the applied repository: a change is then
+            # persisted by the poll after it, and unchanged polls write nothing
+            if self._digest is None or self._digest != self._snapshot_digest:
+                snapshot = self._snapshot_file()
+            # entries left unchanged are reused as they are parsed
+            repo = Repository.from_json_stream(chunks(), self._repository, self._lazy)
+            self._account(resp, body_bytes)
+            if digest.digest() != self._digest:
+                self._refresh(repo, digest.digest())
+            else:
+                self.__logger.debug('Repository unchanged')
+            if snapshot is not None:
+                self._commit_snapshot(snapshot, digest.digest())
+            self._keep_validators(resp)
+        finally:
+            resp.close()
+            if snapshot is not None:
+                snapshot.discard()
+
+    def _warm_start(self) -> bool:
+        """Serves the repository persisted by a previous run until the first sync revalidates it."""
+        if self._snapshot_path is None:
+            return False
+        digest = hashlib.sha256()
+        try:
+            with open(self._snapshot_path, 'rb') as f:
+                if self._stream:
+                    def chunks():
+                        for chunk in iter(lambda: f.read(self._STREAM_CHUNK_SIZE), b''):
+                            digest.update(chunk)
+                            yield chunk
+
+                    repo = Repository.from_json_stream(chunks(), None, self._lazy)
+                else:
+                    content = f.read()
+                    digest.update(content)
+                    repo = Repository.from_json(fast_json.loads(content), None, self._lazy)
+        except FileNotFoundError:
+            return False
+        except Exception as e:  # noqa
+            # sourcery skip: replace-interpolation-with-fstring
+            self.__logger.warning('Ignoring unreadable repository snapshot %s' % self._snapshot_path,
+                                  exc_info=e)
+            return False
+        self._refresh(repo, digest.digest())
+        self._snapshot_digest = self._digest
+        self._ready.set()
+        # sourcery skip: replace-interpolation-with-fstring
+        self.__logger.info('Loaded repository snapshot %s' % self._snapshot_path)
+        return True
+
+    def _snapshot_file(self) -> Optional[AtomicFile]:
+        if self._snapshot_path is None:
+            return None
+        try:
+            return AtomicFile(self._snapshot_path)
+        except OSError as e:
+            # sourcery skip: replace-interpolation-with-fstring
+            self.__logger.warning('Failed to persist repository snapshot %s' % self._snapshot_path,
+                                  exc_info=e)
+            return None
+
+    def _write_snapshot(self, snapshot: AtomicFile, data: bytes) -> bool:
+        return self._persisting(snapshot, snapshot.write, data)
+
+    def _commit_snapshot(self, snapshot: AtomicFile, digest: bytes):
+        if self._persisting(snapshot, snapshot.commit):
+            self._snapshot_digest = digest
+
+    def _persisting(self, snapshot: AtomicFile, action, *args) -> bool:
+        """Runs a step of writing the snapshot, a failure drops the snapshot rather than the sync."""
+        try:
+            action(*args)
+            return True
+        except OSError as e:
+            # sourcery skip: replace-interpolation-with-fstring
+            self.__logger.warning('Failed to persist repository snapshot %s' % self._snapshot_path,
+                                  exc_info=e)
+            snapshot.discard()
+            return False
+
+    def _refresh(self, repo: Repository, digest: bytes):
+        self._data_repo.refresh(repo)
+        self._repository = repo
+        self._digest = digest
+
+    def _keep_validators(self, resp):
+        self._etag = resp.headers.get('ETag')
+        self._last_modified = resp.headers.get('Last-Modified')
+
     def close(self):
         PollingSynchronizer.__logger.info(
             'Closing FeatureProbe PollingSynchronizer')
+        self._sync_flight.close()
         with self._lock:
             self._scheduler.shutdown()
             del self._scheduler
@@ -51,6 +51,11 @@ class RealtimeToggleUpdateNS(ClientNamespace):
     def on_disconnect(self):
         self.__logger.info("disconnecting socketio")
 
-    def on_update(self, data):
+    def on_update(self, data=None):
         self.__logger.info("socketio recv update event")
-        self._synchronizer.sync()
+        # updates naming the version they apply to carry the changes, others only announce them
+        if isinstance(data, dict) and 'baseVersion' in data:
+            self._synchronizer.apply_delta(data)
+        else:
+            # a burst of announcements is caught up by one sync
+            self._synchronizer.request_sync()
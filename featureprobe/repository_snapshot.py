@@ -0,0 +1,97 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import MappingProxyType
+from typing import Mapping, Optional, TYPE_CHECKING
+
+from featureprobe.internal.lazy_mapping import LazyMapping
+
+if TYPE_CHECKING:
+    from featureprobe.model.repository import Repository
+    from featureprobe.model.segment import Segment
+    from featureprobe.model.toggle import Toggle
+
+
+def _frozen(mapping: Optional[Mapping], copy: bool) -> Mapping:
+    # lazy mappings are read-only already, copying them would build every value
+    if isinstance(mapping, LazyMapping):
+        return mapping
+    if copy or mapping is None:
+        mapping = dict(mapping or {})
+    return MappingProxyType(mapping)
+
+
+class RepositorySnapshot:
+    """An immutable view of toggles and segments taken at one refresh.
+
+    A data repository publishes a new snapshot by replacing a single reference, an evaluation
+    reads that reference once and never sees toggles and segments of two different refreshes.
+    """
+
+    __slots__ = ('_version', '_toggles', '_segments', '_debug_until_time')
+
+    def __init__(self,
+                 version: int,
+                 toggles: Mapping[str, "Toggle"] = None,
+                 segments: Mapping[str, "Segment"] = None,
+                 debug_until_time: Optional[int] = None,
+                 copy: bool = True):
+        """
+        :param copy: (optional) Whether to copy toggles and segments, which are otherwise wrapped as they
+            are and must not be modified afterwards.
+        """
+        self._version = version
+        self._toggles = _frozen(toggles, copy)
+        self._segments = _frozen(segments, copy)
+        self._debug_until_time = debug_until_time
+
+    @classmethod
+    def of(cls, repository: "Repository", version: int, copy: bool = True) -> "RepositorySnapshot":
+        """Takes a snapshot of a compiled repository."""
+        return cls(version,
+                   repository.toggles,
+                   repository.segments,
+                   repository.debug_until_time,
+                   copy)
+
+    @property
+    def version(self) -> int:
+        """Increases with every snapshot published by the same data repository."""
+        return self._version
+
+    @property
+    def toggles(self) -> Mapping[str, "Toggle"]:
+        return self._toggles
+
+    @property
+    def segments(self) -> Mapping[str, "Segment"]:
+        return self._segments
+
+    @property
+    def debug_until_time(self) -> Optional[int]:
+        return self._debug_until_time
+
+    def get_toggle(self, key: str) -> Optional["Toggle"]:
+        return self._toggles.get(key)
+
+    def get_segment(self, key: str) -> Optional["Segment"]:
+        return self._segments.get(key)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, '_debug_until_time'):
+            raise AttributeError('RepositorySnapshot is immutable')
+        object.__setattr__(self, name, value)
+
+
+EMPTY_SNAPSHOT = RepositorySnapshot(0)
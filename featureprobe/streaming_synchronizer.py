@@ -58,6 +58,16 @@ class StreamingSynchronizer(Synchronizer):
     def sync(self):
         self.__polling_synchronizer.sync()
 
+    def request_sync(self):
+        self.__polling_synchronizer.request_sync()
+
+    def apply_delta(self, delta: dict):
+        self.__polling_synchronizer.apply_delta(delta)
+
+    @property
+    def sync_stats(self):
+        return self.__polling_synchronizer.sync_stats
+
     def close(self):
         self.__polling_synchronizer.close()
         with self._lock:
@@ -60,6 +60,9 @@ setup(
 
     python_requires='>=3.5, <4',
     install_requires=_requirements(),
+    extras_require={
+        'fast-json': ['orjson'],
+    },
 
     project_urls={
         'Project Homepage': 'https://github.com/FeatureProbe',
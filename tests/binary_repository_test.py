@@ -0,0 +1,104 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from threading import Event
+
+import featureprobe as fp
+from featureprobe.file_synchronizer import FileSynchronizer
+from featureprobe.internal import binary_repository
+from featureprobe.internal.binary_repository import SortedStrings
+from featureprobe.memory_data_repository import MemoryDataRepository
+
+
+def _payload():
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['segments']['some_segment']['rules'][0]['conditions'][0]['objects'] = \
+        ['user_%d' % i for i in range(1000)] + ['4', 'ä', '4']
+    return payload
+
+
+def test_sorted_strings():
+    strings = SortedStrings(binary_repository._id_list(['b', 'ä', 'a', 'zz', 'a']), 0)
+    assert len(strings) == 4
+    assert list(strings) == ['a', 'b', 'zz', 'ä']
+    assert strings == {'a', 'b', 'zz', 'ä'}
+    assert 'a' in strings and 'ä' in strings and 'zz' in strings
+    assert 'c' not in strings and '' not in strings and 1 not in strings and '\ud800' not in strings
+
+
+def test_binary_repository_evaluates_like_json():
+    payload = _payload()
+    repo = fp.Repository.from_binary(binary_repository.encode(payload, 1)).compile()
+    expected = fp.Repository.from_json(payload).compile()
+    assert sorted(repo.toggles) == sorted(expected.toggles)
+    assert sorted(repo.segments) == sorted(expected.segments)
+    condition = repo.segments['some_segment'].rules[0].conditions[0]
+    assert isinstance(condition.objects, SortedStrings)
+    assert len(condition.objects) == 1002
+
+    for city in ('1', '4', 'ä', 'user_999', 'user_1000', None):
+        user = fp.User(stable_rollout_key='test_user')
+        if city is not None:
+            user.with_attr('city', city)
+        for key in expected.toggles:
+            actual = repo.toggles[key].eval(user, repo.toggles, repo.segments, None, 20)
+            wanted = expected.toggles[key].eval(user, expected.toggles, expected.segments, None, 20)
+            assert (actual.value, actual.reason) == (wanted.value, wanted.reason)
+
+
+def test_file_synchronizer_maps_binary_repository(tmp_path):
+    json_path = tmp_path / 'repo.json'
+    json_path.write_text(json.dumps(_payload()))
+    binary_path = str(tmp_path / 'repo.fpr')
+    binary_repository.convert(str(json_path), binary_path)
+
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = FileSynchronizer(data_repo, binary_path, Event())
+    synchronizer.sync()
+    assert synchronizer.initialized()
+    toggle = data_repo.get_toggle('bool_toggle')
+    assert toggle is not None
+    assert data_repo.get_segment('some_segment') is not None
+
+    # unchanged versions keep the toggles built from the previous mapping
+    synchronizer.sync()
+    assert data_repo.get_toggle('bool_toggle') is toggle
+
+
+
+def test_file_synchronizer_only_reloads_renamed_binary_files(tmp_path, caplog):
+    json_path = tmp_path / 'repo.json'
+    json_path.write_text(json.dumps(_payload()))
+    binary_path = tmp_path / 'repo.fpr'
+    binary_repository.convert(str(json_path), str(binary_path))
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = FileSynchronizer(data_repo, str(binary_path), Event())
+    synchronizer.sync()
+    snapshot = data_repo.snapshot
+
+    # appended rather than truncated, a mapped file shrinking in place faults the process
+    with open(str(binary_path), 'ab') as f:
+        f.write(b'\0')
+    synchronizer.sync()
+    assert data_repo.snapshot is snapshot
+    assert any('changed in place' in r.getMessage() for r in caplog.records)
+
+    payload = _payload()
+    payload['toggles']['bool_toggle']['version'] = 2
+    json_path.write_text(json.dumps(payload))
+    binary_repository.convert(str(json_path), str(binary_path))
+    synchronizer.sync()
+    assert data_repo.get_toggle('bool_toggle').version == 2
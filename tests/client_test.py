@@ -0,0 +1,121 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import subprocess
+import sys
+
+import featureprobe as fp
+from featureprobe.event_processor import EventProcessor
+
+
+class RecordingEventProcessor(EventProcessor):
+    def __init__(self):
+        self.batches = []
+
+    @classmethod
+    def from_context(cls, context):
+        return cls()
+
+    def push(self, event):
+        self.batches.append([event])
+
+    def push_all(self, events):
+        self.batches.append(list(events))
+
+    def flush(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def setup_function():
+    global client, user  # noqa
+    client = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='file', location='tests/resources/datasource/repo.json'))
+    client._event_processor.shutdown()
+    client._event_processor = RecordingEventProcessor()
+    user = fp.User(stable_rollout_key='test_user').with_attr('city', '1')
+
+
+def teardown_function():
+    client.close()
+
+
+def test_all_values():
+    values = client.all_values(user)
+    assert len(values) == len(client._data_repo.get_all_toggle())
+    for key, value in values.items():
+        assert value == client.value(key, user, None)
+
+
+def test_all_values_of_keys():
+    values = client.all_values(user, ['bool_toggle', 'string_toggle', 'not_exist_toggle'])
+    assert values == {'bool_toggle': True, 'string_toggle': '1'}
+
+
+def test_all_details():
+    details = client.all_details(user, ['bool_toggle', 'disabled_toggle'])
+    assert details['bool_toggle'].rule_index == 0
+    assert details['bool_toggle'].reason == 'Rule 0 hit'
+    assert details['disabled_toggle'].reason == 'Toggle disabled'
+
+
+def test_all_values_push_events_in_bulk():
+    client.all_values(user, ['bool_toggle', 'string_toggle', 'json_toggle'])
+    assert len(client._event_processor.batches) == 1
+    assert [e.key for e in client._event_processor.batches[0]] == \
+        ['bool_toggle', 'string_toggle', 'json_toggle']
+
+
+def test_evaluation_cache_hits_push_events():
+    cached = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='file', location='tests/resources/datasource/repo.json',
+        evaluation_cache_size=100))
+    cached._event_processor.shutdown()
+    cached._event_processor = RecordingEventProcessor()
+    for i in range(3):
+        assert cached.value('bool_toggle', fp.User({'city': '1'}, 'user%d' % i), False) is True
+    assert cached.evaluation_cache_info()[:2] == (2, 1)
+    assert len(cached._event_processor.batches) == 3
+    assert client.evaluation_cache_info() is None
+    cached.close()
+
+
+def test_lazy_toggle_failing_to_build_is_missing(tmp_path, caplog):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['toggles']['broken_toggle'] = dict(payload['toggles']['bool_toggle'], key='broken_toggle', rules=5)
+    location = tmp_path / 'repo.json'
+    location.write_text(json.dumps(payload))
+    lazy = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='file', location=str(location), lazy_repository=True))
+    for _ in range(2):
+        assert lazy.value('broken_toggle', user, 'default') == 'default'
+        assert lazy.value_detail('broken_toggle', user, 'default').reason == 'Toggle not exist'
+    assert lazy.value('bool_toggle', user, False) is True
+    assert 'broken_toggle' not in lazy.all_values(user)
+    errors = [r for r in caplog.records if 'broken_toggle' in r.getMessage()]
+    assert len(errors) == 1
+    lazy.close()
+
+
+def test_import_defers_network_dependencies():
+    code = ('import sys, featureprobe; '
+            'print(sorted(m for m in ("apscheduler", "requests", "socketio", "tzlocal", "urllib3") '
+            'if m in sys.modules))')
+    output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    assert output.strip() == '[]'
+    assert type(client._synchronizer).__name__ == 'FileSynchronizer'
@@ -416,3 +416,60 @@ def test_semver_less_or_equal():
 
     user['userId'] = '1.2.7'
     assert not condition.match_objects(user, segments)
+
+
+def test_recompile_after_modified():
+    condition.objects = ['12345']
+    condition.predicate = fp.model.StringPredicate.IS_ONE_OF
+    condition.compile()
+
+    user['userId'] = '12345'
+    assert condition.match_objects(user, segments)
+
+    condition.predicate = fp.model.StringPredicate.IS_NOT_ANY_OF
+    assert not condition.match_objects(user, segments)
+
+
+def test_invalid_objects_reported_once(caplog):
+    condition.type = fp.model.ConditionType.NUMBER
+    condition.objects = ['12', 'foo', '16']
+    condition.predicate = fp.model.NumberPredicate.EQUAL
+
+    user['userId'] = '12'
+    assert condition.match_objects(user, segments)
+    user['userId'] = '16'
+    assert not condition.match_objects(user, segments)
+    assert not condition.match_objects(user, segments)
+
+    errors = [r for r in caplog.records if 'cannot be parsed' in r.getMessage()]
+    assert len(errors) == 1
+
+
+def test_string_is_one_of_large_objects():
+    condition.objects = [str(i) for i in range(100000)]
+    condition.predicate = fp.model.StringPredicate.IS_ONE_OF
+
+    user['userId'] = '99999'
+    assert condition.match_objects(user, segments)
+
+    user['userId'] = '100000'
+    assert not condition.match_objects(user, segments)
+
+    condition.predicate = fp.model.StringPredicate.IS_NOT_ANY_OF
+    assert condition.match_objects(user, segments)
+
+
+def test_string_is_one_of_unhashable_objects(caplog):
+    condition.objects = ['1', ['2'], {'3': 3}]
+    condition.predicate = fp.model.StringPredicate.IS_ONE_OF
+
+    user['userId'] = '1'
+    assert condition.match_objects(user, segments)
+    user['userId'] = '2'
+    assert not condition.match_objects(user, segments)
+
+    condition.predicate = fp.model.StringPredicate.IS_NOT_ANY_OF
+    assert condition.match_objects(user, segments)
+
+    errors = [r for r in caplog.records if 'cannot be parsed' in r.getMessage()]
+    assert len(errors) == 2
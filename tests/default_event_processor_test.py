@@ -0,0 +1,98 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import featureprobe as fp
+from featureprobe.default_event_processor import DefaultEventProcessor, EventRepository
+from featureprobe.internal import fast_json
+
+
+class StubEventServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubEventHandler)
+        self.received = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/api/events' % self.server_port
+
+
+class StubEventHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        encoding = self.headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        self.server.received.append((encoding, json.loads(body)))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _repository(access_count):
+    repo = EventRepository()
+    user = fp.User().stable_rollout('test_user')
+    for i in range(access_count):
+        repo.add(fp.AccessEvent(int(time.time() * 1000), user, key='toggle_%d' % i, value=True,
+                                version=1, variation_index=1, track_access_events=True))
+    return repo
+
+
+@pytest.mark.parametrize('compression, access_count, expected', [
+    (None, 100, None),
+    ('gzip', 1, None),
+    ('gzip', 100, 'gzip'),
+])
+def test_send_events_compressed(compression, access_count, expected):
+    server = StubEventServer()
+    processor = DefaultEventProcessor(fp.Context('test-sdk-key', fp.Config(
+        event_url=server.url, http_config=fp.HttpConfig(compression=compression, compression_threshold=1024))))
+    try:
+        repo = _repository(access_count)
+        processor._send_events([repo])  # noqa
+    finally:
+        processor.shutdown()
+        server.shutdown()
+        server.server_close()
+
+    assert server.received == [(expected, [repo.to_dict()])]
+    stats = processor.transfer_stats
+    assert stats.requests == 1
+    assert stats.body_bytes == len(fast_json.dumps([repo.to_dict()]))
+    if expected is None:
+        assert stats.wire_bytes == stats.body_bytes
+    else:
+        assert stats.wire_bytes < stats.body_bytes / 5
+
+
+def test_unsupported_compression():
+    with pytest.raises(ValueError):
+        fp.HttpConfig(compression='br')
+
+
+def test_zstd_falls_back_to_gzip(monkeypatch, caplog):
+    from featureprobe.internal import compression
+    monkeypatch.setattr(compression, 'zstandard', None)
+    assert fp.HttpConfig(compression='zstd').compression == 'gzip'
+    assert 'zstandard is not installed' in caplog.text
@@ -0,0 +1,124 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import featureprobe as fp
+from featureprobe.evaluation_cache import EvaluationCache
+from featureprobe.memory_data_repository import MemoryDataRepository
+
+
+def _toggle(version=1, conditions=(), default_serve=None, prerequisites=()):
+    return fp.Toggle.from_json({
+        'key': 'toggle',
+        'enabled': True,
+        'version': version,
+        'disabledServe': {'select': 0},
+        'defaultServe': default_serve or {'select': 0},
+        'rules': [{'serve': {'select': 1}, 'conditions': list(conditions)}] if conditions else [],
+        'variations': ['a', 'b'],
+        'prerequisites': list(prerequisites),
+    })
+
+
+_CITY_CONDITION = {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': ['1']}
+
+
+def setup_function():
+    global cache  # noqa
+    cache = EvaluationCache(100)
+
+
+def _eval(toggle, user, toggles=None, segments=None, default=None):
+    toggles = toggles if toggles is not None else {toggle.key: toggle}
+    return cache.eval(toggle, user, toggles, segments or {}, default, 20)
+
+
+def test_users_with_same_attributes_share_results():
+    toggle = _toggle(conditions=[_CITY_CONDITION])
+    toggles = {'toggle': toggle}
+    assert _eval(toggle, fp.User({'city': '1', 'os': 'mac'}, 'user1'), toggles).value == 'b'
+    assert _eval(toggle, fp.User({'city': '1', 'os': 'linux'}, 'user2'), toggles).value == 'b'
+    assert _eval(toggle, fp.User({'city': '2'}, 'user3'), toggles).value == 'a'
+    assert cache.info()[:2] == (1, 2)
+
+
+def test_missing_attribute_keyed_by_user():
+    toggle = _toggle(conditions=[_CITY_CONDITION])
+    toggles = {'toggle': toggle}
+    first = _eval(toggle, fp.User({}, 'user1'), toggles)
+    second = _eval(toggle, fp.User({}, 'user2'), toggles)
+    assert 'user1' in first.reason and 'user2' in second.reason
+    assert cache.info().hits == 0
+
+
+def test_rollout_keyed_by_user():
+    toggle = _toggle(default_serve={'split': {'distribution': [[[0, 5000]], [[5000, 10000]]]}})
+    toggles = {'toggle': toggle}
+    for i in range(20):
+        user = fp.User({}, 'user%d' % i)
+        assert _eval(toggle, user, toggles).value == toggle.eval(user, toggles, {}, None, 20).value
+    assert cache.info().hits == 0
+
+
+def test_default_value_in_key():
+    toggle = _toggle()
+    toggles = {'toggle': toggle}
+    assert _eval(toggle, fp.User({}, 'user1'), toggles, default=1).value == 'a'
+    assert _eval(toggle, fp.User({}, 'user1'), toggles, default=1.0).value == 'a'
+    assert _eval(toggle, fp.User({}, 'user1'), toggles, default={}).value == 'a'
+    assert cache.info()[:2] == (0, 2)
+
+
+def test_invalidated_by_version_changes():
+    segment = fp.Segment.from_json({'uniqueId': 'segment', 'version': 1, 'rules': [
+        {'conditions': [_CITY_CONDITION]}]})
+    in_segment = {'type': 'segment', 'subject': 'user', 'predicate': 'is in', 'objects': ['segment']}
+    toggle = _toggle(conditions=[in_segment])
+    user = fp.User({'city': '1'}, 'user1')
+    assert _eval(toggle, user, {'toggle': toggle}, {'segment': segment}).value == 'b'
+    assert _eval(toggle, user, {'toggle': toggle}, {'segment': segment}).value == 'b'
+    assert cache.info().hits == 1
+
+    changed_segment = fp.Segment.from_json({'uniqueId': 'segment', 'version': 2, 'rules': []})
+    assert _eval(toggle, user, {'toggle': toggle}, {'segment': changed_segment}).value == 'a'
+
+    changed_toggle = _toggle(version=2)
+    changed_toggle.variations = ['c', 'd']
+    assert _eval(changed_toggle, user, {'toggle': changed_toggle}).value == 'c'
+    assert cache.info().hits == 1
+
+
+def test_invalidated_by_refresh_without_versions():
+    payload = {'toggles': {'toggle': {
+        'key': 'toggle', 'enabled': True, 'disabledServe': {'select': 0}, 'defaultServe': {'select': 1},
+        'rules': [], 'variations': ['a', 'b']}}, 'segments': {}}
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(fp.Repository.from_json(payload))
+    user = fp.User({}, 'user1')
+    snapshot = data_repo.snapshot
+    assert _eval(snapshot.toggles['toggle'], user, snapshot.toggles).value == 'b'
+    assert _eval(snapshot.toggles['toggle'], user, snapshot.toggles).value == 'b'
+
+    payload['toggles']['toggle']['variations'] = ['a', 'CHANGED']
+    data_repo.refresh(fp.Repository.from_json(payload))
+    snapshot = data_repo.snapshot
+    assert _eval(snapshot.toggles['toggle'], user, snapshot.toggles).value == 'CHANGED'
+    assert cache.info()[:2] == (1, 2)
+
+
+def test_datetime_never_cached():
+    toggle = _toggle(conditions=[
+        {'type': 'datetime', 'subject': 'ts', 'predicate': 'after', 'objects': ['1000']}])
+    for _ in range(3):
+        assert _eval(toggle, fp.User({'ts': '2000'}, 'user1')).value == 'b'
+    assert cache.info()[:2] == (0, 0)
@@ -0,0 +1,45 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+
+from featureprobe.internal import fast_json
+
+
+@pytest.fixture(params=fast_json.BACKENDS, ids=lambda b: b.name)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(fast_json, 'backend', request.param)
+    return request.param
+
+
+def test_loads_same_as_stdlib(backend):
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        data = f.read()
+    assert fast_json.loads(data) == json.loads(data)
+    assert fast_json.loads(data.decode('utf-8')) == json.loads(data)
+
+
+def test_loads_falls_back_to_stdlib(backend):
+    assert fast_json.loads(b'{"a": 123456789012345678901234567890, "b": Infinity}') == \
+        {'a': 123456789012345678901234567890, 'b': float('inf')}
+    with pytest.raises(ValueError):
+        fast_json.loads(b'{"a": ')
+
+
+def test_dumps_round_trip(backend):
+    obj = [{'events': [{'kind': 'access', 'value': 'café/1', 'time': 1}], 'access': {'counters': {}}}]
+    assert json.loads(fast_json.dumps(obj)) == obj
+    assert json.loads(fast_json.dumps({1: 2 ** 70})) == {'1': 2 ** 70}
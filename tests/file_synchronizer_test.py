@@ -0,0 +1,103 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import featureprobe as fp
+from featureprobe.file_synchronizer import FileSynchronizer
+from featureprobe.internal.file_watcher import FileWatcher
+from featureprobe.memory_data_repository import MemoryDataRepository
+
+
+def _payload(version):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['toggles']['bool_toggle']['version'] = version
+    return payload
+
+
+def _write(path, payload):
+    # written aside and renamed over the file, the way config management replaces files
+    temp = str(path) + '.tmp'
+    with open(temp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(temp, str(path))
+
+
+def _until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_unchanged_file_is_not_parsed(tmp_path, monkeypatch):
+    path = tmp_path / 'repo.json'
+    _write(path, _payload(1))
+    parsed = []
+    from_json = fp.Repository.from_json.__func__
+    monkeypatch.setattr(fp.Repository, 'from_json',
+                        classmethod(lambda cls, *args: parsed.append(1) or from_json(cls, *args)))
+    synchronizer = FileSynchronizer(MemoryDataRepository(None, False, 0), str(path), threading.Event())  # noqa
+    synchronizer.sync()
+    synchronizer.sync()
+    assert len(parsed) == 1
+
+    _write(path, _payload(1))
+    synchronizer.sync()
+    assert len(parsed) == 2
+
+
+def test_reload_picks_up_changes(tmp_path):
+    path = tmp_path / 'repo.json'
+    _write(path, _payload(1))
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = FileSynchronizer(data_repo, str(path), threading.Event(), reload_interval=0.05)
+    synchronizer.start()
+    try:
+        segment = data_repo.get_segment('some_segment')
+        _write(path, _payload(2))
+        assert _until(lambda: data_repo.get_toggle('bool_toggle').version == 2)
+        # the incremental refresh keeps what did not change
+        assert data_repo.get_segment('some_segment') is segment
+
+        with open(str(path), 'w') as f:
+            f.write('{"toggles": ')
+        time.sleep(0.2)
+        assert data_repo.get_toggle('bool_toggle').version == 2
+
+        _write(path, _payload(3))
+        assert _until(lambda: data_repo.get_toggle('bool_toggle').version == 3)
+    finally:
+        synchronizer.close()
+
+
+def test_watcher_wakes_on_rename_over(tmp_path):
+    path = tmp_path / 'repo.json'
+    _write(path, _payload(1))
+    watcher = FileWatcher(str(path))
+    if not watcher.inotify:
+        pytest.skip('inotify is not available')
+    try:
+        threading.Timer(0.1, _write, (path, _payload(2))).start()
+        started = time.time()
+        watcher.wait(10, threading.Event())
+        assert time.time() - started < 5
+    finally:
+        watcher.close()
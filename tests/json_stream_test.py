@@ -0,0 +1,75 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+import tracemalloc
+
+import pytest
+
+import featureprobe as fp
+from featureprobe.internal.json_stream import iter_repository
+
+
+def _chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def _collect(chunks):
+    repository = {'toggles': {}, 'segments': {}}
+    for name, key, value in iter_repository(chunks):
+        if key is None:
+            repository[name] = value
+        else:
+            repository[name][key] = value
+    return repository
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 1 << 20])
+def test_iter_repository(size):
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        data = f.read()
+    assert _collect(_chunks(data, size)) == json.loads(data)
+
+    data = '{"debugUntilTime": 1234567890123, "toggles": {"caf\\u00e9": {"a": 1e5}}, "x": [1]}'.encode()
+    assert _collect(_chunks(data, size)) == {
+        'toggles': {'café': {'a': 1e5}}, 'segments': {}, 'debugUntilTime': 1234567890123, 'x': [1]}
+
+
+@pytest.mark.parametrize('data', [b'', b'[]', b'{"toggles": {"a": }}', b'{"toggles": {"a": 1}', b'{} {}', b'{"a" 1}'])
+def test_iter_repository_invalid(data):
+    with pytest.raises(json.JSONDecodeError):
+        _collect(_chunks(data, 2))
+
+
+def test_from_json_stream_memory():
+    with open('tests/resources/datasource/repo.json') as f:
+        sample = json.load(f)
+    toggles = {}
+    for i in range(3000):
+        toggle = copy.deepcopy(list(sample['toggles'].values())[i % len(sample['toggles'])])
+        toggle['key'] = 'toggle_%d' % i
+        toggles[toggle['key']] = toggle
+    data = json.dumps({'toggles': toggles, 'segments': sample['segments']}).encode()
+    del toggles
+
+    tracemalloc.start()
+    repo = fp.Repository.from_json_stream(_chunks(data, 64 * 1024))
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(repo.toggles) == 3000
+    assert repo.toggles['toggle_7'].key == 'toggle_7'
+    # the payload is over 1 MB, only a chunk and one entry are alive beyond the model objects
+    assert len(data) > 1024 * 1024
+    assert peak - retained < 256 * 1024
@@ -0,0 +1,86 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+import pytest
+
+from featureprobe.internal.lazy_mapping import LazyMapping
+
+
+def test_values_built_on_first_access():
+    built = []
+
+    def build(key, raw):
+        built.append(key)
+        return raw['value']
+
+    mapping = LazyMapping({'a': {'value': 1}, 'b': {'value': 2}}, build)
+    assert len(mapping) == 2 and 'a' in mapping and list(mapping) == ['a', 'b']
+    assert built == []
+    assert mapping.get('a') == 1 and mapping['a'] == 1
+    assert mapping.get('c', 3) == 3
+    with pytest.raises(KeyError):
+        mapping['c']  # noqa
+    assert built == ['a']
+    assert mapping.built() == {'a': 1}
+    assert dict(mapping.items()) == {'a': 1, 'b': 2}
+    assert built == ['a', 'b']
+
+
+def test_values_built_once_by_concurrent_readers():
+    calls = []
+
+    def build(key, raw):
+        calls.append(key)
+        time.sleep(0.01)
+        return object()
+
+    mapping = LazyMapping({'a': {}}, build)
+    barrier = threading.Barrier(8)
+    values = []
+
+    def read():
+        barrier.wait()
+        values.append(mapping.get('a'))
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ['a']
+    assert len(values) == 8 and all(value is values[0] for value in values)
+
+
+def test_failed_values_read_as_missing(caplog):
+    calls = []
+
+    def build(key, raw):
+        calls.append(key)
+        return raw['value']
+
+    mapping = LazyMapping({'a': {'value': 1}, 'b': {}}, build)
+    for _ in range(2):
+        assert mapping.get('b', 2) == 2
+        with pytest.raises(KeyError):
+            mapping['b']  # noqa
+    assert calls == ['b']
+    assert mapping.failed() == {'b'} and mapping.built() == {}
+    assert len([r for r in caplog.records if "Failed to build 'b'" in r.getMessage()]) == 1
+
+    reused = LazyMapping(mapping.raw, build, mapping.built(), mapping.failed())
+    assert reused.get('b') is None and reused.get('a') == 1
+    assert calls == ['b', 'a']
@@ -0,0 +1,276 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+
+import pytest
+
+import featureprobe as fp
+from featureprobe.memory_data_repository import MemoryDataRepository
+
+
+def setup_function():
+    global repo  # noqa
+    with open('tests/resources/datasource/repo.json') as f:
+        repo = fp.model.Repository.from_json(json.load(f))
+
+
+def test_refresh_compiles_repository():
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(repo)
+
+    toggle = data_repo.get_toggle('multi_condition_toggle')
+    assert toggle.rules[0]._plan is not None
+    assert toggle.rules[0].attributes == frozenset({'city', 'os'})
+    assert toggle.attributes == frozenset({'city', 'os'})
+    assert data_repo.get_toggle('bool_toggle').attributes == frozenset({'city'})
+
+
+def test_malformed_entry_does_not_fail_refresh(caplog):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['toggles']['bool_toggle']['version'] = 2
+    payload['toggles']['broken_toggle'] = dict(payload['toggles']['multi_condition_toggle'], key='broken_toggle')
+    payload['toggles']['broken_toggle']['rules'] = [
+        {'serve': {'select': 0}, 'conditions': [
+            {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': 5}]}]
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(repo)
+    data_repo.refresh(fp.Repository.from_json(payload, repo))
+
+    assert data_repo.get_toggle('bool_toggle').version == 2
+    assert data_repo.get_toggle('broken_toggle') is not None
+    errors = [r for r in caplog.records if "Failed to compile toggle 'broken_toggle'" in r.getMessage()]
+    assert len(errors) == 1
+
+
+def test_refresh_reuses_unchanged_toggles_and_segments(monkeypatch):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    changes = data_repo.refresh(repo)
+    assert changes.added_toggles == tuple(repo.toggles)
+    assert changes.added_segments == ('some_segment',)
+    snapshot = data_repo.snapshot
+
+    assert not data_repo.refresh(fp.Repository.from_json(payload, repo))
+    assert data_repo.snapshot is snapshot
+
+    compiled = []
+    monkeypatch.setattr(fp.Toggle, 'compile', lambda self, **options: compiled.append(self.key) or self)
+    payload['toggles']['bool_toggle']['version'] = 2
+    payload['toggles']['json_toggle'].pop('version')
+    del payload['toggles']['number_toggle']
+    payload['toggles']['new_toggle'] = dict(payload['toggles']['string_toggle'], key='new_toggle')
+    refreshed = fp.Repository.from_json(payload, repo)
+    changes = data_repo.refresh(refreshed)
+
+    assert changes.added_toggles == ('new_toggle',)
+    assert changes.updated_toggles == ('bool_toggle', 'json_toggle')
+    assert changes.removed_toggles == ('number_toggle',)
+    assert not changes.added_segments + changes.updated_segments + changes.removed_segments
+    assert compiled == ['new_toggle', 'bool_toggle', 'json_toggle']
+    assert data_repo.get_toggle('string_toggle') is repo.toggles['string_toggle']
+    assert data_repo.get_segment('some_segment') is repo.segments['some_segment']
+    assert data_repo.get_toggle('bool_toggle').version == 2
+    assert data_repo.get_toggle('number_toggle') is None
+
+
+def test_snapshot_versions_and_immutability():
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    assert data_repo.snapshot.version == 0
+    data_repo.refresh(repo)
+    snapshot = data_repo.snapshot
+    assert snapshot.version == 1
+    assert snapshot.toggles == repo.toggles
+
+    repo.toggles.pop('bool_toggle')
+    assert 'bool_toggle' in snapshot.toggles
+    with pytest.raises(TypeError):
+        snapshot.toggles['bool_toggle'] = None
+    with pytest.raises(AttributeError):
+        snapshot.version = 3
+
+    data_repo.refresh(repo)
+    assert data_repo.snapshot.version == 2
+    assert 'bool_toggle' not in data_repo.snapshot.toggles
+    assert 'bool_toggle' in snapshot.toggles
+    data_repo.close()
+    assert data_repo.snapshot.version == 3
+    assert data_repo.get_toggle('string_toggle') is None
+
+
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_published_toggles_not_flagged_in_place(lazy):
+    def payload(y_enabled, y_version):
+        toggle = {'enabled': True, 'disabledServe': {'select': 0}, 'defaultServe': {'select': 1},
+                  'variations': [False, True]}
+        return {'toggles': {
+            'x': dict(toggle, key='x', version=1, prerequisites=[{'key': 'y', 'value': True}]),
+            'y': dict(toggle, key='y', version=y_version, enabled=y_enabled,
+                      prerequisites=[{'key': 'x', 'value': True}])}, 'segments': {}}
+
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    first = fp.Repository.from_json(payload(False, 1), lazy=lazy)
+    data_repo.refresh(first)
+    published = data_repo.get_toggle('x')
+    assert not published.prerequisite_cycle
+
+    data_repo.refresh(fp.Repository.from_json(payload(True, 2), first, lazy))
+    assert not published.prerequisite_cycle
+    assert data_repo.get_toggle('x').prerequisite_cycle
+    assert data_repo.get_toggle('y').prerequisite_cycle
+
+
+class _DictDataRepository(fp.DataRepository):
+    def __init__(self, toggles):
+        self.toggles = toggles
+
+    @classmethod
+    def from_context(cls, context):
+        return cls({})
+
+    def refresh(self, repo):
+        self.toggles = repo.toggles
+
+    def get_toggle(self, key):
+        return self.toggles.get(key)
+
+    def get_all_toggle(self):
+        return self.toggles
+
+    def get_segment(self, key):
+        return None
+
+    def get_all_segment(self):
+        return {}
+
+    def get_debug_until_time(self):
+        return None
+
+    @property
+    def initialized(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def test_default_snapshot_wraps_without_copying():
+    data_repo = _DictDataRepository(dict(repo.toggles))
+    snapshot = data_repo.snapshot
+    data_repo.toggles.pop('bool_toggle')
+    assert 'bool_toggle' not in snapshot.toggles
+    with pytest.raises(TypeError):
+        snapshot.toggles['bool_toggle'] = None
+
+
+def _generation(value):
+    toggles = {}
+    for i in range(20):
+        key = 'toggle_%d' % i
+        toggles[key] = fp.Toggle.from_json({
+            'key': key, 'enabled': True, 'version': value, 'defaultServe': {'select': value},
+            'rules': [{'serve': {'select': value}, 'conditions': []}], 'variations': [0, 1],
+            'prerequisites': [{'key': 'toggle_0', 'value': value}] if i else []})
+    return fp.Repository(toggles, {})
+
+
+def test_evaluation_reads_one_snapshot():
+    client = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='file', location='tests/resources/datasource/repo.json'))
+    data_repo = client._data_repo  # noqa
+    generations = [_generation(0), _generation(1)]
+    data_repo.refresh(generations[0])
+    done = threading.Event()
+
+    def refresh():
+        i = 0
+        while not done.is_set():
+            i += 1
+            data_repo.refresh(generations[i % 2])
+
+    refresher = threading.Thread(target=refresh)
+    refresher.start()
+    try:
+        user = fp.User(stable_rollout_key='test_user')
+        for _ in range(100):
+            # prerequisites always hold within one snapshot
+            assert all(detail.reason == 'Rule 0 hit' for detail in client.all_details(user).values())
+            assert all(client.value_detail('toggle_%d' % i, user, None).reason == 'Rule 0 hit'
+                       for i in range(20))
+    finally:
+        done.set()
+        refresher.join()
+        client.close()
+
+
+def test_lazy_repository(monkeypatch):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['toggles']['cycle'] = dict(payload['toggles']['bool_toggle'], key='cycle', enabled=True,
+                                       prerequisites=[{'key': 'cycle', 'value': True}])
+    built = []
+    from_json = fp.Toggle.from_json.__func__
+    monkeypatch.setattr(fp.Toggle, 'from_json',
+                        classmethod(lambda cls, j: built.append(j['key']) or from_json(cls, j)))
+    lazy = fp.Repository.from_json(payload, lazy=True)
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(lazy)
+    assert built == []
+    assert len(data_repo.get_all_toggle()) == len(payload['toggles'])
+
+    toggle = data_repo.get_toggle('multi_condition_toggle')
+    assert toggle.attributes == frozenset({'city', 'os'})
+    assert data_repo.get_toggle('cycle').prerequisite_cycle
+    assert built == ['multi_condition_toggle', 'cycle']
+
+    payload = json.loads(json.dumps(payload))
+    payload['toggles']['bool_toggle']['version'] = 2
+    changes = data_repo.refresh(fp.Repository.from_json(payload, lazy, lazy=True))
+    assert changes.updated_toggles == ('bool_toggle',)
+    assert data_repo.get_toggle('multi_condition_toggle') is toggle
+    assert built == ['multi_condition_toggle', 'cycle']
+    assert not data_repo.refresh(fp.Repository.from_json(payload, data_repo.snapshot, lazy=True))
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_refresh_with_delta(lazy):
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['version'] = 1
+    previous = fp.Repository.from_json(payload, lazy=lazy)
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    data_repo.refresh(previous)
+    string_toggle = data_repo.get_toggle('string_toggle')
+
+    added = dict(payload['toggles']['string_toggle'], key='new_toggle')
+    updated = dict(payload['toggles']['bool_toggle'], version=2)
+    delta = {'baseVersion': 1, 'version': 2, 'debugUntilTime': 5,
+             'toggles': {'new_toggle': added, 'bool_toggle': updated, 'number_toggle': None}}
+    patched = previous.with_delta(json.dumps(delta))
+    changes = data_repo.refresh(patched)
+
+    assert previous.server_version == 1 and 'number_toggle' in previous.toggles
+    assert patched.server_version == 2
+    assert changes.added_toggles == ('new_toggle',)
+    assert changes.updated_toggles == ('bool_toggle',)
+    assert changes.removed_toggles == ('number_toggle',)
+    assert not changes.added_segments + changes.updated_segments + changes.removed_segments
+    assert data_repo.get_toggle('string_toggle') is string_toggle
+    assert data_repo.get_toggle('bool_toggle').version == 2
+    assert data_repo.get_debug_until_time() == 5
@@ -0,0 +1,55 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+from featureprobe.internal.patterns import AffixMatcher, SubstringMatcher
+
+
+def _random_patterns(rnd, count):
+    return [''.join(rnd.choices('abc', k=rnd.randint(0, 5))) for _ in range(count)]
+
+
+def test_affix_matcher():
+    matcher = AffixMatcher(['@gmail.com', '@corp.example.com', '.cn'], suffix=True)
+    assert matcher.match('foo@gmail.com')
+    assert matcher.match('foo@mail.cn')
+    assert not matcher.match('foo@example.com')
+    assert not matcher.match('cn')
+
+    matcher = AffixMatcher(['123', '4'])
+    assert matcher.match('123321')
+    assert matcher.match('4')
+    assert not matcher.match('12')
+
+
+def test_substring_matcher():
+    patterns = ['he', 'she', 'his', 'hers'] * 10 + ['p%d' % i for i in range(100)]
+    matcher = SubstringMatcher(patterns)
+    assert matcher.match('ushers')
+    assert matcher.match('ahisb')
+    assert matcher.match('xp99x')
+    assert not matcher.match('hi s')
+    assert not matcher.match('')
+
+
+def test_matchers_agree_with_scanning():
+    rnd = random.Random(7)
+    for _ in range(2000):
+        patterns = _random_patterns(rnd, rnd.choice([0, 1, 5, 40, 100]))
+        target = ''.join(rnd.choices('abcd', k=rnd.randint(0, 12)))
+        assert SubstringMatcher(patterns).match(target) == any(p in target for p in patterns)
+        assert AffixMatcher(patterns).match(target) == any(target.startswith(p) for p in patterns)
+        assert AffixMatcher(patterns, suffix=True).match(target) == \
+            any(target.endswith(p) for p in patterns)
@@ -12,6 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import featureprobe as fp
 from featureprobe.polling_synchronizer import PollingSynchronizer
 from featureprobe.memory_data_repository import MemoryDataRepository
 from featureprobe.config import Config
@@ -48,9 +56,242 @@ class MockHttpReponse:
     def __init__(self, status_code, json_response):
         self.status_code = status_code
         self.response = json_response
+        self.content = json_response.encode()
+        self.headers = {}
+        self.raw = None
 
     def raise_for_status(self):
         pass
 
     def json(self):
         return self.response
+
+
+class StubRepositoryServer(ThreadingHTTPServer):
+    def __init__(self, validators):
+        super().__init__(('127.0.0.1', 0), StubRepositoryHandler)
+        self.validators = validators
+        self.body = b'{"toggles": {}, "segments": {}}'
+        self.gzip = False
+        self.version = 1
+        self.delay = 0
+        self.requests = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/api/server-sdk/toggles' % self.server_port
+
+
+class StubRepositoryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa
+        server = self.server
+        server.requests.append(dict(self.headers))
+        time.sleep(server.delay)
+        etag = '"%d"' % server.version
+        last_modified = 'Mon, 0%d Jan 2024 00:00:00 GMT' % server.version
+        if server.validators and (self.headers.get('If-None-Match') == etag
+                                  or self.headers.get('If-Modified-Since') == last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.body
+        self.send_response(200)
+        if server.gzip and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        if server.validators == 'etag':
+            self.send_header('ETag', etag)
+        elif server.validators == 'last-modified':
+            self.send_header('Last-Modified', last_modified)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.parametrize('validators', ['etag', 'last-modified', None])
+def test_sync_skips_unchanged_repository(validators):
+    server = StubRepositoryServer(validators)
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    refreshed = []
+    refresh = data_repo.refresh
+    data_repo.refresh = lambda repo: refreshed.append(repo) or refresh(repo)
+    synchronizer = PollingSynchronizer.from_context(
+        Context("test-sdk-key", Config(synchronizer_url=server.url)), data_repo, Event())
+    try:
+        synchronizer.sync()
+        synchronizer.sync()
+        assert synchronizer.initialized()
+        assert len(refreshed) == 1
+
+        server.version = 2
+        server.body = b'{"toggles": {}, "segments": {}, "debugUntilTime": 1}'
+        synchronizer.sync()
+        synchronizer.sync()
+        assert len(refreshed) == 2
+        assert data_repo.get_debug_until_time() == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    conditional = [r for r in server.requests if 'If-None-Match' in r or 'If-Modified-Since' in r]
+    assert len(conditional) == (3 if validators else 0)
+
+
+def test_sync_accounts_decoded_size():
+    server = StubRepositoryServer(None)
+    server.gzip = True
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        server.body = f.read()
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = PollingSynchronizer.from_context(
+        Context("test-sdk-key", Config(synchronizer_url=server.url)), data_repo, Event())
+    try:
+        synchronizer.sync()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert data_repo.get_toggle('bool_toggle') is not None
+    stats = synchronizer.transfer_stats
+    assert stats.requests == 1
+    assert stats.body_bytes == len(server.body)
+    assert stats.wire_bytes == len(gzip.compress(server.body))
+    assert stats.wire_bytes < stats.body_bytes
+
+
+def test_stream_sync():
+    server = StubRepositoryServer(None)
+    server.gzip = True
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        server.body = f.read()
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = PollingSynchronizer.from_context(
+        Context("test-sdk-key", Config(synchronizer_url=server.url, stream_repository=True)), data_repo, Event())
+    try:
+        synchronizer.sync()
+        snapshot = data_repo.snapshot
+        synchronizer.sync()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert synchronizer.initialized()
+    assert data_repo.snapshot is snapshot
+    assert data_repo.get_toggle('bool_toggle') is not None
+    assert data_repo.get_segment('some_segment') is not None
+    stats = synchronizer.transfer_stats
+    assert stats.requests == 2
+    assert stats.body_bytes == 2 * len(server.body)
+    assert stats.wire_bytes < stats.body_bytes
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_sync_persists_snapshot_for_warm_start(tmp_path, stream):
+    server = StubRepositoryServer(None)
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        server.body = f.read()
+    snapshot_path = str(tmp_path / 'repository.json')
+    config = Config(synchronizer_url=server.url, stream_repository=stream, snapshot_path=snapshot_path)
+    try:
+        PollingSynchronizer.from_context(
+            Context("test-sdk-key", config), MemoryDataRepository(None, False, 0), Event()).sync()  # noqa
+    finally:
+        server.shutdown()
+        server.server_close()
+    with open(snapshot_path, 'rb') as f:
+        assert f.read() == server.body
+    assert [p.name for p in tmp_path.iterdir()] == ['repository.json']
+
+    # the server is gone, the persisted repository is served until a sync succeeds
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = PollingSynchronizer.from_context(Context("test-sdk-key", config), data_repo, Event())
+    synchronizer.start()
+    try:
+        assert synchronizer.initialized()
+        assert data_repo.get_toggle('bool_toggle') is not None
+    finally:
+        synchronizer.close()
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_unchanged_polls_do_not_write_snapshot(tmp_path, monkeypatch, stream):
+    from featureprobe.internal.atomic_file import AtomicFile
+    written = []
+    monkeypatch.setattr('featureprobe.polling_synchronizer.AtomicFile',
+                        lambda path: written.append(path) or AtomicFile(path))
+    server = StubRepositoryServer(None)
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        body = f.read()
+    server.body = body
+    snapshot_path = tmp_path / 'repository.json'
+    synchronizer = PollingSynchronizer.from_context(
+        Context("test-sdk-key", Config(synchronizer_url=server.url, stream_repository=stream,
+                                       snapshot_path=str(snapshot_path))),
+        MemoryDataRepository(None, False, 0), Event())  # noqa
+    try:
+        synchronizer.sync()
+        synchronizer.sync()
+        synchronizer.sync()
+        assert len(written) == 1 and snapshot_path.read_bytes() == body
+
+        server.body = body.replace(b'"bool_toggle"', b'"renamed_toggle"', 1)
+        synchronizer.sync()
+        synchronizer.sync()
+        synchronizer.sync()
+    finally:
+        server.shutdown()
+        server.server_close()
+    # streamed bodies are only written once known to be applied, by the poll after a change
+    assert len(written) == 2 and snapshot_path.read_bytes() == server.body
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    snapshot_path = tmp_path / 'repository.json'
+    snapshot_path.write_bytes(b'{"toggles": ')
+    server = StubRepositoryServer(None)
+    data_repo = MemoryDataRepository(None, False, 0)  # noqa
+    synchronizer = PollingSynchronizer.from_context(
+        Context("test-sdk-key", Config(synchronizer_url=server.url, snapshot_path=str(snapshot_path))),
+        data_repo, Event())
+    try:
+        assert not synchronizer._warm_start()
+        assert not synchronizer.initialized()
+        synchronizer.sync()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert synchronizer.initialized()
+    assert snapshot_path.read_bytes() == server.body
+
+
+def test_client_warm_starts_while_server_is_slow(tmp_path):
+    with open('tests/resources/datasource/repo.json', 'rb') as f:
+        body = f.read()
+    snapshot_path = tmp_path / 'repository.json'
+    snapshot_path.write_bytes(body)
+    server = StubRepositoryServer(None)
+    server.body = body.replace(b'"bool_toggle"', b'"renamed_toggle"', 1)
+    server.delay = 0.5
+    user = fp.User(stable_rollout_key='test_user').with_attr('city', '1')
+    started = time.time()
+    client = fp.Client('server-sdk-key', Config(
+        remote_uri='http://127.0.0.1:%d' % server.server_port, start_wait=5,
+        snapshot_path=str(snapshot_path)))
+    try:
+        assert time.time() - started < server.delay
+        assert client.initialized()
+        assert client.value('bool_toggle', user, None) is not None
+
+        # revalidated in the background
+        deadline = time.time() + 5
+        while client._data_repo.get_toggle('renamed_toggle') is None and time.time() < deadline:
+            time.sleep(0.05)
+        assert client._data_repo.get_toggle('renamed_toggle') is not None
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
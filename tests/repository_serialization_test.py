@@ -22,3 +22,22 @@ def test_serialize_toggles_to_repo():
         dic = json.load(f)
     repo = fp.model.Repository.from_json(dic)
     assert len(repo.toggles) >= 1
+
+
+def test_model_objects_have_no_instance_dict():
+    with open('tests/resources/datasource/repo.json') as f:
+        repo = fp.Repository.from_json(json.load(f)).compile()
+    objects = list(repo.toggles.values()) + list(repo.segments.values())
+    for toggle in repo.toggles.values():
+        for rule in toggle.rules:
+            objects += [rule, rule.serve] + rule.conditions
+            if rule.serve.split is not None:
+                objects.append(rule.serve.split)
+        objects += toggle.prerequisites or []
+    for segment in repo.segments.values():
+        for rule in segment.rules:
+            objects += [rule] + rule.conditions
+    assert {type(obj).__name__ for obj in objects} >= {'Toggle', 'Rule', 'Serve', 'Condition',
+                                                      'Segment', 'SegmentRule'}
+    for obj in objects:
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
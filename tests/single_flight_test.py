@@ -0,0 +1,114 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+import pytest
+
+from featureprobe.internal.single_flight import CallStats, SingleFlight
+
+
+def _concurrently(func, count):
+    threads = [threading.Thread(target=func) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_calls_share_one_run_in_flight_and_one_queued():
+    runs = []
+    release = threading.Event()
+
+    def run():
+        runs.append(time.time())
+        release.wait(5)
+
+    flight = SingleFlight(run)
+    first = threading.Thread(target=flight)
+    first.start()
+    while not runs:
+        time.sleep(0.001)
+
+    returned = []
+
+    def call():
+        flight()
+        returned.append(time.time())
+
+    waiting = [threading.Thread(target=call) for _ in range(8)]
+    for thread in waiting:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    first.join()
+    for thread in waiting:
+        thread.join()
+
+    # every waiting call saw a run that started after it
+    assert len(runs) == 2
+    assert all(t >= runs[1] for t in returned)
+    assert flight.stats == CallStats(9, 2, 7)
+
+
+def test_failures_are_raised_after_queued_calls_are_served():
+    calls = []
+
+    queued = threading.Event()
+
+    def run():
+        calls.append(1)
+        if len(calls) == 1:
+            queued.wait(5)
+            raise ValueError('failed')
+
+    flight = SingleFlight(run)
+    errors = []
+
+    def call():
+        try:
+            flight()
+        except ValueError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=call)
+    first.start()
+    while not calls:
+        time.sleep(0.001)
+    others = threading.Thread(target=_concurrently, args=(call, 3))
+    others.start()
+    time.sleep(0.05)
+    queued.set()
+    first.join()
+    others.join()
+    assert len(calls) == 2
+    assert len(errors) == 1
+
+
+def test_requests_within_the_delay_run_once():
+    runs = []
+    flight = SingleFlight(lambda: runs.append(1))
+    for _ in range(20):
+        flight.request(0.05)
+    time.sleep(0.2)
+    assert runs == [1]
+    assert flight.stats == CallStats(20, 1, 19)
+
+    flight.request(0.05)
+    flight.close()
+    time.sleep(0.1)
+    assert runs == [1]
+    with pytest.raises(ZeroDivisionError):
+        SingleFlight(lambda: 1 / 0)()
@@ -43,3 +43,49 @@ def test_user_has_no_key():
     key2 = user.key
     assert result1.index == result2.index
     assert key1 == key2
+
+
+def test_fragmented_distribution():
+    fragmented = fp.model.Split([
+        [[0, 1000], [5000, 6000]],
+        [[1000, 5000]],
+        [[6000, 10000]],
+    ], None, None).compile()  # noqa
+    for bucket, index in ((0, 0), (999, 0), (1000, 1), (4999, 1), (5000, 0), (6000, 2), (9999, 2)):
+        assert fragmented._get_group(bucket) == index
+
+
+def test_float_and_invalid_bounds(caplog):
+    floats = fp.model.Split([[[0, 5000.0]], [[5000.0, 10000]]], None, None).compile()  # noqa
+    for bucket, index in ((0, 0), (4999, 0), (5000, 1), (9999, 1)):
+        assert floats._get_group(bucket) == index
+    fractional = fp.model.Split([[[0, 4999.5]], [[4999.5, 10000]]], None, None).compile()  # noqa
+    assert fractional._get_group(4999) == 0 and fractional._get_group(5000) == 1
+
+    invalid = fp.model.Split([[[0, 'half']], [[5000, 10000]]], None, None).compile()  # noqa
+    assert invalid._get_group(0) == -1 and invalid._get_group(5000) == 1
+    assert any("invalid ranges [0, 'half']" in r.getMessage() for r in caplog.records)
+
+
+def test_distribution_gaps_and_overlaps(caplog):
+    broken = fp.model.Split([
+        [[0, 4000]],
+        [[3000, 9000]],
+    ], None, None).compile()  # noqa
+    assert broken._get_group(3500) == 0
+    assert broken._get_group(9500) == -1
+    assert any('1000 bucket(s) unassigned and assigns 1000 bucket(s)' in r.getMessage()
+               for r in caplog.records)
+
+
+def test_bucket_cache():
+    fp.model.Split.configure_bucket_cache(16)
+    try:
+        first = split.find_index(user, 'test_toggle_key')
+        second = split.find_index(user, 'test_toggle_key')
+        assert first.index == second.index == 0
+        info = fp.model.Split.bucket_cache_info()
+        assert (info.hits, info.misses, info.maxsize) == (1, 1, 16)
+    finally:
+        fp.model.Split.configure_bucket_cache(0)
+    assert fp.model.Split.bucket_cache_info() is None
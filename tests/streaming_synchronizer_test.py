@@ -0,0 +1,156 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import socketio
+
+import featureprobe as fp
+from polling_synchronizer_test import StubRepositoryServer
+
+
+class _WebSocketHandler(WSGIRequestHandler):
+    def get_environ(self):
+        environ = super().get_environ()
+        # simple-websocket takes the connection over through the socket gunicorn exposes
+        environ['gunicorn.socket'] = self.connection
+        return environ
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class StubRealtimeServer:
+    """A socket.io server standing in for the realtime toggle update service."""
+
+    def __init__(self):
+        self.sio = socketio.Server(async_mode='threading')
+        self.registered = threading.Event()
+        self.sio.on('register', lambda sid, data: self.registered.set(), namespace='/realtime')
+        app = socketio.WSGIApp(self.sio, socketio_path='realtime')
+
+        def wsgi(environ, start_response):
+            try:
+                return app(environ, start_response)
+            except StopIteration:
+                # the websocket owned the connection and closed it
+                start_response('200 OK', [])
+                return []
+
+        self.httpd = make_server('127.0.0.1', 0, wsgi, server_class=_ThreadingWSGIServer,
+                                 handler_class=_WebSocketHandler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/realtime' % self.httpd.server_port
+
+    def update(self, data=None):
+        self.sio.emit('update', data, namespace='/realtime')
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_updates_apply_deltas_and_sync_on_version_gaps():
+    with open('tests/resources/datasource/repo.json') as f:
+        payload = json.load(f)
+    payload['version'] = 1
+    repository_server = StubRepositoryServer(None)
+    repository_server.body = json.dumps(payload).encode()
+    realtime_server = StubRealtimeServer()
+    client = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='streaming', synchronizer_url=repository_server.url, realtime_url=realtime_server.url,
+        refresh_interval=600, start_wait=5))
+    data_repo = client._data_repo
+    try:
+        assert realtime_server.registered.wait(5)
+        assert len(repository_server.requests) == 1
+        segment = data_repo.get_segment('some_segment')
+        toggle = data_repo.get_toggle('bool_toggle')
+
+        changed = dict(payload['toggles']['bool_toggle'], version=2)
+        realtime_server.update({'baseVersion': 1, 'version': 2,
+                                'toggles': {'bool_toggle': changed, 'number_toggle': None}})
+        assert _until(lambda: data_repo.get_toggle('bool_toggle').version == 2)
+        assert data_repo.get_toggle('number_toggle') is None
+        assert data_repo.get_segment('some_segment') is segment
+        assert data_repo.get_toggle('bool_toggle') is not toggle
+        assert len(repository_server.requests) == 1
+
+        # already applied
+        realtime_server.update({'baseVersion': 1, 'version': 2, 'toggles': {'bool_toggle': None}})
+        time.sleep(0.2)
+        assert data_repo.get_toggle('bool_toggle') is not None
+        assert len(repository_server.requests) == 1
+
+        # a delta was missed, the full repository is fetched instead
+        realtime_server.update({'baseVersion': 3, 'version': 4, 'toggles': {'bool_toggle': None}})
+        assert _until(lambda: len(repository_server.requests) == 2)
+        assert _until(lambda: data_repo.get_toggle('number_toggle') is not None)
+        assert data_repo.get_toggle('bool_toggle').version == 1
+
+        # malformed versions are not compared, the full repository is fetched instead
+        realtime_server.update({'baseVersion': '1', 'version': '2', 'toggles': {'bool_toggle': None}})
+        assert _until(lambda: len(repository_server.requests) == 3)
+        assert data_repo.get_toggle('bool_toggle') is not None
+
+        # updates without a delta still announce a change
+        realtime_server.update()
+        assert _until(lambda: len(repository_server.requests) == 4)
+    finally:
+        client.close()
+        realtime_server.close()
+        repository_server.shutdown()
+        repository_server.server_close()
+
+
+def test_burst_of_updates_syncs_once():
+    repository_server = StubRepositoryServer(None)
+    repository_server.delay = 0.05
+    realtime_server = StubRealtimeServer()
+    client = fp.Client('server-sdk-key', fp.Config(
+        sync_mode='streaming', synchronizer_url=repository_server.url, realtime_url=realtime_server.url,
+        refresh_interval=600, start_wait=5, realtime_debounce=0.2))
+    try:
+        assert realtime_server.registered.wait(5)
+        for _ in range(20):
+            realtime_server.update()
+        assert _until(lambda: len(repository_server.requests) == 2)
+        time.sleep(0.5)
+        assert len(repository_server.requests) == 2
+        stats = client._synchronizer.sync_stats
+        assert stats.executed == 2
+        assert stats.coalesced == stats.requested - 2 >= 1
+    finally:
+        client.close()
+        realtime_server.close()
+        repository_server.shutdown()
+        repository_server.server_close()
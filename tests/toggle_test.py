@@ -0,0 +1,207 @@
+# Copyright 2022 FeatureProbe
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import featureprobe as fp
+from featureprobe.evaluation_memo import EvaluationMemo
+
+
+def _toggle(key, prerequisites=(), rules=()):
+    return fp.Toggle.from_json({
+        'key': key,
+        'enabled': True,
+        'version': 1,
+        'disabledServe': {'select': 0},
+        'defaultServe': {'select': 1},
+        'rules': list(rules),
+        'variations': [False, True],
+        'prerequisites': [{'key': k, 'value': True} for k in prerequisites],
+    })
+
+
+def _diamonds(levels):
+    # toggle_i requires both left_(i+1) and right_(i+1), which both require toggle_(i+1)
+    toggles = {'toggle_%d' % levels: _toggle('toggle_%d' % levels)}
+    for i in range(levels - 1, -1, -1):
+        for side in ('left', 'right'):
+            key = '%s_%d' % (side, i + 1)
+            toggles[key] = _toggle(key, ['toggle_%d' % (i + 1)])
+        key = 'toggle_%d' % i
+        toggles[key] = _toggle(key, ['left_%d' % (i + 1), 'right_%d' % (i + 1)])
+    return toggles
+
+
+def _count_evaluations(monkeypatch):
+    calls = []
+    do_eval = fp.Toggle._do_eval
+
+    def counting_do_eval(self, *args):
+        calls.append(self.key)
+        return do_eval(self, *args)
+
+    monkeypatch.setattr(fp.Toggle, '_do_eval', counting_do_eval)
+    return calls
+
+
+def test_diamond_prerequisites_evaluated_once(monkeypatch):
+    toggles = _diamonds(10)
+    user = fp.User(stable_rollout_key='test_user')
+    calls = _count_evaluations(monkeypatch)
+
+    result = toggles['toggle_0'].eval(user, toggles, {}, None, 40, EvaluationMemo())
+    assert result.value is True
+    assert len(calls) == len(toggles)
+
+    calls.clear()
+    assert toggles['toggle_0'].eval(user, toggles, {}, None, 40).value is True
+    assert len(calls) > 2 ** 10
+
+
+def test_memoized_prerequisites_respect_deep():
+    toggles = _diamonds(3)
+    user = fp.User(stable_rollout_key='test_user')
+    memo = EvaluationMemo()
+    # 'toggle_1' needs 5 levels, evaluating it first must not let 'toggle_0' pass with 6
+    assert toggles['toggle_1'].eval(user, toggles, {}, None, 5, memo).reason == 'Default rule hit. None'
+    for deep in (6, 7):
+        expected = toggles['toggle_0'].eval(user, toggles, {}, None, deep)
+        result = toggles['toggle_0'].eval(user, toggles, {}, None, deep, memo)
+        assert (result.value, result.reason) == (expected.value, expected.reason)
+    assert 'deep overflow' in toggles['toggle_0'].eval(user, toggles, {}, None, 6, memo).reason
+
+
+def test_segment_membership_memoized(monkeypatch):
+    segment = fp.Segment.from_json({
+        'uniqueId': 'project$segment',
+        'version': 1,
+        'rules': [{'conditions': [
+            {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': ['1']}]}],
+    })
+    segments = {'project$segment': segment}
+    rule = {'serve': {'select': 1}, 'conditions': [
+        {'type': 'segment', 'subject': 'user', 'predicate': 'is in', 'objects': ['project$segment']}]}
+    toggles = {'a': _toggle('a', rules=[rule]), 'b': _toggle('b', ['a'], rules=[rule])}
+    user = fp.User({'city': '1'}, 'test_user')
+
+    calls = []
+    contains = fp.Segment._contains
+    monkeypatch.setattr(fp.Segment, '_contains',
+                        lambda self, *args: calls.append(self.uid) or contains(self, *args))
+
+    memo = EvaluationMemo()
+    assert toggles['b'].eval(user, toggles, segments, None, 20, memo).value is True
+    assert toggles['a'].eval(user, toggles, segments, None, 20, memo).value is True
+    assert calls == ['project$segment']
+
+
+def test_circular_prerequisites(monkeypatch, caplog):
+    toggles = {'a': _toggle('a', ['b']), 'b': _toggle('b', ['c']), 'c': _toggle('c', ['a']),
+               'd': _toggle('d', ['c']), 'e': _toggle('e', ['f', 'not_exist']), 'f': _toggle('f')}
+    fp.Repository(toggles, {}).compile()
+    assert [key for key, t in toggles.items() if t.prerequisite_cycle] == ['a', 'b', 'c', 'd']
+    assert 'a, b, c, d' in caplog.text
+    assert "'e' requires prerequisite 'not_exist'" in caplog.text
+
+    user = fp.User(stable_rollout_key='test_user')
+    calls = _count_evaluations(monkeypatch)
+    result = toggles['d'].eval(user, toggles, {}, 'default', 20, EvaluationMemo())
+    assert result.value is True
+    assert result.reason == 'Default rule hit. prerequisite deep overflow'
+    assert calls == ['d', 'c', 'a', 'b', 'c']
+
+    # without a memo of its own too
+    calls.clear()
+    result = toggles['d'].eval(user, toggles, {}, 'default', 20)
+    assert result.reason == 'Default rule hit. prerequisite deep overflow'
+    assert calls == ['d', 'c', 'a', 'b', 'c']
+
+
+def test_disabled_toggle_breaks_prerequisite_cycle():
+    toggles = {'a': _toggle('a', ['b']), 'b': _toggle('b', ['a'])}
+    toggles['b'].enabled = False
+    fp.Repository(toggles, {}).compile()
+    assert not toggles['b'].prerequisite_cycle
+    assert not toggles['a'].prerequisite_cycle
+
+
+def _fold_cases():
+    disabled = _toggle('disabled', rules=[{'serve': {'select': 1}, 'conditions': [
+        {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': ['1']}]}])
+    disabled.enabled = False
+    unconditional = _toggle('unconditional', rules=[{'serve': {'select': 1}, 'conditions': []},
+                                                    {'serve': {'select': 0}, 'conditions': []}])
+    numbers = _toggle('numbers')
+    numbers.variations = [1, 2]
+    return [disabled, unconditional, numbers, _toggle('default')]
+
+
+def _result_fields(result):
+    return (result.value, result.rule_index, result.variation_index, result.version,
+            result.reason)
+
+
+def test_user_independent_toggles_folded():
+    user = fp.User(stable_rollout_key='test_user').with_attr('city', '1')
+    for toggle in _fold_cases():
+        assert not toggle.compile().user_independent
+        toggle.compile(fold=True)
+        assert toggle.user_independent
+        for default in ('default', 0, 0.5, None):
+            result = toggle.eval(user, {}, {}, default, 20)
+            toggle._constant = None
+            expected = toggle.eval(user, {}, {}, default, 20)
+            toggle.compile(fold=True)
+            assert _result_fields(result) == _result_fields(expected)
+            assert type(result.value) is type(expected.value)  # noqa: E721
+    assert 'deep overflow' in _toggle('default').compile(fold=True).eval(user, {}, {}, None, 0).reason
+
+
+def test_user_dependent_toggles_not_folded():
+    split = _toggle('split')
+    split.default_serve = fp.Serve(None, fp.Split([[[0, 5000]], [[5000, 10000]]], None, None))
+    conditional = _toggle('conditional', rules=[{'serve': {'select': 1}, 'conditions': [
+        {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': ['1']}]}])
+    out_of_range = _toggle('out_of_range')
+    out_of_range.variations = [False]
+    for toggle in (split, conditional, out_of_range, _toggle('prerequisite', ['default'])):
+        assert not toggle.compile(fold=True).user_independent
+
+    # a folded toggle modified afterwards is evaluated in full
+    toggle = _toggle('default').compile(fold=True)
+    toggle.default_serve = fp.Serve(0, None)
+    assert not toggle.user_independent
+    assert toggle.eval(fp.User(), {}, {}, None, 20).value is False
+
+
+def test_nested_changes_of_compiled_toggle():
+    toggle = _toggle('toggle', rules=[{'serve': {'select': 1}, 'conditions': []}])
+    toggle.default_serve = fp.Serve(0, None)
+    toggle.variations = ['a', 'b']
+    toggle.compile()
+    user = fp.User(stable_rollout_key='test_user').with_attr('city', 'y')
+    assert toggle.eval(user, {}, {}, None, 20).value == 'b'
+
+    toggle.rules[0].conditions = [fp.Condition.from_json(
+        {'type': 'string', 'subject': 'city', 'predicate': 'is one of', 'objects': ['x']})]
+    assert toggle.eval(user, {}, {}, None, 20).value == 'a'
+    toggle.rules[0].conditions = []
+    toggle.rules[0].serve.select = 0
+    assert toggle.eval(user, {}, {}, None, 20).value == 'a'
+    toggle.rules[0].serve = fp.Serve(1, None)
+    assert toggle.eval(user, {}, {}, None, 20).value == 'b'
+
+    toggle.enabled = False
+    toggle.compile()
+    assert toggle.eval(user, {}, {}, None, 20).value == 'a'
+    toggle.disabled_serve.select = 1
+    assert toggle.eval(user, {}, {}, None, 20).value == 'b'